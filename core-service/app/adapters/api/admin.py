@@ -0,0 +1,90 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+from app.infrastructure.profiling import RequestProfiler
+
+
+# Acesso às rotas de administração; sem token, as rotas ficam desativadas
+admin_token: str = os.getenv("ADMIN_TOKEN", "")
+# Definido na inicialização da aplicação, se PROFILING_ENABLED
+profiler: Optional[RequestProfiler] = None
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")) -> None:
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Rotas de administração desativadas")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Token de administração inválido")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)], include_in_schema=False)
+
+
+class ProfilingRequest(BaseModel):
+    """Arma o profiling das próximas `requests` requisições de uma rota."""
+    route: str = Field(..., description="Template da rota, por exemplo /vehicles/{vehicle_id}")
+    method: str = "GET"
+    requests: int = Field(1, gt=0, le=1000)
+
+
+def get_profiler() -> RequestProfiler:
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling desativado")
+    return profiler
+
+
+def _profiling_state(profiler: RequestProfiler) -> dict:
+    return {
+        "armed": [
+            {"method": method, "route": route, "remaining": remaining}
+            for (method, route), remaining in profiler.armed.items()
+        ],
+        "header": profiler.debug_header if profiler.header_enabled else None,
+        "profiles": profiler.list_profiles(),
+    }
+
+
+@router.get("/profiling")
+async def get_profiling(profiler: RequestProfiler = Depends(get_profiler)):
+    return _profiling_state(profiler)
+
+
+@router.post("/profiling")
+async def arm_profiling(body: ProfilingRequest, request: Request, profiler: RequestProfiler = Depends(get_profiler)):
+    method = body.method.upper()
+    if not any(
+        getattr(route, "path", None) == body.route and method in (getattr(route, "methods", None) or ())
+        for route in request.app.routes
+    ):
+        raise HTTPException(status_code=404, detail="Rota não encontrada")
+    profiler.arm(method, body.route, body.requests)
+    return _profiling_state(profiler)
+
+
+@router.delete("/profiling")
+async def disarm_profiling(profiler: RequestProfiler = Depends(get_profiler)):
+    profiler.disarm()
+    return _profiling_state(profiler)
+
+
+@router.get("/profiling/{name}")
+async def download_profile(name: str, profiler: RequestProfiler = Depends(get_profiler)):
+    if profiler.find(name) is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(profiler.path(name), media_type="application/octet-stream", filename=name)
+
+
+@router.get("/profiling/{name}/summary", response_class=PlainTextResponse)
+async def profile_summary(
+    name: str,
+    top: int = Query(30, gt=0, le=500),
+    profiler: RequestProfiler = Depends(get_profiler)
+):
+    if profiler.find(name) is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return PlainTextResponse(profiler.summary(name, top))
@@ -1,9 +1,10 @@
 from typing import AsyncGenerator
-from fastapi import Depends
+from fastapi import Depends, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.adapters.repository.database_config import get_database
 from app.adapters.repository.mongodb_vehicle_repository import MongoDBVehicleRepository
+from app.domain.vehicle_import import VehicleImporter
 from app.domain.vehicle_service import VehicleService
 from app.ports.vehicle_repository import VehicleRepository
 
@@ -30,3 +31,13 @@ async def get_vehicle_service(
     Dependency function that yields a VehicleService instance.
     """
     return VehicleService(repository)
+
+async def get_vehicle_importer(
+    chunk_size: int = Query(500, ge=1, le=5000, description="Veículos por lote gravado"),
+    max_in_flight: int = Query(4, ge=1, le=16, description="Lotes gravados em paralelo"),
+    repository: VehicleRepository = Depends(get_vehicle_repository)
+) -> VehicleImporter:
+    """
+    Dependency function that yields a VehicleImporter instance.
+    """
+    return VehicleImporter(repository, chunk_size=chunk_size, max_in_flight=max_in_flight)
@@ -1,12 +1,35 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, Header
+from typing import AsyncIterator, List, Optional
 
-from app.domain.vehicle import Vehicle, VehicleCreate, VehicleUpdate, VehicleStatus
+from app.domain.vehicle import (
+    Vehicle,
+    VehicleCreate,
+    VehicleUpdate,
+    VehicleStatus,
+    VehicleBulkStatusUpdate,
+    VehicleBulkStatusResult,
+    VehicleFilter,
+    VehicleLookupRequest,
+    VehicleLookupResult,
+    VehicleReservationRequest,
+    PriceAdjustmentRequest,
+    PriceAdjustmentResult,
+)
+from app.domain.exceptions import VehicleNotFoundError, VehicleVersionConflictError
+from app.domain.vehicle_import import ImportFormat, ImportResult, VehicleImporter
 from app.domain.vehicle_service import VehicleService
-from app.adapters.api.dependencies import get_vehicle_service
+from app.adapters.api.dependencies import get_vehicle_service, get_vehicle_importer
+from app.infrastructure.server_timing import TimedRoute
+from app.infrastructure.stale_cache import STALENESS_HEADER, SWR_ENABLED, StaleWhileRevalidate
+
+IMPORT_READ_SIZE = 64 * 1024
+
+# Última lista boa de cada status, servida quando o MongoDB está lento
+vehicle_lists = StaleWhileRevalidate("vehicle_lists") if SWR_ENABLED else None
 
 router = APIRouter(
     tags=["veículos"],
+    route_class=TimedRoute,
     responses={
         404: {"description": "Veículo não encontrado"},
         400: {"description": "Requisição inválida"}
@@ -32,14 +55,188 @@ async def create_vehicle(vehicle: VehicleCreate, vehicle_service: VehicleService
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
+@router.post(
+    "/import",
+    response_model=ImportResult,
+    summary="Importar veículos em lote",
+    description=(
+        "Importa veículos a partir de um arquivo CSV (com cabeçalho) ou NDJSON. O arquivo pode ser enviado "
+        "como corpo da requisição (text/csv ou application/x-ndjson) ou como campo `file` de um formulário "
+        "multipart. As linhas são validadas e gravadas em lotes conforme o arquivo é lido, sem carregá-lo "
+        "inteiro em memória. Se a leitura não puder continuar (linha grande demais ou aspas não "
+        "fechadas), os lotes já lidos são gravados e a resposta traz `aborted` e, no último item "
+        "de `errors`, a linha e o motivo."
+    ),
+    responses={
+        200: {"description": "Importação processada; linhas rejeitadas são listadas em `errors`"},
+        400: {"description": "Formato do arquivo não suportado"}
+    }
+)
+async def import_vehicles(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="Formato do arquivo; inferido do Content-Type se omitido"),
+    importer: VehicleImporter = Depends(get_vehicle_importer)
+):
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Campo 'file' não encontrado no formulário")
+        fmt = format or _detect_import_format(upload.content_type or "", upload.filename or "")
+        chunks = _iter_upload(upload)
+    else:
+        fmt = format or _detect_import_format(content_type, "")
+        chunks = request.stream()
+
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Formato não suportado. Use CSV ou NDJSON")
+
+    try:
+        return await importer.import_stream(chunks, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+def _detect_import_format(content_type: str, filename: str) -> Optional[ImportFormat]:
+    content_type = content_type.split(";")[0].strip().lower()
+    filename = filename.lower()
+    if content_type in ("text/csv", "application/csv") or filename.endswith(".csv"):
+        return ImportFormat.CSV
+    if content_type in ("application/x-ndjson", "application/jsonl") or filename.endswith((".ndjson", ".jsonl")):
+        return ImportFormat.NDJSON
+    return None
+
+async def _iter_upload(upload) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(IMPORT_READ_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+@router.post(
+    "/bulk-status",
+    response_model=VehicleBulkStatusResult,
+    summary="Alterar status de veículos em lote",
+    description=(
+        "Aplica várias transições de status de uma vez, com as mesmas regras das rotas mark-as-*. "
+        "Retorna os veículos alterados e, para os rejeitados, o motivo."
+    ),
+    responses={
+        200: {"description": "Lote processado"},
+        422: {"description": "Lote vazio ou com mais de 1000 transições"}
+    }
+)
+async def bulk_update_vehicle_status(
+    bulk_update: VehicleBulkStatusUpdate,
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
+    try:
+        return await vehicle_service.bulk_update_vehicle_status(bulk_update.transitions)
+    except Exception:
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@router.post(
+    "/lookup",
+    response_model=VehicleLookupResult,
+    summary="Consultar veículos por ID em lote",
+    description=(
+        "Retorna em uma única consulta ao banco os veículos dos IDs informados (até 1000). "
+        "IDs repetidos são consultados uma vez; os inexistentes ou inválidos voltam em `missing`."
+    ),
+    responses={
+        200: {"description": "Consulta realizada"},
+        422: {"description": "Lista vazia ou com mais de 1000 IDs"}
+    }
+)
+async def lookup_vehicles(
+    lookup: VehicleLookupRequest,
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
+    try:
+        return await vehicle_service.lookup_vehicles(lookup.ids)
+    except Exception:
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@router.post(
+    "/reserve",
+    response_model=Vehicle,
+    summary="Reservar qualquer veículo disponível",
+    description=(
+        "Reserva atomicamente o veículo DISPONÍVEL mais barato que atende aos critérios (marca, modelo, ano "
+        "e preço máximo). Pensado para eventos de alta concorrência: cada chamada custa uma única operação "
+        "no banco e nunca reserva o mesmo veículo duas vezes."
+    ),
+    responses={
+        200: {"description": "Veículo reservado"},
+        404: {"description": "Nenhum veículo disponível para os critérios informados"}
+    }
+)
+async def reserve_any_vehicle(
+    criteria: VehicleReservationRequest,
+    response: Response,
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
+    try:
+        vehicle = await vehicle_service.reserve_any_vehicle(criteria)
+    except VehicleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+    response.headers["ETag"] = _etag(vehicle)
+    return vehicle
+
+@router.post(
+    "/price-adjustments",
+    response_model=PriceAdjustmentResult,
+    summary="Ajustar preços em lote",
+    description=(
+        "Aplica uma regra de preço (percentual, valor absoluto e arredondamento) a todos os veículos "
+        "DISPONÍVEIS que atendem ao filtro, com uma única atualização no banco. Com `dry_run=true` nada é "
+        "alterado e a resposta traz a quantidade afetada e a distribuição dos preços resultantes."
+    ),
+    responses={
+        200: {"description": "Ajuste aplicado ou simulado"},
+        400: {"description": "Filtro inválido"}
+    }
+)
+async def adjust_vehicle_prices(
+    adjustment: PriceAdjustmentRequest,
+    dry_run: bool = Query(False, description="Apenas simula o ajuste"),
+    buckets: int = Query(10, ge=1, le=50, description="Faixas da distribuição de preços (dry-run)"),
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
+    try:
+        return await vehicle_service.adjust_prices(adjustment, dry_run=dry_run, buckets=buckets)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
 @router.get(
     "/",
     response_model=List[Vehicle],
     summary="Listar veículos",
-    description="Retorna uma lista de todos os veículos cadastrados no sistema."
+    description="Retorna uma lista dos veículos cadastrados no sistema, opcionalmente filtrada."
 )
-async def list_vehicles(vehicle_service: VehicleService = Depends(get_vehicle_service)):
-    return await vehicle_service.list_vehicles()
+async def list_vehicles(
+    filters: VehicleFilter = Depends(),
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
+    return await vehicle_service.list_vehicles(filters)
+
+async def _list_by_status(status: VehicleStatus, response: Response, vehicle_service: VehicleService) -> List[Vehicle]:
+    """
+    Lista por status; se a consulta passar do orçamento de latência, serve a
+    última lista boa com o cabeçalho X-Stale-Age (segundos desde a consulta).
+    """
+    if vehicle_lists is None:
+        return await vehicle_service.list_vehicles_by_status(status)
+    vehicles, age = await vehicle_lists.get(status, lambda: vehicle_service.list_vehicles_by_status(status))
+    if age is not None:
+        response.headers[STALENESS_HEADER] = f"{age:.3f}"
+    return vehicles
 
 @router.get(
     "/available/",
@@ -47,8 +244,8 @@ async def list_vehicles(vehicle_service: VehicleService = Depends(get_vehicle_se
     summary="Listar veículos disponíveis",
     description="Retorna uma lista de veículos com status DISPONÍVEL."
 )
-async def list_available_vehicles(vehicle_service: VehicleService = Depends(get_vehicle_service)):
-    return await vehicle_service.list_vehicles_by_status(VehicleStatus.AVAILABLE)
+async def list_available_vehicles(response: Response, vehicle_service: VehicleService = Depends(get_vehicle_service)):
+    return await _list_by_status(VehicleStatus.AVAILABLE, response, vehicle_service)
 
 @router.get(
     "/reserved/",
@@ -56,8 +253,8 @@ async def list_available_vehicles(vehicle_service: VehicleService = Depends(get_
     summary="Listar veículos reservados",
     description="Retorna uma lista de veículos com status RESERVADO."
 )
-async def list_reserved_vehicles(vehicle_service: VehicleService = Depends(get_vehicle_service)):
-    return await vehicle_service.list_vehicles_by_status(VehicleStatus.RESERVED)
+async def list_reserved_vehicles(response: Response, vehicle_service: VehicleService = Depends(get_vehicle_service)):
+    return await _list_by_status(VehicleStatus.RESERVED, response, vehicle_service)
 
 @router.get(
     "/sold/",
@@ -65,8 +262,8 @@ async def list_reserved_vehicles(vehicle_service: VehicleService = Depends(get_v
     summary="Listar veículos vendidos",
     description="Retorna uma lista de veículos com status VENDIDO."
 )
-async def list_sold_vehicles(vehicle_service: VehicleService = Depends(get_vehicle_service)):
-    return await vehicle_service.list_vehicles_by_status(VehicleStatus.SOLD)
+async def list_sold_vehicles(response: Response, vehicle_service: VehicleService = Depends(get_vehicle_service)):
+    return await _list_by_status(VehicleStatus.SOLD, response, vehicle_service)
 
 @router.get(
     "/{vehicle_id}",
@@ -78,40 +275,74 @@ async def list_sold_vehicles(vehicle_service: VehicleService = Depends(get_vehic
         404: {"description": "Veículo não encontrado"}
     }
 )
-async def get_vehicle(vehicle_id: str, vehicle_service: VehicleService = Depends(get_vehicle_service)):
+async def get_vehicle(
+    vehicle_id: str,
+    response: Response,
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
     vehicle = await vehicle_service.get_vehicle(vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Veículo não encontrado")
+    response.headers["ETag"] = _etag(vehicle)
     return vehicle
 
 @router.put(
     "/{vehicle_id}",
     response_model=Vehicle,
     summary="Atualizar veículo",
-    description="Atualiza os dados de um veículo existente. Não permite alterar o status do veículo.",
+    description=(
+        "Atualiza os dados de um veículo existente. Não permite alterar o status do veículo. "
+        "Envie o ETag obtido no GET no cabeçalho If-Match (ou o campo `version`) para que a alteração "
+        "só seja aplicada se o veículo não tiver sido modificado desde a leitura."
+    ),
     responses={
         200: {"description": "Veículo atualizado com sucesso"},
         404: {"description": "Veículo não encontrado"},
-        400: {"description": "Dados inválidos fornecidos"}
+        400: {"description": "Dados inválidos fornecidos"},
+        412: {"description": "O veículo foi alterado por outra requisição (versão divergente)"}
     }
 )
-async def update_vehicle(vehicle_id: str, vehicle_update: VehicleUpdate, vehicle_service: VehicleService = Depends(get_vehicle_service)):
+async def update_vehicle(
+    vehicle_id: str,
+    vehicle_update: VehicleUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag (versão) esperada do veículo"),
+    vehicle_service: VehicleService = Depends(get_vehicle_service)
+):
+    expected_version = _parse_if_match(if_match)
+    if vehicle_update.version is not None:
+        if expected_version is not None and expected_version != vehicle_update.version:
+            raise HTTPException(status_code=400, detail="If-Match e version informam versões diferentes")
+        expected_version = vehicle_update.version
+
     try:
-        vehicle = await vehicle_service.get_vehicle(vehicle_id)
-        if not vehicle:
-            raise HTTPException(status_code=404, detail="Veículo não encontrado")
-        
-        # Atualiza apenas os campos fornecidos
-        update_data = vehicle_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(vehicle, field, value)
-        
-        return await vehicle_service.update_vehicle(vehicle)
+        vehicle = await vehicle_service.update_vehicle_fields(vehicle_id, vehicle_update, expected_version)
+    except VehicleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VehicleVersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
+    response.headers["ETag"] = _etag(vehicle)
+    return vehicle
+
+def _etag(vehicle: Vehicle) -> str:
+    return f'"{vehicle.version}"'
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cabeçalho If-Match inválido")
+
 @router.delete(
     "/{vehicle_id}",
     status_code=status.HTTP_204_NO_CONTENT,
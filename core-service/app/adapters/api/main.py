@@ -1,9 +1,32 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.adapters.api import admin
+from app.adapters.api import endpoints
 from app.adapters.api.endpoints import router
+from app.adapters.repository.database_config import get_client, get_database, close_database
+from app.adapters.repository.mongodb_vehicle_repository import MongoDBVehicleRepository
+from app.infrastructure.admission import ADMISSION_ENABLED, AdmissionMiddleware
+from app.infrastructure.deadline import DEADLINE_ENABLED, DeadlineMiddleware
+from app.infrastructure.http_metrics import MetricsMiddleware, metrics_endpoint
+from app.infrastructure.mongo_monitoring import COMMAND_MONITOR
+from app.infrastructure.server_timing import SERVER_TIMING_ENABLED, ServerTimingMiddleware
+from app.infrastructure import tracing
+from app.infrastructure.profiling import PROFILING_ENABLED, ProfilingMiddleware, RequestProfiler
+from app.infrastructure.loop_monitor import LOOP_MONITOR_ENABLED, LoopMonitor
+from app.infrastructure.logging_setup import LOG_SAMPLING, LogSamplingMiddleware, configure_logging
+
+# Log assíncrono: os registros são formatados e escritos numa thread própria
+log_listener = configure_logging()
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Vehicle API", version="1.0.0")
 
+# Prazo de cada requisição, aplicado às consultas ao MongoDB
+if DEADLINE_ENABLED:
+    app.add_middleware(DeadlineMiddleware)
+
 # Configuração do CORS
 app.add_middleware(
     CORSMiddleware,
@@ -13,5 +36,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Controle de admissão: sob pressão, recusa leituras com 503 antes de chegarem
+# ao pool do MongoDB; fica dentro das métricas para que as recusas sejam contadas
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+# Métricas HTTP por rota, expostas em /metrics no formato do Prometheus
+app.add_middleware(MetricsMiddleware)
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# Rastreamento distribuído, continuando o trace recebido no cabeçalho traceparent
+if tracing.configure():
+    app.add_middleware(tracing.TracingMiddleware)
+
+# Cabeçalho Server-Timing com o custo de cada requisição (desativado por padrão)
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Amostragem dos logs abaixo de WARNING por prefixo de caminho (LOG_SAMPLING)
+if LOG_SAMPLING:
+    app.add_middleware(LogSamplingMiddleware)
+
+# Profiling sob demanda, armado pelas rotas /admin/profiling; sem PROFILING_ENABLED
+# o middleware nem é instalado
+if PROFILING_ENABLED:
+    admin.profiler = RequestProfiler(admin.admin_token)
+    app.add_middleware(ProfilingMiddleware, profiler=admin.profiler)
+
+# Atraso e bloqueios do event loop
+loop_monitor = LoopMonitor() if LOOP_MONITOR_ENABLED else None
+
+@app.on_event("startup")
+async def startup_event():
+    if loop_monitor:
+        loop_monitor.start()
+    try:
+        await MongoDBVehicleRepository(await get_database()).ensure_indexes()
+    except Exception as e:
+        logger.error("Não foi possível criar os índices de veículos: %s", e)
+    # Explain periódico das consultas mais lentas
+    if COMMAND_MONITOR:
+        COMMAND_MONITOR.start_explainer(get_client())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if loop_monitor:
+        await loop_monitor.stop()
+    if COMMAND_MONITOR:
+        await COMMAND_MONITOR.stop_explainer()
+    if endpoints.vehicle_lists:
+        await endpoints.vehicle_lists.close()
+    await close_database()
+    tracing.shutdown()
+    log_listener.stop()
+
 # Inclui as rotas
-app.include_router(router, prefix="/vehicles", tags=["vehicles"]) 
\ No newline at end of file
+app.include_router(router, prefix="/vehicles", tags=["vehicles"])
+app.include_router(admin.router)
@@ -0,0 +1,3 @@
+"""
+CLI Package
+"""
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Importa veículos de um arquivo CSV ou NDJSON diretamente no MongoDB.
+
+Uso:
+    python -m app.adapters.cli.import_vehicles estoque.csv [--format csv] [--chunk-size 500] [--max-in-flight 4]
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, Optional
+
+from app.adapters.repository.database_config import get_database
+from app.adapters.repository.mongodb_vehicle_repository import MongoDBVehicleRepository
+from app.domain.vehicle_import import ImportFormat, ImportResult, VehicleImporter
+
+READ_SIZE = 1024 * 1024
+
+async def _iter_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while True:
+            chunk = await asyncio.to_thread(file.read, READ_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+def _detect_format(path: str) -> Optional[ImportFormat]:
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        return ImportFormat.CSV
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return ImportFormat.NDJSON
+    return None
+
+def _print_progress(result: ImportResult) -> None:
+    print(
+        f"\rlinhas: {result.total_rows}  gravadas: {result.inserted}  rejeitadas: {result.failed}",
+        end="",
+        file=sys.stderr,
+        flush=True
+    )
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Importa veículos de um arquivo CSV ou NDJSON")
+    parser.add_argument("path", help="Arquivo a importar")
+    parser.add_argument("--format", choices=[f.value for f in ImportFormat], help="Formato do arquivo")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Veículos por lote gravado")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Lotes gravados em paralelo")
+    args = parser.parse_args(argv)
+
+    fmt = ImportFormat(args.format) if args.format else _detect_format(args.path)
+    if fmt is None:
+        parser.error("não foi possível inferir o formato; use --format")
+
+    db = await get_database()
+    importer = VehicleImporter(
+        MongoDBVehicleRepository(db),
+        chunk_size=args.chunk_size,
+        max_in_flight=args.max_in_flight
+    )
+    result = await importer.import_stream(_iter_file(args.path), fmt, progress=_print_progress)
+    print(file=sys.stderr)
+    print(result.model_dump_json(indent=2))
+    return 0 if result.failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
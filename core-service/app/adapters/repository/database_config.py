@@ -1,15 +1,41 @@
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from dotenv import load_dotenv
 import os
 
+from app.infrastructure.mongo_monitoring import event_listeners
+
 load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://core-mongodb:27017")
 MONGODB_DB = os.getenv("MONGODB_DB", "core_db")
 
+_client: Optional[AsyncIOMotorClient] = None
+
+def get_client() -> AsyncIOMotorClient:
+    """
+    Get the shared MongoDB client, creating it on first use.
+
+    The client owns the connection pool, so it is created once per process
+    instead of once per request. Command monitoring listeners are registered
+    here, so every repository using the client is measured.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(MONGODB_URL, event_listeners=event_listeners())
+    return _client
+
 async def get_database() -> AsyncIOMotorDatabase:
     """
     Get a MongoDB database instance.
     """
-    client = AsyncIOMotorClient(MONGODB_URL)
-    return client[MONGODB_DB] 
\ No newline at end of file
+    return get_client()[MONGODB_DB]
+
+async def close_database() -> None:
+    """
+    Close the shared MongoDB client.
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -1,11 +1,25 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 
-from app.domain.vehicle import Vehicle, VehicleStatus
+from app.domain.vehicle import (
+    Vehicle,
+    VehicleCreate,
+    VehicleStatus,
+    VehicleFilter,
+    PriceRule,
+    PriceAdjustmentResult,
+    PriceBucket,
+    PriceStats,
+)
+from app.domain.exceptions import VehicleNotFoundError, VehicleVersionConflictError
 from app.ports.vehicle_repository import VehicleRepository
+from app.infrastructure.tracing import trace_methods
 
+@trace_methods
 class MongoDBVehicleRepository(VehicleRepository):
     COLLECTION_NAME = "vehicles"
 
@@ -13,6 +27,16 @@ class MongoDBVehicleRepository(VehicleRepository):
         self.db = db
         self.collection = db[self.COLLECTION_NAME]
 
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_indexes([
+            # Atende à reserva atômica: igualdade em status/marca/modelo/ano e ordenação por preço
+            IndexModel(
+                [("status", ASCENDING), ("brand", ASCENDING), ("model", ASCENDING),
+                 ("year", ASCENDING), ("price", ASCENDING)],
+                name="status_brand_model_year_price"
+            ),
+        ])
+
     async def save(self, vehicle: Vehicle) -> Vehicle:
         now = datetime.utcnow()
         vehicle_dict = {
@@ -22,6 +46,7 @@ class MongoDBVehicleRepository(VehicleRepository):
             "color": vehicle.color,
             "price": vehicle.price,
             "status": vehicle.status,
+            "version": 1,
             "created_at": now,
             "updated_at": now
         }
@@ -29,6 +54,31 @@ class MongoDBVehicleRepository(VehicleRepository):
         vehicle_dict["_id"] = result.inserted_id
         return self._to_domain(vehicle_dict)
 
+    async def save_many(self, vehicles: List[VehicleCreate]) -> int:
+        if not vehicles:
+            return 0
+        now = datetime.utcnow()
+        documents = [
+            {
+                "brand": vehicle.brand,
+                "model": vehicle.model,
+                "year": vehicle.year,
+                "color": vehicle.color,
+                "price": vehicle.price,
+                "status": vehicle.status,
+                "version": 1,
+                "created_at": now,
+                "updated_at": now
+            }
+            for vehicle in vehicles
+        ]
+        try:
+            result = await self.collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Com ordered=False os documentos válidos são gravados mesmo se outros falharem
+            return e.details.get("nInserted", 0)
+
     async def find_by_id(self, vehicle_id: str) -> Optional[Vehicle]:
         try:
             vehicle = await self.collection.find_one({"_id": ObjectId(vehicle_id)})
@@ -38,6 +88,14 @@ class MongoDBVehicleRepository(VehicleRepository):
             return None
         return None
 
+    async def find_by_ids(self, vehicle_ids: List[str]) -> List[Vehicle]:
+        object_ids = [ObjectId(vehicle_id) for vehicle_id in vehicle_ids if ObjectId.is_valid(vehicle_id)]
+        if not object_ids:
+            return []
+        cursor = self.collection.find({"_id": {"$in": object_ids}})
+        vehicles = await cursor.to_list(length=None)
+        return [self._to_domain(vehicle) for vehicle in vehicles]
+
     async def find_all(self) -> List[Vehicle]:
         cursor = self.collection.find()
         vehicles = await cursor.to_list(length=None)
@@ -55,6 +113,86 @@ class MongoDBVehicleRepository(VehicleRepository):
             vehicles.append(self._to_domain(vehicle_dict))
         return vehicles
 
+    async def find_by_filter(self, filters: VehicleFilter) -> List[Vehicle]:
+        cursor = self.collection.find(build_filter_query(filters))
+        vehicles = await cursor.to_list(length=None)
+        return [self._to_domain(vehicle) for vehicle in vehicles]
+
+    async def adjust_prices(
+        self, filters: VehicleFilter, rule: PriceRule, dry_run: bool = False, buckets: int = 10
+    ) -> PriceAdjustmentResult:
+        """
+        Ajusta o preço de todos os veículos do filtro com um único update_many
+        usando pipeline de agregação; o cálculo é feito no próprio banco.
+        Veículos cujo novo preço não seria positivo são ignorados.
+        """
+        price = build_price_expression(rule)
+        query = build_filter_query(filters)
+        if dry_run:
+            return await self._preview_price_adjustment(query, price, buckets)
+
+        query["$expr"] = {"$gt": [price, 0]}
+        result = await self.collection.update_many(
+            query,
+            [{"$set": {
+                "price": price,
+                "updated_at": datetime.utcnow(),
+                "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+            }}]
+        )
+        return PriceAdjustmentResult(
+            dry_run=False,
+            matched_count=result.matched_count,
+            modified_count=result.modified_count
+        )
+
+    async def _preview_price_adjustment(self, query: dict, price: dict, buckets: int) -> PriceAdjustmentResult:
+        pipeline = [
+            {"$match": query},
+            {"$project": {"price": 1, "new_price": price}},
+            {"$facet": {
+                "skipped": [{"$match": {"new_price": {"$lte": 0}}}, {"$count": "count"}],
+                "summary": [
+                    {"$match": {"new_price": {"$gt": 0}}},
+                    {"$group": {
+                        "_id": None,
+                        "count": {"$sum": 1},
+                        "current_min": {"$min": "$price"},
+                        "current_max": {"$max": "$price"},
+                        "current_avg": {"$avg": "$price"},
+                        "new_min": {"$min": "$new_price"},
+                        "new_max": {"$max": "$new_price"},
+                        "new_avg": {"$avg": "$new_price"},
+                    }}
+                ],
+                "distribution": [
+                    {"$match": {"new_price": {"$gt": 0}}},
+                    {"$bucketAuto": {"groupBy": "$new_price", "buckets": buckets}}
+                ],
+            }}
+        ]
+        facets = (await self.collection.aggregate(pipeline).to_list(length=1))[0]
+        skipped = facets["skipped"][0]["count"] if facets["skipped"] else 0
+        if not facets["summary"]:
+            return PriceAdjustmentResult(dry_run=True, matched_count=0, skipped_count=skipped)
+
+        summary = facets["summary"][0]
+        return PriceAdjustmentResult(
+            dry_run=True,
+            matched_count=summary["count"],
+            skipped_count=skipped,
+            current_prices=PriceStats(
+                min=summary["current_min"], max=summary["current_max"], avg=summary["current_avg"]
+            ),
+            resulting_prices=PriceStats(
+                min=summary["new_min"], max=summary["new_max"], avg=summary["new_avg"]
+            ),
+            distribution=[
+                PriceBucket(min=bucket["_id"]["min"], max=bucket["_id"]["max"], count=bucket["count"])
+                for bucket in facets["distribution"]
+            ]
+        )
+
     async def update(self, vehicle: Vehicle) -> Vehicle:
         vehicle_dict = {
             "brand": vehicle.brand,
@@ -65,16 +203,98 @@ class MongoDBVehicleRepository(VehicleRepository):
             "status": vehicle.status,
             "updated_at": datetime.utcnow()
         }
-        result = await self.collection.update_one(
+        updated_vehicle = await self.collection.find_one_and_update(
             {"_id": ObjectId(vehicle.id)},
-            {"$set": vehicle_dict}
+            {"$set": vehicle_dict, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
         )
-        if result.matched_count == 0:
-            raise ValueError("Veículo não encontrado")
-        
-        updated_vehicle = await self.collection.find_one({"_id": ObjectId(vehicle.id)})
+        if updated_vehicle is None:
+            raise VehicleNotFoundError()
         return self._to_domain(updated_vehicle)
 
+    async def update_fields(
+        self, vehicle_id: str, fields: dict, expected_version: Optional[int] = None
+    ) -> Vehicle:
+        """
+        Aplica apenas os campos informados com $set e incrementa a versão em uma
+        única operação. Se `expected_version` for informado, a escrita só ocorre
+        se o documento ainda estiver nessa versão.
+        """
+        if not ObjectId.is_valid(vehicle_id):
+            raise VehicleNotFoundError()
+        object_id = ObjectId(vehicle_id)
+        query = {"_id": object_id}
+        if expected_version is not None:
+            # Documentos anteriores ao versionamento não têm o campo e equivalem à versão 0
+            query["version"] = expected_version if expected_version else {"$in": [0, None]}
+
+        updated_vehicle = await self.collection.find_one_and_update(
+            query,
+            {"$set": {**fields, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if updated_vehicle is not None:
+            return self._to_domain(updated_vehicle)
+
+        if expected_version is not None and await self.collection.count_documents({"_id": object_id}, limit=1):
+            raise VehicleVersionConflictError()
+        raise VehicleNotFoundError()
+
+    async def reserve_first_available(self, filters: VehicleFilter) -> Optional[Vehicle]:
+        """
+        Reserva, em uma única operação atômica, o veículo disponível mais barato
+        que atende ao filtro. Retorna None se nenhum veículo estiver disponível.
+        """
+        query = build_filter_query(filters)
+        query["status"] = VehicleStatus.AVAILABLE
+        reserved = await self.collection.find_one_and_update(
+            query,
+            {
+                "$set": {"status": VehicleStatus.RESERVED, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1}
+            },
+            sort=[("price", ASCENDING), ("_id", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if reserved is None:
+            return None
+        return self._to_domain(reserved)
+
+    async def bulk_update_status(
+        self, changes: List[Tuple[str, VehicleStatus, VehicleStatus]]
+    ) -> List[str]:
+        """
+        Aplica as mudanças de status em um único bulk_write. Cada atualização só
+        acontece se o veículo ainda estiver no status lido anteriormente; retorna
+        os IDs efetivamente alterados.
+        """
+        if not changes:
+            return []
+        # Marca as linhas gravadas por esta chamada; `updated_at` não serve,
+        # pois outra chamada no mesmo milissegundo teria o mesmo valor
+        token = ObjectId()
+        operations = [
+            UpdateOne(
+                {"_id": ObjectId(vehicle_id), "status": previous_status},
+                {
+                    "$set": {"status": status, "updated_at": datetime.utcnow(), "status_change": token},
+                    "$inc": {"version": 1}
+                }
+            )
+            for vehicle_id, previous_status, status in changes
+        ]
+        result = await self.collection.bulk_write(operations, ordered=False)
+        if result.matched_count == len(operations):
+            return [vehicle_id for vehicle_id, _, _ in changes]
+
+        # Alguma condição falhou: identifica os veículos gravados por este lote
+        cursor = self.collection.find(
+            {"_id": {"$in": [ObjectId(vehicle_id) for vehicle_id, _, _ in changes]}, "status_change": token},
+            {"_id": 1}
+        )
+        updated = {str(vehicle["_id"]) for vehicle in await cursor.to_list(length=None)}
+        return [vehicle_id for vehicle_id, _, _ in changes if vehicle_id in updated]
+
     async def delete(self, vehicle_id: str) -> None:
         try:
             result = await self.collection.delete_one({"_id": ObjectId(vehicle_id)})
@@ -92,6 +312,35 @@ class MongoDBVehicleRepository(VehicleRepository):
             color=vehicle_dict["color"],
             price=vehicle_dict["price"],
             status=vehicle_dict["status"],
+            version=vehicle_dict.get("version", 0),
             created_at=vehicle_dict.get("created_at"),
             updated_at=vehicle_dict.get("updated_at")
-        ) 
\ No newline at end of file
+        )
+
+def build_filter_query(filters: VehicleFilter) -> dict:
+    query = {}
+    for field in ("brand", "model", "year", "color", "status"):
+        value = getattr(filters, field)
+        if value is not None:
+            query[field] = value
+    price = {}
+    if filters.min_price is not None:
+        price["$gte"] = filters.min_price
+    if filters.max_price is not None:
+        price["$lte"] = filters.max_price
+    if price:
+        query["price"] = price
+    return query
+
+def build_price_expression(rule: PriceRule) -> dict:
+    """
+    Monta a expressão de agregação que calcula o novo preço a partir de `$price`.
+    """
+    expression = "$price"
+    if rule.percent is not None:
+        expression = {"$multiply": [expression, 1 + rule.percent / 100]}
+    if rule.absolute is not None:
+        expression = {"$add": [expression, rule.absolute]}
+    if rule.round_to:
+        expression = {"$multiply": [{"$round": [{"$divide": [expression, rule.round_to]}, 0]}, rule.round_to]}
+    return {"$round": [expression, 2]}
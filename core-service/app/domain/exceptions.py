@@ -0,0 +1,9 @@
+class VehicleNotFoundError(ValueError):
+    """Exceção lançada quando um veículo não é encontrado."""
+    def __init__(self, message="Veículo não encontrado"):
+        super().__init__(message)
+
+class VehicleVersionConflictError(ValueError):
+    """Exceção lançada quando a versão informada não é a versão atual do veículo."""
+    def __init__(self, message="Versão do veículo não confere com a versão atual"):
+        super().__init__(message)
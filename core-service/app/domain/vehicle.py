@@ -1,6 +1,6 @@
 from enum import Enum
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 class VehicleStatus(str, Enum):
@@ -25,9 +25,13 @@ class VehicleUpdate(BaseModel):
     year: Optional[int] = Field(None, description="Ano do veículo")
     color: Optional[str] = Field(None, description="Cor do veículo")
     price: Optional[float] = Field(None, description="Preço do veículo")
+    version: Optional[int] = Field(
+        None, ge=0, description="Versão esperada do veículo (alternativa ao cabeçalho If-Match)"
+    )
 
 class Vehicle(VehicleBase):
     id: Optional[str] = Field(None, description="ID do veículo")
+    version: int = Field(0, description="Versão do documento, incrementada a cada alteração")
     created_at: Optional[datetime] = Field(None, description="Data de criação")
     updated_at: Optional[datetime] = Field(None, description="Data de atualização")
 
@@ -65,6 +69,21 @@ class Vehicle(VehicleBase):
         self.status = "RESERVADO"
         self.updated_at = datetime.now()
 
+    def mark_as_available(self):
+        if self.status != "RESERVADO":
+            raise ValueError("Apenas veículos reservados podem ser marcados como disponíveis")
+
+        self.status = "DISPONÍVEL"
+        self.updated_at = datetime.now()
+
+    def transition_to(self, status: VehicleStatus):
+        if status == VehicleStatus.SOLD:
+            self.mark_as_sold()
+        elif status == VehicleStatus.RESERVED:
+            self.mark_as_pending()
+        elif status == VehicleStatus.AVAILABLE:
+            self.mark_as_available()
+
     def update(self, **kwargs):
         if self.status != "DISPONÍVEL":
             raise ValueError("Não é possível atualizar um veículo que não está disponível")
@@ -74,4 +93,91 @@ class Vehicle(VehicleBase):
                 setattr(self, key, value)
         
         self._validate()
-        self.updated_at = datetime.now() 
\ No newline at end of file
+        self.updated_at = datetime.now() 
+
+class VehicleStatusTransition(BaseModel):
+    vehicle_id: str = Field(..., description="ID do veículo")
+    status: VehicleStatus = Field(..., description="Novo status do veículo")
+
+class VehicleBulkStatusUpdate(BaseModel):
+    transitions: List[VehicleStatusTransition] = Field(
+        ..., min_length=1, max_length=1000, description="Transições de status a aplicar"
+    )
+
+class VehicleStatusRejection(BaseModel):
+    vehicle_id: str = Field(..., description="ID do veículo")
+    reason: str = Field(..., description="Motivo da rejeição")
+
+class VehicleBulkStatusResult(BaseModel):
+    transitioned: List[str] = Field(default_factory=list, description="IDs dos veículos que mudaram de status")
+    rejected: List[VehicleStatusRejection] = Field(default_factory=list, description="Veículos não alterados")
+
+class VehicleLookupRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000, description="IDs dos veículos a consultar")
+
+class VehicleLookupResult(BaseModel):
+    vehicles: List[Vehicle] = Field(default_factory=list, description="Veículos encontrados")
+    missing: List[str] = Field(default_factory=list, description="IDs sem veículo correspondente")
+
+class VehicleFilter(BaseModel):
+    brand: Optional[str] = Field(None, description="Marca do veículo")
+    model: Optional[str] = Field(None, description="Modelo do veículo")
+    year: Optional[int] = Field(None, description="Ano do veículo")
+    color: Optional[str] = Field(None, description="Cor do veículo")
+    status: Optional[VehicleStatus] = Field(None, description="Status do veículo")
+    min_price: Optional[float] = Field(None, ge=0, description="Preço mínimo")
+    max_price: Optional[float] = Field(None, ge=0, description="Preço máximo")
+
+    def is_empty(self) -> bool:
+        return not self.model_dump(exclude_none=True)
+
+class PriceRule(BaseModel):
+    percent: Optional[float] = Field(None, gt=-100, description="Variação percentual (ex.: -5 para 5% de desconto)")
+    absolute: Optional[float] = Field(None, description="Valor somado ao preço depois do percentual")
+    round_to: Optional[float] = Field(
+        None, gt=0, description="Arredonda para o múltiplo mais próximo (ex.: 100). Padrão: centavos"
+    )
+
+    @model_validator(mode="after")
+    def _check_adjustment(self):
+        if self.percent is None and self.absolute is None:
+            raise ValueError("Informe percent e/ou absolute")
+        return self
+
+class PriceAdjustmentRequest(BaseModel):
+    filter: VehicleFilter = Field(default_factory=VehicleFilter, description="Veículos a ajustar")
+    rule: PriceRule = Field(..., description="Regra de ajuste do preço")
+
+class PriceStats(BaseModel):
+    min: float
+    max: float
+    avg: float
+
+class PriceBucket(BaseModel):
+    min: float = Field(..., description="Limite inferior (inclusivo)")
+    max: float = Field(..., description="Limite superior")
+    count: int
+
+class PriceAdjustmentResult(BaseModel):
+    dry_run: bool
+    matched_count: int = Field(..., description="Veículos que atendem ao filtro e recebem o ajuste")
+    modified_count: int = Field(0, description="Veículos alterados (0 em dry-run)")
+    skipped_count: int = Field(0, description="Veículos ignorados por resultarem em preço não positivo (dry-run)")
+    current_prices: Optional[PriceStats] = None
+    resulting_prices: Optional[PriceStats] = None
+    distribution: List[PriceBucket] = Field(default_factory=list, description="Distribuição dos novos preços")
+
+class VehicleReservationRequest(BaseModel):
+    brand: Optional[str] = Field(None, description="Marca desejada")
+    model: Optional[str] = Field(None, description="Modelo desejado")
+    year: Optional[int] = Field(None, description="Ano desejado")
+    max_price: Optional[float] = Field(None, gt=0, description="Preço máximo aceito")
+
+    def to_filter(self) -> "VehicleFilter":
+        return VehicleFilter(
+            brand=self.brand,
+            model=self.model,
+            year=self.year,
+            max_price=self.max_price,
+            status=VehicleStatus.AVAILABLE
+        )
@@ -0,0 +1,295 @@
+import asyncio
+import csv
+import json
+import logging
+from collections import deque
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app.domain.vehicle import VehicleCreate
+from app.ports.vehicle_repository import VehicleRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ImportRowError(BaseModel):
+    line: int = Field(..., description="Linha do arquivo (1 = primeira linha)")
+    error: str = Field(..., description="Motivo da rejeição")
+
+
+class ImportResult(BaseModel):
+    total_rows: int = Field(0, description="Linhas de dados lidas")
+    inserted: int = Field(0, description="Veículos gravados")
+    failed: int = Field(0, description="Linhas rejeitadas ou não gravadas")
+    batches: int = Field(0, description="Lotes enviados ao banco")
+    errors: List[ImportRowError] = Field(default_factory=list, description="Erros por linha (limitado)")
+    errors_truncated: bool = Field(False, description="Indica se a lista de erros foi truncada")
+    aborted: bool = Field(
+        False,
+        description="A leitura parou antes do fim do arquivo; a linha e o motivo estão no último item de `errors`"
+    )
+
+
+class ImportStreamError(ValueError):
+    """Erro que impede continuar lendo o arquivo a partir de `line`."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+
+ProgressCallback = Callable[[ImportResult], None]
+
+
+class VehicleImporter:
+    """
+    Importa veículos a partir de um fluxo de bytes CSV ou NDJSON.
+
+    O arquivo é lido em pedaços e gravado em lotes de tamanho fixo; no máximo
+    `max_in_flight` lotes ficam pendentes no banco ao mesmo tempo. Quando esse
+    limite é atingido a leitura do fluxo é suspensa até um lote terminar, de
+    modo que a memória usada não depende do tamanho do arquivo.
+    """
+
+    def __init__(
+        self,
+        repository: VehicleRepository,
+        chunk_size: int = 500,
+        max_in_flight: int = 4,
+        max_errors: int = 100,
+        max_line_bytes: int = 64 * 1024,
+    ):
+        if chunk_size < 1 or max_in_flight < 1:
+            raise ValueError("chunk_size e max_in_flight devem ser maiores que zero")
+        self.repository = repository
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self.max_errors = max_errors
+        self.max_line_bytes = max_line_bytes
+
+    async def import_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        fmt: ImportFormat,
+        progress: Optional[ProgressCallback] = None,
+    ) -> ImportResult:
+        result = ImportResult()
+        pending: Set[asyncio.Task] = set()
+        batch: List[VehicleCreate] = []
+        batch_lines: List[int] = []
+
+        try:
+            try:
+                async for line_number, row in self._iter_rows(chunks, fmt, result):
+                    result.total_rows += 1
+                    try:
+                        vehicle = VehicleCreate.model_validate(row)
+                    except ValidationError as e:
+                        self._add_error(result, line_number, _format_validation_error(e))
+                        continue
+
+                    batch.append(vehicle)
+                    batch_lines.append(line_number)
+                    if len(batch) >= self.chunk_size:
+                        await self._submit(pending, batch, batch_lines, result, progress)
+                        batch, batch_lines = [], []
+            except ImportStreamError as e:
+                # O restante do arquivo é ignorado, mas o que já foi lido
+                # continua sendo gravado, para que `inserted` diga exatamente
+                # o que ficou no banco. O motivo entra em `errors` mesmo que a
+                # lista já esteja cheia.
+                result.aborted = True
+                result.failed += 1
+                result.errors.append(ImportRowError(line=e.line, error=str(e)))
+
+            if batch:
+                await self._submit(pending, batch, batch_lines, result, progress)
+            while pending:
+                await self._wait_one(pending, result, progress)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        logger.info(
+            "Importação concluída: %d linhas, %d gravadas, %d rejeitadas em %d lotes",
+            result.total_rows, result.inserted, result.failed, result.batches
+        )
+        return result
+
+    async def _submit(
+        self,
+        pending: Set[asyncio.Task],
+        batch: List[VehicleCreate],
+        lines: List[int],
+        result: ImportResult,
+        progress: Optional[ProgressCallback],
+    ) -> None:
+        # Backpressure: não lê mais nada do fluxo enquanto o limite de lotes
+        # pendentes estiver esgotado.
+        while len(pending) >= self.max_in_flight:
+            await self._wait_one(pending, result, progress)
+        result.batches += 1
+        pending.add(asyncio.create_task(self._write_batch(batch, lines)))
+
+    async def _wait_one(
+        self,
+        pending: Set[asyncio.Task],
+        result: ImportResult,
+        progress: Optional[ProgressCallback],
+    ) -> None:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            pending.discard(task)
+            inserted, lines, error = task.result()
+            result.inserted += inserted
+            not_written = len(lines) - inserted
+            if not_written:
+                self._add_error(
+                    result,
+                    lines[0],
+                    f"{not_written} linha(s) do lote {lines[0]}-{lines[-1]} não foram gravadas: {error}",
+                    count=not_written,
+                )
+        if progress:
+            progress(result)
+
+    async def _write_batch(self, batch: List[VehicleCreate], lines: List[int]) -> Tuple[int, List[int], str]:
+        try:
+            inserted = await self.repository.save_many(batch)
+            return inserted, lines, "erro de escrita no banco"
+        except Exception as e:
+            logger.error("Falha ao gravar lote das linhas %d-%d: %s", lines[0], lines[-1], e)
+            return 0, lines, str(e)
+
+    async def _iter_rows(
+        self, chunks: AsyncIterator[bytes], fmt: ImportFormat, result: ImportResult
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        lines = self._iter_lines(chunks)
+        rows = self._iter_ndjson(lines, result) if fmt == ImportFormat.NDJSON else self._iter_csv(lines, result)
+        async for line_number, row in rows:
+            yield line_number, row
+
+    async def _iter_ndjson(
+        self, lines: AsyncIterator[Tuple[int, str]], result: ImportResult
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        async for line_number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                result.total_rows += 1
+                self._add_error(result, line_number, f"JSON inválido: {e.msg}")
+                continue
+            if not isinstance(row, dict):
+                result.total_rows += 1
+                self._add_error(result, line_number, "Cada linha deve conter um objeto JSON")
+                continue
+            yield line_number, row
+
+    async def _iter_csv(
+        self, lines: AsyncIterator[Tuple[int, str]], result: ImportResult
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        # Um único csv.reader lê as linhas conforme chegam. Um registro só é
+        # entregue a ele quando as aspas estão balanceadas, então campos entre
+        # aspas com quebras de linha ficam inteiros e o reader nunca fica sem
+        # linhas no meio de um registro.
+        feed = _LineFeed()
+        reader = csv.reader(feed)
+        header: Optional[List[str]] = None
+        record_line: Optional[int] = None
+        record_bytes = 0
+        quotes = 0
+        async for line_number, line in lines:
+            if record_line is None:
+                if not line.strip():
+                    continue
+                record_line, record_bytes, quotes = line_number, 0, 0
+            feed.append(line + "\n")
+            record_bytes += len(line) + 1
+            quotes += line.count('"')
+            if quotes % 2:
+                if record_bytes > self.max_line_bytes:
+                    raise ImportStreamError(
+                        record_line, f"Registro da linha {record_line} excede o tamanho máximo de {self.max_line_bytes} bytes"
+                    )
+                continue
+
+            values = next(reader)
+            first_line, record_line = record_line, None
+            if header is None:
+                header = [column.strip() for column in values]
+                continue
+            if len(values) != len(header):
+                result.total_rows += 1
+                self._add_error(
+                    result, first_line,
+                    f"Número de colunas inválido: esperado {len(header)}, recebido {len(values)}"
+                )
+                continue
+            # Colunas vazias usam o valor padrão do modelo (ex.: status)
+            yield first_line, {k: v for k, v in zip(header, values) if v != ""}
+
+        if record_line is not None:
+            raise ImportStreamError(record_line, f"Aspas não fechadas no registro da linha {record_line}")
+
+    async def _iter_lines(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+        buffer = b""
+        line_number = 0
+        async for chunk in chunks:
+            buffer += chunk
+            if b"\n" in chunk:
+                *lines, buffer = buffer.split(b"\n")
+                for raw in lines:
+                    line_number += 1
+                    yield line_number, _decode(raw, line_number)
+            if len(buffer) > self.max_line_bytes:
+                raise ImportStreamError(
+                    line_number + 1, f"Linha {line_number + 1} excede o tamanho máximo de {self.max_line_bytes} bytes"
+                )
+        if buffer:
+            line_number += 1
+            yield line_number, _decode(buffer, line_number)
+
+    def _add_error(self, result: ImportResult, line: int, message: str, count: int = 1) -> None:
+        result.failed += count
+        if len(result.errors) < self.max_errors:
+            result.errors.append(ImportRowError(line=line, error=message))
+        else:
+            result.errors_truncated = True
+
+
+class _LineFeed:
+    """Fila de linhas lida por um csv.reader, alimentada conforme o arquivo chega."""
+
+    def __init__(self):
+        self._lines = deque()
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.popleft()
+
+
+def _decode(raw: bytes, line_number: int) -> str:
+    encoding = "utf-8-sig" if line_number == 1 else "utf-8"
+    return raw.decode(encoding, errors="replace").rstrip("\r")
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
@@ -1,7 +1,19 @@
-from typing import List, Optional
-from app.domain.vehicle import Vehicle, VehicleStatus
+from typing import Dict, List, Optional, Tuple
+from app.domain.vehicle import (
+    Vehicle,
+    VehicleStatus,
+    VehicleUpdate,
+    VehicleStatusTransition,
+    VehicleStatusRejection,
+    VehicleBulkStatusResult,
+    VehicleFilter,
+    VehicleLookupResult,
+    VehicleReservationRequest,
+    PriceAdjustmentRequest,
+    PriceAdjustmentResult,
+)
+from app.domain.exceptions import VehicleNotFoundError
 from app.ports.vehicle_repository import VehicleRepository
-from datetime import datetime
 
 class VehicleService:
     def __init__(self, vehicle_repository: VehicleRepository):
@@ -13,8 +25,19 @@ class VehicleService:
     async def get_vehicle(self, vehicle_id: str) -> Optional[Vehicle]:
         return await self.vehicle_repository.find_by_id(vehicle_id)
 
-    async def list_vehicles(self) -> List[Vehicle]:
-        return await self.vehicle_repository.find_all()
+    async def lookup_vehicles(self, vehicle_ids: List[str]) -> VehicleLookupResult:
+        requested = list(dict.fromkeys(vehicle_ids))
+        vehicles = await self.vehicle_repository.find_by_ids(requested)
+        found = {vehicle.id for vehicle in vehicles}
+        return VehicleLookupResult(
+            vehicles=vehicles,
+            missing=[vehicle_id for vehicle_id in requested if vehicle_id not in found]
+        )
+
+    async def list_vehicles(self, filters: Optional[VehicleFilter] = None) -> List[Vehicle]:
+        if filters is None or filters.is_empty():
+            return await self.vehicle_repository.find_all()
+        return await self.vehicle_repository.find_by_filter(filters)
 
     async def list_vehicles_by_status(self, status: VehicleStatus) -> List[Vehicle]:
         return await self.vehicle_repository.find_by_status(status)
@@ -25,6 +48,12 @@ class VehicleService:
     async def update_vehicle(self, vehicle: Vehicle) -> Vehicle:
         return await self.vehicle_repository.update(vehicle)
 
+    async def update_vehicle_fields(
+        self, vehicle_id: str, vehicle_update: VehicleUpdate, expected_version: Optional[int] = None
+    ) -> Vehicle:
+        fields = vehicle_update.model_dump(exclude_unset=True, exclude_none=True, exclude={"version"})
+        return await self.vehicle_repository.update_fields(vehicle_id, fields, expected_version)
+
     async def delete_vehicle(self, vehicle_id: str) -> None:
         await self.vehicle_repository.delete(vehicle_id)
 
@@ -33,15 +62,59 @@ class VehicleService:
         if not vehicle:
             raise ValueError("Veículo não encontrado")
         
-        if status == VehicleStatus.SOLD:
-            vehicle.mark_as_sold()
-        elif status == VehicleStatus.RESERVED:
-            vehicle.mark_as_pending()
-        elif status == VehicleStatus.AVAILABLE:
-            if vehicle.status == VehicleStatus.RESERVED:
-                vehicle.status = VehicleStatus.AVAILABLE
-                vehicle.updated_at = datetime.now()
+        vehicle.transition_to(status)
+        return await self.update_vehicle(vehicle)
+
+    async def reserve_any_vehicle(self, criteria: VehicleReservationRequest) -> Vehicle:
+        vehicle = await self.vehicle_repository.reserve_first_available(criteria.to_filter())
+        if not vehicle:
+            raise VehicleNotFoundError("Nenhum veículo disponível para os critérios informados")
+        return vehicle
+
+    async def bulk_update_vehicle_status(
+        self, transitions: List[VehicleStatusTransition]
+    ) -> VehicleBulkStatusResult:
+        result = VehicleBulkStatusResult()
+        requested: Dict[str, VehicleStatus] = {}
+        for transition in transitions:
+            if transition.vehicle_id in requested:
+                result.rejected.append(VehicleStatusRejection(
+                    vehicle_id=transition.vehicle_id, reason="Veículo repetido na requisição"
+                ))
+                continue
+            requested[transition.vehicle_id] = transition.status
+
+        vehicles = {v.id: v for v in await self.vehicle_repository.find_by_ids(list(requested))}
+
+        changes: List[Tuple[str, VehicleStatus, VehicleStatus]] = []
+        for vehicle_id, status in requested.items():
+            vehicle = vehicles.get(vehicle_id)
+            if not vehicle:
+                result.rejected.append(VehicleStatusRejection(vehicle_id=vehicle_id, reason="Veículo não encontrado"))
+                continue
+            previous_status = vehicle.status
+            try:
+                vehicle.transition_to(status)
+            except ValueError as e:
+                result.rejected.append(VehicleStatusRejection(vehicle_id=vehicle_id, reason=str(e)))
+                continue
+            changes.append((vehicle_id, previous_status, status))
+
+        transitioned = set(await self.vehicle_repository.bulk_update_status(changes))
+        for vehicle_id, _, _ in changes:
+            if vehicle_id in transitioned:
+                result.transitioned.append(vehicle_id)
             else:
-                raise ValueError("Apenas veículos reservados podem ser marcados como disponíveis")
-        
-        return await self.update_vehicle(vehicle) 
\ No newline at end of file
+                result.rejected.append(VehicleStatusRejection(
+                    vehicle_id=vehicle_id, reason="Status do veículo foi alterado por outra operação"
+                ))
+        return result
+
+    async def adjust_prices(
+        self, adjustment: PriceAdjustmentRequest, dry_run: bool = False, buckets: int = 10
+    ) -> PriceAdjustmentResult:
+        # Assim como Vehicle.update, só veículos disponíveis podem ser alterados
+        if adjustment.filter.status not in (None, VehicleStatus.AVAILABLE):
+            raise ValueError("Apenas veículos disponíveis podem ter o preço ajustado")
+        filters = adjustment.filter.model_copy(update={"status": VehicleStatus.AVAILABLE})
+        return await self.vehicle_repository.adjust_prices(filters, adjustment.rule, dry_run=dry_run, buckets=buckets)
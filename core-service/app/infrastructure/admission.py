@@ -0,0 +1,146 @@
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.infrastructure import metrics
+from app.infrastructure.mongo_monitoring import POOL_MONITOR
+
+load_dotenv()
+
+READ = "read"
+WRITE = "write"
+WEBHOOK = "webhook"
+# Rotas fora do controle de admissão
+EXEMPT = "exempt"
+
+ROUTE_CLASSES = (READ, WRITE, WEBHOOK)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+# Requisições simultâneas por classe; 0 desativa o limite
+ADMISSION_MAX_READS = int(os.getenv("ADMISSION_MAX_READS", "100"))
+ADMISSION_MAX_WRITES = int(os.getenv("ADMISSION_MAX_WRITES", "0"))
+ADMISSION_MAX_WEBHOOKS = int(os.getenv("ADMISSION_MAX_WEBHOOKS", "0"))
+# Operações aguardando conexão no pool a partir das quais leituras são recusadas; 0 desativa
+ADMISSION_POOL_WAITERS_LIMIT = int(os.getenv("ADMISSION_POOL_WAITERS_LIMIT", "10"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+# JSON com a classe por prefixo de caminho, valendo o mais longo; sem prefixo,
+# GET e HEAD são leituras e os demais métodos, escritas
+ADMISSION_ROUTE_CLASSES: Dict[str, str] = json.loads(os.getenv(
+    "ADMISSION_ROUTE_CLASSES",
+    '{"/vehicles/lookup": "read", "/metrics": "exempt", "/admin": "exempt", "/docs": "exempt", "/openapi.json": "exempt"}'
+))
+
+ADMISSION_IN_FLIGHT = metrics.gauge(
+    "core_admission_in_flight",
+    "Requisições em andamento, por classe de rota",
+    ["route_class"]
+)
+ADMISSION_REJECTED = metrics.counter(
+    "core_admission_rejected_total",
+    "Requisições recusadas com 503 pelo controle de admissão, por classe de rota e motivo (limit, pool)",
+    ["route_class", "reason"]
+)
+
+
+class AdmissionController:
+    """
+    Conta as requisições em andamento por classe de rota e decide quais
+    entram. Leituras são as primeiras a sair: além do próprio limite, são
+    recusadas quando o pool do MongoDB já tem operações esperando conexão,
+    pois aceitá-las só aumentaria a fila até tudo estourar o prazo. Escritas
+    (como as reservas feitas pelo sales-service) só são recusadas pelo
+    próprio limite, desligado por padrão.
+
+    Roda só no event loop, então os contadores dispensam lock.
+    """
+
+    def __init__(
+        self,
+        max_reads: int = ADMISSION_MAX_READS,
+        max_writes: int = ADMISSION_MAX_WRITES,
+        max_webhooks: int = ADMISSION_MAX_WEBHOOKS,
+        pool_waiters_limit: int = ADMISSION_POOL_WAITERS_LIMIT,
+        retry_after_seconds: int = ADMISSION_RETRY_AFTER_SECONDS,
+        route_classes: Optional[Dict[str, str]] = None,
+        pool_waiters: Callable[[], int] = POOL_MONITOR.waiters,
+    ):
+        route_classes = ADMISSION_ROUTE_CLASSES if route_classes is None else route_classes
+        invalid = set(route_classes.values()) - {*ROUTE_CLASSES, EXEMPT}
+        if invalid:
+            raise ValueError(f"Classes de rota inválidas: {', '.join(sorted(invalid))}")
+        self.limits = {READ: max_reads, WRITE: max_writes, WEBHOOK: max_webhooks}
+        self.pool_waiters_limit = pool_waiters_limit
+        self.retry_after_seconds = retry_after_seconds
+        self.pool_waiters = pool_waiters
+        self.in_flight = dict.fromkeys(ROUTE_CLASSES, 0)
+        self.prefixes = sorted(route_classes.items(), key=lambda item: len(item[0]), reverse=True)
+        self._gauges = {route_class: ADMISSION_IN_FLIGHT.labels(route_class) for route_class in ROUTE_CLASSES}
+
+    def classify(self, method: str, path: str) -> str:
+        for prefix, route_class in self.prefixes:
+            if path.startswith(prefix):
+                return route_class
+        return READ if method in ("GET", "HEAD") else WRITE
+
+    def rejection(self, route_class: str) -> Optional[str]:
+        """Motivo para recusar uma requisição da classe agora, ou None."""
+        limit = self.limits[route_class]
+        if limit and self.in_flight[route_class] >= limit:
+            return "limit"
+        if route_class == READ and self.pool_waiters_limit and self.pool_waiters() >= self.pool_waiters_limit:
+            return "pool"
+        return None
+
+    def enter(self, route_class: str) -> None:
+        self.in_flight[route_class] += 1
+        self._gauges[route_class].inc()
+
+    def leave(self, route_class: str) -> None:
+        self.in_flight[route_class] -= 1
+        self._gauges[route_class].dec()
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI do controle de admissão. Recusa antes de ler o corpo da
+    requisição, com 503 e Retry-After, para que a recusa custe pouco.
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        if route_class == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        reason = self.controller.rejection(route_class)
+        if reason is not None:
+            ADMISSION_REJECTED.labels(route_class, reason).inc()
+            await _send_overloaded(send, self.controller.retry_after_seconds)
+            return
+        self.controller.enter(route_class)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.leave(route_class)
+
+
+async def _send_overloaded(send, retry_after_seconds: int) -> None:
+    body = json.dumps({"detail": "Serviço sobrecarregado; tente novamente em instantes"}, ensure_ascii=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after_seconds).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
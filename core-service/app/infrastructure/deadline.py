@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+import pymongo
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tempo restante, em milissegundos, que o chamador ainda espera pela resposta
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+
+DEADLINE_ENABLED = os.getenv("DEADLINE_ENABLED", "true").lower() == "true"
+DEFAULT_TIMEOUT_MS = int(os.getenv("DEADLINE_DEFAULT_TIMEOUT_MS", "10000"))
+MAX_TIMEOUT_MS = int(os.getenv("DEADLINE_MAX_TIMEOUT_MS", "600000"))
+# Prazo padrão por prefixo de caminho; vale o prefixo mais longo. A importação
+# lê arquivos grandes e precisa de mais tempo que as demais rotas.
+ROUTE_TIMEOUTS_MS: Dict[str, int] = json.loads(
+    os.getenv("DEADLINE_ROUTE_TIMEOUTS_MS", '{"/vehicles/import": 600000}')
+)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes até o prazo da requisição atual, ou None se não houver prazo."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+@contextmanager
+def deadline_scope(timeout_seconds: float) -> Iterator[None]:
+    """
+    Define o prazo do bloco. As operações do MongoDB feitas dentro dele
+    recebem o tempo restante como maxTimeMS (pymongo.timeout).
+    """
+    token = _deadline.set(time.monotonic() + timeout_seconds)
+    try:
+        with pymongo.timeout(max(timeout_seconds, 0.001)):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """
+    Middleware ASGI que define o prazo de cada requisição HTTP.
+
+    O prazo vem do cabeçalho X-Request-Timeout-Ms, enviado pelo
+    sales-service com o tempo que lhe resta (limitado a `max_timeout_ms`), ou,
+    sem ele, do padrão da rota. Ao fim do prazo o processamento é cancelado e
+    o cliente recebe 504; erros 5xx causados pelo prazo esgotado (por exemplo,
+    maxTimeMS no MongoDB) também viram 504.
+    """
+
+    def __init__(
+        self,
+        app,
+        default_timeout_ms: int = DEFAULT_TIMEOUT_MS,
+        max_timeout_ms: int = MAX_TIMEOUT_MS,
+        route_timeouts_ms: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.default_timeout_ms = default_timeout_ms
+        self.max_timeout_ms = max_timeout_ms
+        self.route_timeouts_ms = ROUTE_TIMEOUTS_MS if route_timeouts_ms is None else route_timeouts_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self._timeout_seconds(scope)
+        response_started = False
+        replaced = False
+
+        async def send_with_deadline(message):
+            nonlocal response_started, replaced
+            if message["type"] == "http.response.start":
+                if message["status"] >= 500 and expired():
+                    replaced = True
+                    await _send_timeout(scope, send)
+                    return
+                response_started = True
+            elif replaced:
+                return
+            await send(message)
+
+        async def call_app():
+            with deadline_scope(timeout):
+                await self.app(scope, receive, send_with_deadline)
+
+        deadline = time.monotonic() + timeout
+        try:
+            await asyncio.wait_for(call_app(), timeout)
+        except asyncio.TimeoutError:
+            # TimeoutError levantado pela própria rota antes do prazo não é nosso
+            if time.monotonic() < deadline:
+                raise
+            if not response_started and not replaced:
+                await _send_timeout(scope, send)
+
+    def _timeout_seconds(self, scope) -> float:
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-timeout-ms":
+                try:
+                    timeout_ms = int(value)
+                except ValueError:
+                    break
+                if timeout_ms > 0:
+                    return min(timeout_ms, self.max_timeout_ms) / 1000
+                break
+
+        path = scope.get("path", "")
+        timeout_ms, matched = self.default_timeout_ms, ""
+        for prefix, route_timeout_ms in self.route_timeouts_ms.items():
+            if path.startswith(prefix) and len(prefix) > len(matched):
+                timeout_ms, matched = route_timeout_ms, prefix
+        return timeout_ms / 1000
+
+
+async def _send_timeout(scope, send) -> None:
+    logger.warning("Prazo esgotado em %s %s", scope.get("method"), scope.get("path"))
+    body = json.dumps({"detail": "Prazo da requisição esgotado"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 504,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,141 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.infrastructure import metrics
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" ou "json"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# JSON com a fração das requisições, por prefixo de caminho, cujos logs abaixo
+# de WARNING são mantidos; vale o prefixo mais longo. Ex.: {"/vehicles": 0.1}
+LOG_SAMPLING: Dict[str, float] = json.loads(os.getenv("LOG_SAMPLING") or "{}")
+
+LOG_RECORDS_DROPPED = metrics.counter(
+    "core_log_records_dropped_total",
+    "Registros de log descartados porque a fila do log estava cheia"
+)
+
+# Atributos padrão do LogRecord; os demais vieram de `extra` e viram campos no JSON
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Se os logs abaixo de WARNING da requisição atual devem ser mantidos
+_keep_verbose: ContextVar[bool] = ContextVar("log_keep_verbose", default=True)
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos passados em `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que não formata o registro na thread de quem logou: a
+    mensagem, os argumentos e os campos extras são formatados pela thread do
+    QueueListener. (O prepare() padrão formata tudo antes de enfileirar,
+    pensando em filas entre processos.) Com a fila cheia, o registro é
+    descartado e contado, em vez de bloquear o event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class SamplingFilter(logging.Filter):
+    """Descarta registros abaixo de WARNING das requisições fora da amostra."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _keep_verbose.get()
+
+
+class LogSamplingMiddleware:
+    """
+    Middleware ASGI que sorteia, uma vez por requisição, se os logs abaixo de
+    WARNING dela serão mantidos, conforme a taxa do prefixo de caminho. Assim
+    uma requisição amostrada tem todos os seus logs, e as demais nenhum.
+    """
+
+    def __init__(self, app, sampling: Optional[Dict[str, float]] = None):
+        self.app = app
+        sampling = LOG_SAMPLING if sampling is None else sampling
+        self.prefixes = sorted(sampling.items(), key=lambda item: len(item[0]), reverse=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        rate = next((rate for prefix, rate in self.prefixes if path.startswith(prefix)), None)
+        if rate is None:
+            await self.app(scope, receive, send)
+            return
+        token = _keep_verbose.set(random.random() < rate)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _keep_verbose.reset(token)
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    format: str = LOG_FORMAT,
+    queue_size: int = LOG_QUEUE_SIZE
+) -> logging.handlers.QueueListener:
+    """
+    Substitui os handlers do logger raiz (e dos loggers do uvicorn) por um
+    LazyQueueHandler; um QueueListener em thread própria formata e escreve os
+    registros. Retorna o listener, que deve ser parado no desligamento.
+    """
+    formatter: logging.Formatter
+    if format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    output = logging.StreamHandler()
+    output.setFormatter(formatter)
+
+    records: queue.Queue = queue.Queue(queue_size)
+    handler = LazyQueueHandler(records)
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    listener.start()
+    return listener
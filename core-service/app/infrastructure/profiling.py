@@ -0,0 +1,212 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from starlette.routing import Match
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+# Perfis cProfile de requisições reais, ligados sob demanda pelas rotas de
+# administração. Com PROFILING_ENABLED falso o middleware nem é instalado.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_DIRECTORY = os.getenv("PROFILING_DIRECTORY", "profiles")
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+# Cabeçalho que pede o perfil de uma requisição; o valor deve ser o token de administração
+PROFILING_DEBUG_HEADER = os.getenv("PROFILING_DEBUG_HEADER", "X-Debug-Profile")
+
+
+@dataclass
+class ProfileInfo:
+    name: str
+    method: str
+    route: str
+    path: str
+    status: int
+    duration_ms: float
+    created_at: str
+    trigger: str
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+class RequestProfiler:
+    """
+    Estado do profiling: rotas armadas com o número de requisições que ainda
+    serão medidas e os perfis já gravados em disco.
+
+    Só uma requisição é medida por vez. O cProfile mede a thread do event
+    loop enquanto a requisição está em andamento, então o perfil também
+    inclui o que outras requisições executaram no mesmo intervalo.
+    """
+
+    def __init__(
+        self,
+        admin_token: str = "",
+        directory: str = PROFILING_DIRECTORY,
+        max_files: int = PROFILING_MAX_FILES,
+        debug_header: str = PROFILING_DEBUG_HEADER,
+    ):
+        self.admin_token = admin_token
+        self.directory = directory
+        self.max_files = max_files
+        self.debug_header = debug_header
+        self.armed: Dict[Tuple[str, str], int] = {}
+        self.profiles = deque()
+        self._running = False
+
+    def arm(self, method: str, route: str, requests: int) -> None:
+        self.armed[(method.upper(), route)] = requests
+
+    def disarm(self) -> None:
+        self.armed.clear()
+
+    @property
+    def header_enabled(self) -> bool:
+        return bool(self.debug_header and self.admin_token)
+
+    @property
+    def active(self) -> bool:
+        """Se há algo a medir; caso contrário o middleware só repassa a requisição."""
+        return bool(self.armed) or self.header_enabled
+
+    def _header_requested(self, scope) -> bool:
+        if not self.header_enabled:
+            return False
+        header = self.debug_header.lower().encode("latin-1")
+        for key, value in scope.get("headers", []):
+            if key == header:
+                return hmac.compare_digest(value, self.admin_token.encode("latin-1"))
+        return False
+
+    def claim(self, scope) -> Optional[Tuple[str, str]]:
+        """
+        Decide se a requisição será medida; retorna (rota, gatilho) ou None.
+        Consome uma das requisições armadas da rota.
+        """
+        if self._running:
+            return None
+        if self._header_requested(scope):
+            route, trigger = self._match_route(scope), "header"
+        elif self.armed:
+            route, trigger = self._match_route(scope), "armed"
+            key = (scope["method"], route)
+            remaining = self.armed.get(key)
+            if not remaining:
+                return None
+            if remaining == 1:
+                del self.armed[key]
+            else:
+                self.armed[key] = remaining - 1
+        else:
+            return None
+        self._running = True
+        return route, trigger
+
+    def _match_route(self, scope) -> str:
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return scope["path"]
+
+    async def save(self, profile: cProfile.Profile, info: ProfileInfo) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            await asyncio.to_thread(profile.dump_stats, self.path(info.name))
+        except Exception as e:
+            logger.error(f"Erro ao gravar o perfil {info.name}: {str(e)}")
+            return
+        self.profiles.append(info)
+        while len(self.profiles) > self.max_files:
+            old = self.profiles.popleft()
+            try:
+                os.remove(self.path(old.name))
+            except OSError:
+                pass
+        logger.info(f"Perfil gravado: {info.name} ({info.method} {info.route}, {info.duration_ms} ms)")
+
+    def release(self) -> None:
+        self._running = False
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def find(self, name: str) -> Optional[ProfileInfo]:
+        """Perfil gravado com esse nome; só esses podem ser baixados."""
+        return next((info for info in self.profiles if info.name == name), None)
+
+    def list_profiles(self) -> List[dict]:
+        return [asdict(info) for info in reversed(self.profiles)]
+
+    def summary(self, name: str, top: int = 30) -> str:
+        """Funções com maior tempo acumulado, no formato texto do pstats."""
+        output = io.StringIO()
+        pstats.Stats(self.path(name), stream=output).sort_stats("cumulative").print_stats(top)
+        return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que mede com cProfile as requisições pedidas pelo
+    RequestProfiler e grava cada perfil em disco (.prof, para pstats ou
+    snakeviz). Sem rota armada e sem o cabeçalho de depuração, só repassa a
+    requisição.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        claimed = self.profiler.claim(scope) if scope["type"] == "http" and self.profiler.active else None
+        if claimed is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, trigger = claimed
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.disable()
+            duration = time.perf_counter() - started
+            self.profiler.release()
+            created = datetime.now(timezone.utc)
+            info = ProfileInfo(
+                name=f"{created:%Y%m%dT%H%M%S%f}-{scope['method']}-{_slug(route)}.prof",
+                method=scope["method"],
+                route=route,
+                path=scope["path"],
+                status=status,
+                duration_ms=round(duration * 1000, 3),
+                created_at=created.isoformat(),
+                trigger=trigger,
+            )
+            await self.profiler.save(profile, info)
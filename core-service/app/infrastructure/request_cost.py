@@ -0,0 +1,90 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Custo da requisição em andamento; None fora de uma requisição medida
+_current: ContextVar[Optional["RequestCost"]] = ContextVar("request_cost", default=None)
+
+
+class RequestCost:
+    """
+    Custo acumulado de uma requisição: comandos do MongoDB e as fases medidas
+    pela rota (validação, endpoint e serialização).
+
+    Os comandos do MongoDB são registrados pelas threads do Motor, que
+    recebem uma cópia do contexto da requisição, por isso a contagem usa um
+    lock.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mongo_commands = 0
+        self.mongo_documents = 0
+        self.mongo_seconds = 0.0
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+        self.validation_seconds: Optional[float] = None
+        self.serialization_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_mongo(self, seconds: float, documents: int = 0) -> None:
+        with self._lock:
+            self.mongo_commands += 1
+            self.mongo_documents += documents
+            self.mongo_seconds += seconds
+
+    def server_timing(self) -> str:
+        """Valor do cabeçalho Server-Timing, com as durações em milissegundos."""
+        entries = []
+        if self.validation_seconds is not None:
+            entries.append(f"validation;dur={self.validation_seconds * 1000:.1f}")
+        if self.endpoint_started is not None and self.endpoint_finished is not None:
+            entries.append(f"app;dur={(self.endpoint_finished - self.endpoint_started) * 1000:.1f}")
+        if self.mongo_commands:
+            entries.append(
+                f'mongo;dur={self.mongo_seconds * 1000:.1f};'
+                f'desc="comandos={self.mongo_commands} documentos={self.mongo_documents}"'
+            )
+        if self.serialization_seconds is not None:
+            entries.append(f"serialization;dur={self.serialization_seconds * 1000:.1f}")
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def current() -> Optional[RequestCost]:
+    return _current.get()
+
+
+def record_mongo(seconds: float, documents: int = 0) -> None:
+    cost = _current.get()
+    if cost is not None:
+        cost.add_mongo(seconds, documents)
+
+
+@contextmanager
+def track() -> Iterator[RequestCost]:
+    """Acumula em um novo RequestCost os custos do bloco."""
+    cost = RequestCost()
+    token = _current.set(cost)
+    try:
+        yield cost
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def round_trip_budget(mongo: int) -> Iterator[RequestCost]:
+    """
+    Falha com AssertionError se o bloco fizer mais comandos ao MongoDB que o
+    permitido. Usado nos testes para pegar regressões N+1:
+
+        with round_trip_budget(mongo=1):
+            await client.post("/vehicles/lookup", json={"ids": ids})
+    """
+    with track() as cost:
+        yield cost
+    assert cost.mongo_commands <= mongo, (
+        f"{cost.mongo_commands} comandos ao MongoDB, o limite é {mongo}"
+    )
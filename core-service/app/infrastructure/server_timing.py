@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import os
+import time
+from typing import Callable
+
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+
+from app.infrastructure import request_cost
+
+
+load_dotenv()
+
+# Cabeçalho Server-Timing nas respostas, para depuração de desempenho
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    """Marca o início e o fim do endpoint no custo da requisição."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def timed(**values):
+            cost = request_cost.current()
+            if cost is not None:
+                cost.endpoint_started = time.perf_counter()
+            try:
+                return await call(**values)
+            finally:
+                if cost is not None:
+                    cost.endpoint_finished = time.perf_counter()
+    else:
+        @functools.wraps(call)
+        def timed(**values):
+            cost = request_cost.current()
+            if cost is not None:
+                cost.endpoint_started = time.perf_counter()
+            try:
+                return call(**values)
+            finally:
+                if cost is not None:
+                    cost.endpoint_finished = time.perf_counter()
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """
+    Rota que separa o tempo da requisição em validação (leitura do corpo e
+    dependências), endpoint e serialização da resposta. Só mede quando há um
+    RequestCost no contexto, criado pelo ServerTimingMiddleware.
+    """
+
+    def get_route_handler(self):
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            cost = request_cost.current()
+            if cost is None:
+                return await handler(request)
+            started = time.perf_counter()
+            response = await handler(request)
+            if cost.endpoint_started is not None and cost.endpoint_finished is not None:
+                cost.validation_seconds = cost.endpoint_started - started
+                cost.serialization_seconds = time.perf_counter() - cost.endpoint_finished
+            return response
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que acumula o custo de cada requisição e o devolve no
+    cabeçalho Server-Timing: validação, endpoint, MongoDB (comandos e
+    documentos), serialização e total.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_cost.track() as cost:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", cost.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.infrastructure import metrics
+from app.infrastructure.deadline import deadline_scope
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Idade, em segundos, da resposta servida a partir do último resultado bom
+STALENESS_HEADER = "X-Stale-Age"
+
+SWR_ENABLED = os.getenv("SWR_ENABLED", "true").lower() == "true"
+# Tempo que a consulta ao vivo tem antes de a última lista boa ser servida
+SWR_LATENCY_BUDGET_MS = float(os.getenv("SWR_LATENCY_BUDGET_MS", "800"))
+# Resultados mais antigos que isso não são servidos; a requisição espera a consulta
+SWR_MAX_STALE_SECONDS = float(os.getenv("SWR_MAX_STALE_SECONDS", "300"))
+# Prazo da consulta de atualização, que roda fora do prazo da requisição
+SWR_REFRESH_TIMEOUT_SECONDS = float(os.getenv("SWR_REFRESH_TIMEOUT_SECONDS", "30"))
+
+SWR_RESPONSES = metrics.counter(
+    "core_swr_responses_total",
+    "Respostas das rotas com stale-while-revalidate, por resultado (fresh, stale, stale_error)",
+    ["cache", "result"]
+)
+SWR_REFRESHES = metrics.counter(
+    "core_swr_refreshes_total",
+    "Consultas de atualização das rotas com stale-while-revalidate, por resultado (ok, error)",
+    ["cache", "result"]
+)
+
+
+class StaleWhileRevalidate:
+    """
+    Guarda o último resultado bom de cada chave e o serve quando a consulta
+    ao vivo passa do orçamento de latência ou falha.
+
+    Cada chave tem no máximo uma consulta em andamento: requisições
+    simultâneas aguardam a mesma. A consulta roda numa tarefa própria, com
+    contexto vazio (sem o prazo, o trace e o custo da requisição que a
+    iniciou) e prazo `refresh_timeout_seconds`, então continua em segundo
+    plano depois que a requisição recebe o resultado antigo e atualiza o
+    snapshot ao terminar.
+
+    Sem snapshot, ou com um mais antigo que `max_stale_seconds`, a
+    requisição espera a consulta como antes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency_budget_ms: float = SWR_LATENCY_BUDGET_MS,
+        max_stale_seconds: float = SWR_MAX_STALE_SECONDS,
+        refresh_timeout_seconds: float = SWR_REFRESH_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.latency_budget = latency_budget_ms / 1000
+        self.max_stale_seconds = max_stale_seconds
+        self.refresh_timeout_seconds = refresh_timeout_seconds
+        self._clock = clock
+        self._snapshots: Dict[Hashable, Tuple[float, Any]] = {}
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._fresh = SWR_RESPONSES.labels(name, "fresh")
+        self._stale = SWR_RESPONSES.labels(name, "stale")
+        self._stale_error = SWR_RESPONSES.labels(name, "stale_error")
+        self._refresh_ok = SWR_REFRESHES.labels(name, "ok")
+        self._refresh_error = SWR_REFRESHES.labels(name, "error")
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, Optional[float]]:
+        """
+        Retorna (valor, idade): idade None para o resultado da consulta ao
+        vivo, ou os segundos desde que o snapshot servido foi obtido.
+        """
+        refresh = self._refresh(key, loader)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and self._clock() - snapshot[0] > self.max_stale_seconds:
+            snapshot = None
+        if snapshot is None:
+            value = await asyncio.shield(refresh)
+            self._fresh.inc()
+            return value, None
+
+        done, _ = await asyncio.wait({refresh}, timeout=self.latency_budget)
+        if done and refresh.exception() is None:
+            self._fresh.inc()
+            return refresh.result(), None
+        fetched_at, value = snapshot
+        if done:
+            self._stale_error.inc()
+        else:
+            self._stale.inc()
+        return value, max(self._clock() - fetched_at, 0.0)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Consulta em andamento da chave, iniciando uma se não houver."""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader), context=contextvars.Context())
+            self._refreshing[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        with deadline_scope(self.refresh_timeout_seconds):
+            value = await asyncio.wait_for(loader(), self.refresh_timeout_seconds)
+        self._snapshots[key] = (self._clock(), value)
+        return value
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            self._refresh_ok.inc()
+        else:
+            self._refresh_error.inc()
+            logger.warning("Falha ao atualizar %s[%s]: %r", self.name, key, error)
+
+    async def close(self) -> None:
+        """Cancela as consultas em andamento; chamado no desligamento."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,361 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho W3C Trace Context: 00-<trace id>-<span id>-<flags>
+TRACEPARENT_HEADER = "traceparent"
+
+KIND_SERVER = "server"
+KIND_CLIENT = "client"
+KIND_INTERNAL = "internal"
+
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "core-service")
+# "memory" guarda os spans em memória; "json" grava um span por linha em TRACING_JSON_PATH
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "memory")
+TRACING_JSON_PATH = os.getenv("TRACING_JSON_PATH", "traces.jsonl")
+TRACING_MEMORY_MAX_SPANS = int(os.getenv("TRACING_MEMORY_MAX_SPANS", "10000"))
+# Novos traces iniciados por segundo; os demais não são amostrados
+TRACING_MAX_TRACES_PER_SECOND = float(os.getenv("TRACING_MAX_TRACES_PER_SECOND", "10"))
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """Lê o cabeçalho traceparent; None se ausente ou inválido."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        trace_id, span_id, flags = int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[0] == "ff" or trace_id == 0 or span_id == 0:
+        return None
+    return SpanContext(parts[1].lower(), parts[2].lower(), bool(flags & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+class Span:
+    """Operação medida dentro de um trace."""
+
+    __slots__ = ("name", "context", "parent_id", "kind", "service", "start_time", "duration",
+                 "attributes", "status", "error", "_started")
+
+    def __init__(self, name: str, context: SpanContext, parent_id: Optional[str], kind: str, service: str,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.service = service
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": self.service,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Span usado quando o rastreamento está desativado."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Destino dos spans finalizados e amostrados."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """Guarda os últimos `max_spans` spans em memória, para testes e depuração."""
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def traces(self) -> Dict[str, List[Span]]:
+        """Spans agrupados por trace, na ordem de início."""
+        traces: Dict[str, List[Span]] = {}
+        for span in sorted(self._spans, key=lambda span: span.start_time):
+            traces.setdefault(span.context.trace_id, []).append(span)
+        return traces
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class JsonFileExporter(SpanExporter):
+    """
+    Grava cada span como uma linha JSON, para análise local (jq, pandas).
+    A escrita é síncrona e com buffer de linha: serve para desenvolvimento,
+    não para produção.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RateLimitedSampler:
+    """
+    Decide se um novo trace é amostrado, limitando a `max_per_second` traces
+    por segundo (balde de fichas com capacidade de um segundo, e no mínimo
+    uma ficha, para que taxas abaixo de 1 ainda amostrem). Traces que
+    chegam de outro serviço seguem a decisão de quem os iniciou.
+    """
+
+    def __init__(self, max_per_second: float, clock=time.monotonic):
+        self.max_per_second = max_per_second
+        self._capacity = max(1.0, max_per_second) if max_per_second > 0 else 0.0
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated = clock()
+
+    def should_sample(self) -> bool:
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.max_per_second)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+# Span em andamento na tarefa ou thread atual
+_current: ContextVar[Optional[SpanContext]] = ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    def __init__(self, service_name: str, exporter: SpanExporter, sampler: RateLimitedSampler):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sampler = sampler
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        kind: str = KIND_INTERNAL,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Span]:
+        """
+        Abre um span filho do span atual (ou de `parent`, vindo de outro
+        serviço). Sem pai, inicia um trace novo se o sampler permitir.
+        Exceções marcam o span como erro e são relançadas.
+        """
+        parent = parent or _current.get()
+        if parent is None:
+            context = SpanContext(_new_id(128), _new_id(64), self.sampler.should_sample())
+        else:
+            context = SpanContext(parent.trace_id, _new_id(64), parent.sampled)
+        span = Span(name, context, parent.span_id if parent else None, kind, self.service_name, attributes)
+        token = _current.set(context)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+            if context.sampled:
+                try:
+                    self.exporter.export(span)
+                except Exception as e:
+                    logger.warning(f"Erro ao exportar span {span.name}: {str(e)}")
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Instala o tracer do processo; retorna o anterior."""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def configure(enabled: bool = TRACING_ENABLED, exporter_name: str = TRACING_EXPORTER) -> Optional[Tracer]:
+    """Cria e instala o tracer conforme as configurações; None se desativado."""
+    if not enabled:
+        return None
+    if exporter_name == "json":
+        exporter: SpanExporter = JsonFileExporter(TRACING_JSON_PATH)
+    elif exporter_name == "memory":
+        exporter = InMemoryExporter(TRACING_MEMORY_MAX_SPANS)
+    else:
+        raise ValueError(f"Exportador de traces desconhecido: {exporter_name}")
+    tracer = Tracer(TRACING_SERVICE_NAME, exporter, RateLimitedSampler(TRACING_MAX_TRACES_PER_SECOND))
+    set_tracer(tracer)
+    return tracer
+
+
+def shutdown() -> None:
+    tracer = set_tracer(None)
+    if tracer is not None:
+        tracer.shutdown()
+
+
+@contextmanager
+def span(name: str, kind: str = KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+    """Abre um span no tracer do processo; sem tracer, não faz nada."""
+    tracer = _tracer
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+    with tracer.start_span(name, kind, attributes=attributes) as current_span:
+        yield current_span
+
+
+def trace_methods(cls):
+    """
+    Decorador de classe que abre um span em cada método assíncrono público,
+    nomeado `Classe.método`. Usado no repositório do MongoDB.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _traced_method(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _traced_method(span_name: str, method):
+    @functools.wraps(method)
+    async def traced(self, *args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return await method(self, *args, **kwargs)
+        collection = getattr(getattr(self, "collection", None), "name", None)
+        attributes = {"db.system": "mongodb", "db.collection": collection} if isinstance(collection, str) else None
+        with tracer.start_span(span_name, attributes=attributes):
+            return await method(self, *args, **kwargs)
+    return traced
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre o span de servidor de cada requisição,
+    continuando o trace recebido no cabeçalho traceparent (enviado pelo
+    sales-service). O span recebe o template da rota, como nas métricas HTTP.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        tracer = _tracer
+        if scope["type"] != "http" or tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        with tracer.start_span(f"{method} {scope['path']}", KIND_SERVER, parent=parent,
+                               attributes={"http.method": method, "http.target": scope["path"]}) as server_span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    server_span.name = f"{method} {route.path}"
+                    server_span.set_attribute("http.route", route.path)
+                server_span.set_attribute("http.status_code", status)
+                if status >= 500:
+                    server_span.status = "error"
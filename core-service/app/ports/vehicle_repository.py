@@ -1,16 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from app.domain.vehicle import Vehicle
+from typing import List, Optional, Tuple
+from app.domain.vehicle import (
+    Vehicle,
+    VehicleCreate,
+    VehicleStatus,
+    VehicleFilter,
+    PriceRule,
+    PriceAdjustmentResult,
+)
 
 class VehicleRepository(ABC):
     @abstractmethod
     async def save(self, vehicle: Vehicle) -> Vehicle:
         pass
 
+    @abstractmethod
+    async def save_many(self, vehicles: List[VehicleCreate]) -> int:
+        pass
+
     @abstractmethod
     async def find_by_id(self, vehicle_id: str) -> Optional[Vehicle]:
         pass
 
+    @abstractmethod
+    async def find_by_ids(self, vehicle_ids: List[str]) -> List[Vehicle]:
+        pass
+
     @abstractmethod
     async def find_all(self) -> List[Vehicle]:
         pass
@@ -19,10 +34,36 @@ class VehicleRepository(ABC):
     async def find_available(self) -> List[Vehicle]:
         pass
 
+    @abstractmethod
+    async def find_by_filter(self, filters: VehicleFilter) -> List[Vehicle]:
+        pass
+
+    @abstractmethod
+    async def adjust_prices(
+        self, filters: VehicleFilter, rule: PriceRule, dry_run: bool = False, buckets: int = 10
+    ) -> PriceAdjustmentResult:
+        pass
+
     @abstractmethod
     async def update(self, vehicle: Vehicle) -> Vehicle:
         pass
 
+    @abstractmethod
+    async def reserve_first_available(self, filters: VehicleFilter) -> Optional[Vehicle]:
+        pass
+
+    @abstractmethod
+    async def bulk_update_status(
+        self, changes: List[Tuple[str, VehicleStatus, VehicleStatus]]
+    ) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def update_fields(
+        self, vehicle_id: str, fields: dict, expected_version: Optional[int] = None
+    ) -> Vehicle:
+        pass
+
     @abstractmethod
     async def delete(self, vehicle_id: str) -> None:
         pass 
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Microbenchmark do custo do MetricsMiddleware por requisição.
+
+Chama diretamente uma aplicação ASGI mínima (que, como o FastAPI, grava a
+rota casada em scope["route"]) com e sem o middleware e mede:
+
+- o tempo adicional por requisição, comparado ao custo de uma requisição a
+  uma rota FastAPI vazia;
+- a memória retida após todas as requisições, que deve ficar perto de zero:
+  depois da primeira requisição de cada (método, rota, status) o registro só
+  reaproveita as séries em cache.
+
+Não precisa de MongoDB nem de servidor HTTP.
+
+Uso:
+    python -m benchmarks.http_metrics_overhead --requests 200000
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from app.infrastructure.http_metrics import MetricsMiddleware
+
+ROUTES = [SimpleNamespace(path="/vehicles/{vehicle_id}"), SimpleNamespace(path="/vehicles")]
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTES[scope["_index"] & 1]
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, scopes) -> float:
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def build_scopes(requests: int):
+    return [{"type": "http", "method": "GET", "path": "/vehicles/x", "_index": i} for i in range(requests)]
+
+
+def build_fastapi_scopes(requests: int):
+    return [
+        {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/vehicles/x", "raw_path": b"/vehicles/x", "root_path": "",
+            "query_string": b"", "headers": [], "client": None, "server": None,
+        }
+        for _ in range(requests)
+    ]
+
+
+def build_fastapi_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/vehicles/{vehicle_id}")
+    async def get_vehicle(vehicle_id: str):
+        return {}
+
+    return app
+
+
+async def main(requests: int, rounds: int) -> None:
+    middleware = MetricsMiddleware(endpoint)
+    await run(middleware, build_scopes(1000))  # aquece o cache de séries
+
+    baseline, instrumented = [], []
+    for _ in range(rounds):
+        scopes = build_scopes(requests)
+        baseline.append(await run(endpoint, scopes))
+        scopes = build_scopes(requests)
+        instrumented.append(await run(middleware, scopes))
+
+    base, inst = min(baseline), min(instrumented)
+    print(f"requisições por rodada: {requests} ({rounds} rodadas, melhor rodada)")
+    print(f"sem middleware: {base / requests * 1e9:8.0f} ns/req")
+    print(f"com middleware: {inst / requests * 1e9:8.0f} ns/req")
+    print(f"custo adicional: {(inst - base) / requests * 1e9:7.0f} ns/req")
+
+    fastapi_app = build_fastapi_app()
+    await run(fastapi_app, build_fastapi_scopes(1000))
+    fastapi_requests = max(requests // 10, 1)
+    fastapi_time = min([await run(fastapi_app, build_fastapi_scopes(fastapi_requests)) for _ in range(rounds)])
+    per_request = fastapi_time / fastapi_requests
+    print(f"rota FastAPI vazia: {per_request * 1e9:8.0f} ns/req "
+          f"(o middleware soma {(inst - base) / requests / per_request:.1%})")
+
+    scopes = build_scopes(requests)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    await run(middleware, scopes)
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memória retida após {requests} requisições: {after - before} bytes")
+    print(f"séries em cache: {len(middleware._series)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,201 @@
+"""
+Benchmark de contenção para reservas de veículos.
+
+Simula N compradores concorrentes disputando o mesmo modelo e compara:
+
+- atomic: POST /vehicles/reserve (VehicleService.reserve_any_vehicle), um
+  find_one_and_update ordenado por preço;
+- list-and-reserve: o fluxo atual dos clientes, que lista os veículos
+  disponíveis, escolhe um e chama mark-as-reserved, tentando de novo em caso
+  de colisão.
+
+Requer um MongoDB acessível (MONGODB_URL). Usa um banco descartável, que é
+esvaziado a cada estratégia e apagado ao final; por isso o nome do banco
+precisa começar com "benchmark_" ou terminar com "_benchmark".
+
+Uso:
+    python -m benchmarks.reserve_contention --buyers 500 --stock 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.adapters.repository.mongodb_vehicle_repository import MongoDBVehicleRepository
+from app.domain.vehicle import VehicleCreate, VehicleReservationRequest, VehicleStatus
+from app.domain.vehicle_service import VehicleService
+
+CRITERIA = VehicleReservationRequest(brand="Fiat", model="Uno", year=2019, max_price=60000)
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@dataclass
+class BuyerResult:
+    reserved_id: str = None
+    attempts: int = 0
+    latency: float = 0.0
+
+
+@dataclass
+class StrategyReport:
+    name: str
+    results: List[BuyerResult] = field(default_factory=list)
+    commands: int = 0
+    wall_time: float = 0.0
+    reserved_in_db: int = 0
+
+    def print(self):
+        latencies = sorted(r.latency * 1000 for r in self.results)
+        successes = [r for r in self.results if r.reserved_id]
+        distinct = len({r.reserved_id for r in successes})
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        print(f"\n== {self.name}")
+        print(f"compradores:            {len(self.results)}")
+        print(f"reservas bem-sucedidas: {len(successes)} ({distinct} veículos distintos, {self.reserved_in_db} no banco)")
+        print(f"reservas duplicadas:    {len(successes) - distinct}")
+        print(f"tentativas totais:      {sum(r.attempts for r in self.results)}")
+        print(f"comandos MongoDB:       {self.commands} ({self.commands / len(self.results):.2f} por comprador)")
+        print(
+            f"latência (ms):          p50={statistics.median(latencies):.1f} p95={pct(0.95):.1f} "
+            f"p99={pct(0.99):.1f} max={latencies[-1]:.1f}"
+        )
+        print(f"tempo total:            {self.wall_time * 1000:.1f} ms")
+
+
+async def seed(repository: MongoDBVehicleRepository, stock: int, noise: int) -> None:
+    await repository.collection.delete_many({})
+    vehicles = [
+        VehicleCreate(brand="Fiat", model="Uno", year=2019, color="Branco", price=random.randint(30000, 60000))
+        for _ in range(stock)
+    ]
+    vehicles += [
+        VehicleCreate(brand="Fiat", model="Argo", year=2021, color="Preto", price=random.randint(60000, 90000))
+        for _ in range(noise)
+    ]
+    await repository.save_many(vehicles)
+
+
+async def atomic_buyer(service: VehicleService, start: asyncio.Event) -> BuyerResult:
+    await start.wait()
+    result = BuyerResult(attempts=1)
+    began = time.perf_counter()
+    try:
+        result.reserved_id = (await service.reserve_any_vehicle(CRITERIA)).id
+    except ValueError:
+        pass
+    result.latency = time.perf_counter() - began
+    return result
+
+
+async def list_and_reserve_buyer(service: VehicleService, start: asyncio.Event, max_attempts: int) -> BuyerResult:
+    await start.wait()
+    result = BuyerResult()
+    began = time.perf_counter()
+    while result.attempts < max_attempts:
+        result.attempts += 1
+        available = [
+            v for v in await service.list_vehicles_by_status(VehicleStatus.AVAILABLE)
+            if v.brand == CRITERIA.brand and v.model == CRITERIA.model
+            and v.year == CRITERIA.year and v.price <= CRITERIA.max_price
+        ]
+        if not available:
+            break
+        try:
+            result.reserved_id = (await service.update_vehicle_status(random.choice(available).id, VehicleStatus.RESERVED)).id
+            break
+        except ValueError:
+            continue
+    result.latency = time.perf_counter() - began
+    return result
+
+
+async def run_strategy(name, db, counter, buyers, stock, noise, make_buyer) -> StrategyReport:
+    repository = MongoDBVehicleRepository(db)
+    await repository.ensure_indexes()
+    await seed(repository, stock, noise)
+    service = VehicleService(repository)
+
+    start = asyncio.Event()
+    tasks = [asyncio.create_task(make_buyer(service, start)) for _ in range(buyers)]
+    await asyncio.sleep(0.1)
+    report = StrategyReport(name=name)
+    counter.count = 0
+    began = time.perf_counter()
+    start.set()
+    report.results = await asyncio.gather(*tasks)
+    report.wall_time = time.perf_counter() - began
+    report.commands = counter.count
+    report.reserved_in_db = await repository.collection.count_documents({"status": VehicleStatus.RESERVED})
+    return report
+
+
+def is_benchmark_database(name: str) -> bool:
+    """Só bancos com nome de benchmark podem ser esvaziados e apagados pelo script."""
+    return name.startswith("benchmark_") or name.endswith("_benchmark")
+
+
+async def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de contenção de reservas de veículos")
+    parser.add_argument("--buyers", type=int, default=500, help="Compradores concorrentes")
+    parser.add_argument("--stock", type=int, default=100, help="Veículos que atendem aos critérios")
+    parser.add_argument("--noise", type=int, default=1000, help="Outros veículos na coleção")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Tentativas no fluxo list-and-reserve")
+    parser.add_argument("--pool-size", type=int, default=100, help="maxPoolSize do cliente MongoDB")
+    parser.add_argument("--strategy", choices=["atomic", "list-and-reserve", "both"], default="both")
+    parser.add_argument("--db", default="core_benchmark", help="Banco descartável usado no benchmark (apagado ao final)")
+    args = parser.parse_args(argv)
+    if not is_benchmark_database(args.db):
+        parser.error(
+            f"--db {args.db!r} não parece um banco de benchmark; o banco é apagado ao final, "
+            "então o nome deve começar com 'benchmark_' ou terminar com '_benchmark'"
+        )
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(
+        os.getenv("MONGODB_URL", "mongodb://localhost:27017"),
+        maxPoolSize=args.pool_size,
+        event_listeners=[counter]
+    )
+    db = client[args.db]
+    try:
+        if args.strategy in ("atomic", "both"):
+            report = await run_strategy(
+                "atomic", db, counter, args.buyers, args.stock, args.noise, atomic_buyer
+            )
+            report.print()
+        if args.strategy in ("list-and-reserve", "both"):
+            report = await run_strategy(
+                "list-and-reserve", db, counter, args.buyers, args.stock, args.noise,
+                lambda service, start: list_and_reserve_buyer(service, start, args.max_attempts)
+            )
+            report.print()
+    finally:
+        await client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
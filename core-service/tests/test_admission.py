@@ -0,0 +1,51 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.infrastructure.admission import ADMISSION_REJECTED, AdmissionController, AdmissionMiddleware
+
+def make_app(controller):
+    app = FastAPI()
+
+    @app.get("/vehicles/")
+    async def list_vehicles():
+        return []
+
+    @app.post("/vehicles/lookup")
+    async def lookup():
+        return {"vehicles": []}
+
+    @app.post("/vehicles/reserve")
+    async def reserve():
+        return {"reserved": True}
+
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return app
+
+def test_routes_are_classified_by_prefix_then_method():
+    controller = AdmissionController()
+
+    assert controller.classify("GET", "/vehicles/") == "read"
+    assert controller.classify("POST", "/vehicles/lookup") == "read"
+    assert controller.classify("POST", "/vehicles/reserve") == "write"
+    assert controller.classify("GET", "/metrics") == "exempt"
+    with pytest.raises(ValueError):
+        AdmissionController(route_classes={"/vehicles": "batch"})
+
+@pytest.mark.asyncio
+async def test_pool_wait_queue_sheds_reads_but_admits_reservations():
+    waiters = 10
+    controller = AdmissionController(pool_waiters_limit=10, retry_after_seconds=3, pool_waiters=lambda: waiters)
+    shed = ADMISSION_REJECTED.labels("read", "pool")
+    before = shed.value
+
+    async with AsyncClient(app=make_app(controller), base_url="http://test") as client:
+        response = await client.get("/vehicles/")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert (await client.post("/vehicles/lookup", json={"ids": []})).status_code == 503
+        assert (await client.post("/vehicles/reserve")).status_code == 200
+        waiters = 0
+        assert (await client.get("/vehicles/")).status_code == 200
+
+    assert shed.value == before + 2
+    assert controller.in_flight == {"read": 0, "write": 0, "webhook": 0}
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from pymongo import _csot
+from app.infrastructure import deadline
+from app.infrastructure.deadline import DeadlineMiddleware
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/vehicles/import/budget")
+    @app.get("/vehicles/budget")
+    async def budget():
+        return {"remaining": deadline.remaining(), "mongo_timeout": _csot.get_timeout()}
+
+    @app.get("/vehicles/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout_ms=2000,
+        max_timeout_ms=5000,
+        route_timeouts_ms={"/vehicles/import": 4000}
+    )
+    return app
+
+@pytest.mark.asyncio
+async def test_deadline_header_bounds_mongo_operations(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/vehicles/budget", headers={"X-Request-Timeout-Ms": "300"})
+
+    body = response.json()
+    assert 0 < body["remaining"] <= 0.3
+    assert 0 < body["mongo_timeout"] <= 0.3
+
+@pytest.mark.asyncio
+async def test_route_default_deadline(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        default = await client.get("/vehicles/budget")
+        import_route = await client.get("/vehicles/import/budget")
+
+    assert 1.9 < default.json()["remaining"] <= 2
+    assert 3.9 < import_route.json()["remaining"] <= 4
+
+@pytest.mark.asyncio
+async def test_expired_request_returns_504(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/vehicles/slow", headers={"X-Request-Timeout-Ms": "50"})
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Prazo da requisição esgotado"}
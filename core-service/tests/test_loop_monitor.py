@@ -0,0 +1,35 @@
+import asyncio
+import logging
+import time
+import pytest
+from app.infrastructure.loop_monitor import EVENT_LOOP_LAG, LoopMonitor
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+@pytest.mark.asyncio
+async def test_monitor_records_lag_and_logs_blocking_stack(caplog):
+    monitor = LoopMonitor(interval_ms=10, block_threshold_ms=50)
+    samples = EVENT_LOOP_LAG.count
+    with caplog.at_level(logging.WARNING, logger="app.infrastructure.loop_monitor"):
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    assert monitor.blocks == 1
+    assert EVENT_LOOP_LAG.count > samples
+    [record] = caplog.records
+    assert "Event loop bloqueado" in record.getMessage()
+    assert "block_the_loop" in record.getMessage()
+
+def test_check_reports_each_stall_once():
+    monitor = LoopMonitor(interval_ms=10, block_threshold_ms=20)
+    monitor._heartbeat = time.monotonic() - 1
+
+    assert monitor.check() is True
+    assert monitor.check() is False
+    monitor._heartbeat = time.monotonic()
+    assert monitor.check() is False
+    assert monitor.blocks == 1
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.infrastructure import metrics
+from app.infrastructure.http_metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    MetricsMiddleware,
+    metrics_endpoint,
+)
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/test-vehicles/{vehicle_id}")
+    async def get_vehicle(vehicle_id: str):
+        return {"id": vehicle_id}
+
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+@pytest.mark.asyncio
+async def test_metrics_by_route_template(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for vehicle_id in ["1", "2"]:
+            await client.get(f"/test-vehicles/{vehicle_id}")
+        response = await client.get("/metrics")
+
+    route = "/test-vehicles/{vehicle_id}"
+    assert HTTP_REQUESTS.labels("GET", route, "200").value == 2
+    assert HTTP_REQUEST_DURATION.labels("GET", route, "200").count == 2
+    assert HTTP_REQUESTS_IN_PROGRESS.value == 0
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert f'core_http_requests_total{{method="GET",route="{route}",status="200"}} 2.0' in response.text
+
+def test_render_histogram_buckets_are_cumulative():
+    registry = metrics.MetricsRegistry()
+    latency = registry.register(metrics.Histogram("test_seconds", "Latência", ["route"], buckets=(0.1, 1.0)))
+    latency.labels("/a").observe(0.05)
+    latency.labels("/a").observe(0.5)
+
+    lines = metrics.render(registry).splitlines()
+
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 2' in lines
+    assert 'test_seconds_count{route="/a"} 2' in lines
@@ -0,0 +1,48 @@
+import logging
+from types import SimpleNamespace
+
+from app.infrastructure.mongo_monitoring import COMMAND_DURATION, ConnectionPoolMonitor, MongoCommandMonitor
+
+def run_command(monitor, command_name, command, duration_ms, request_id=1):
+    started = SimpleNamespace(
+        command_name=command_name, command=command, database_name="core_db",
+        connection_id=("localhost", 27017), request_id=request_id
+    )
+    monitor.started(started)
+    monitor.succeeded(SimpleNamespace(
+        connection_id=started.connection_id, request_id=request_id, duration_micros=int(duration_ms * 1000), reply={}
+    ))
+
+def test_monitor_records_duration_by_collection_and_command():
+    monitor = MongoCommandMonitor(slow_ms=1000)
+    duration = COMMAND_DURATION.labels("test_monitor_vehicles", "aggregate")
+    count = duration.count
+
+    run_command(monitor, "aggregate", {"aggregate": "test_monitor_vehicles", "pipeline": []}, 2)
+    run_command(monitor, "hello", {"hello": 1}, 2, request_id=2)
+
+    assert duration.count == count + 1
+    assert monitor.slow_shapes() == []
+
+def test_monitor_logs_slow_commands_without_values(caplog):
+    monitor = MongoCommandMonitor(slow_ms=50)
+    command = {"findAndModify": "vehicles", "query": {"_id": "abc", "status": {"$in": ["DISPONÍVEL"]}}}
+    with caplog.at_level(logging.WARNING, logger="app.infrastructure.mongo_monitoring"):
+        run_command(monitor, "findAndModify", command, 75)
+
+    assert '{"_id": "?", "status": {"$in": ["?"]}}' in caplog.text
+    assert "abc" not in caplog.text
+    [slow] = monitor.slow_shapes()
+    assert (slow.collection, slow.command_name, slow.count) == ("vehicles", "findAndModify", 1)
+
+def test_pool_monitor_counts_waiters():
+    monitor = ConnectionPoolMonitor()
+    event = SimpleNamespace(address=("localhost", 27017), options={})
+    monitor.pool_created(event)
+    for _ in range(3):
+        monitor.connection_check_out_started(event)
+    monitor.connection_created(event)
+    monitor.connection_checked_out(event)
+
+    assert monitor.waiters() == 2
+    assert monitor.stats()["localhost:27017"] == {"max_pool_size": 100, "open": 1, "checked_out": 1, "waiting": 2}
@@ -0,0 +1,171 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from app.adapters.repository.mongodb_vehicle_repository import (
+    MongoDBVehicleRepository,
+    build_filter_query,
+    build_price_expression,
+)
+from app.domain.vehicle import VehicleFilter, VehicleStatus, PriceRule
+from app.domain.exceptions import VehicleNotFoundError, VehicleVersionConflictError
+
+@pytest.fixture
+def collection():
+    return MagicMock()
+
+@pytest.fixture
+def repository(collection):
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    return MongoDBVehicleRepository(db)
+
+def test_build_filter_query():
+    # Arrange
+    filters = VehicleFilter(brand="Fiat", year=2019, status=VehicleStatus.AVAILABLE, max_price=50000)
+
+    # Act
+    query = build_filter_query(filters)
+
+    # Assert
+    assert query == {"brand": "Fiat", "year": 2019, "status": VehicleStatus.AVAILABLE, "price": {"$lte": 50000}}
+
+def test_build_price_expression_percent_and_rounding():
+    # Act
+    expression = build_price_expression(PriceRule(percent=-5, round_to=100))
+
+    # Assert
+    assert expression == {
+        "$round": [
+            {"$multiply": [{"$round": [{"$divide": [{"$multiply": ["$price", 0.95]}, 100]}, 0]}, 100]},
+            2
+        ]
+    }
+
+@pytest.mark.asyncio
+async def test_adjust_prices_uses_single_pipeline_update(repository, collection):
+    # Arrange
+    collection.update_many = AsyncMock(return_value=MagicMock(matched_count=3, modified_count=3))
+    filters = VehicleFilter(brand="Fiat", status=VehicleStatus.AVAILABLE)
+
+    # Act
+    result = await repository.adjust_prices(filters, PriceRule(absolute=-1000))
+
+    # Assert
+    assert result.matched_count == 3
+    assert result.modified_count == 3
+    query, update = collection.update_many.call_args.args
+    price = {"$round": [{"$add": ["$price", -1000]}, 2]}
+    assert query == {"brand": "Fiat", "status": VehicleStatus.AVAILABLE, "$expr": {"$gt": [price, 0]}}
+    assert update[0]["$set"]["price"] == price
+
+@pytest.mark.asyncio
+async def test_adjust_prices_dry_run_reports_distribution(repository, collection):
+    # Arrange
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{
+        "skipped": [{"count": 1}],
+        "summary": [{
+            "count": 2,
+            "current_min": 30000.0, "current_max": 40000.0, "current_avg": 35000.0,
+            "new_min": 28500.0, "new_max": 38000.0, "new_avg": 33250.0,
+        }],
+        "distribution": [
+            {"_id": {"min": 28500.0, "max": 38000.0}, "count": 1},
+            {"_id": {"min": 38000.0, "max": 38000.0}, "count": 1},
+        ],
+    }])
+    collection.aggregate.return_value = cursor
+    collection.update_many = AsyncMock()
+
+    # Act
+    result = await repository.adjust_prices(VehicleFilter(), PriceRule(percent=-5), dry_run=True, buckets=2)
+
+    # Assert
+    assert result.dry_run is True
+    assert result.matched_count == 2
+    assert result.skipped_count == 1
+    assert result.resulting_prices.avg == 33250.0
+    assert [bucket.count for bucket in result.distribution] == [1, 1]
+    collection.update_many.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_fields_with_expected_version(repository, collection):
+    # Arrange
+    vehicle_id = "65a000000000000000000001"
+    collection.find_one_and_update = AsyncMock(return_value={
+        "_id": ObjectId(vehicle_id), "brand": "Fiat", "model": "Uno", "year": 2019,
+        "color": "Azul", "price": 35000.0, "status": VehicleStatus.AVAILABLE, "version": 4,
+    })
+
+    # Act
+    vehicle = await repository.update_fields(vehicle_id, {"color": "Azul"}, expected_version=3)
+
+    # Assert
+    assert vehicle.version == 4
+    query, update = collection.find_one_and_update.call_args.args
+    assert query == {"_id": ObjectId(vehicle_id), "version": 3}
+    assert update["$set"]["color"] == "Azul"
+    assert update["$inc"] == {"version": 1}
+
+@pytest.mark.asyncio
+async def test_update_fields_version_conflict(repository, collection):
+    # Arrange
+    collection.find_one_and_update = AsyncMock(return_value=None)
+    collection.count_documents = AsyncMock(return_value=1)
+
+    # Act & Assert
+    with pytest.raises(VehicleVersionConflictError):
+        await repository.update_fields("65a000000000000000000001", {"color": "Azul"}, expected_version=3)
+
+@pytest.mark.asyncio
+async def test_update_fields_not_found(repository, collection):
+    # Arrange
+    collection.find_one_and_update = AsyncMock(return_value=None)
+    collection.count_documents = AsyncMock(return_value=0)
+
+    # Act & Assert
+    with pytest.raises(VehicleNotFoundError):
+        await repository.update_fields("65a000000000000000000001", {"color": "Azul"}, expected_version=3)
+    with pytest.raises(VehicleNotFoundError):
+        await repository.update_fields("invalido", {"color": "Azul"})
+
+@pytest.mark.asyncio
+async def test_reserve_first_available_is_single_sorted_update(repository, collection):
+    # Arrange
+    collection.find_one_and_update = AsyncMock(return_value=None)
+
+    # Act
+    result = await repository.reserve_first_available(VehicleFilter(brand="Fiat", model="Uno", max_price=40000))
+
+    # Assert
+    assert result is None
+    query, update = collection.find_one_and_update.call_args.args
+    assert query == {
+        "brand": "Fiat", "model": "Uno", "status": VehicleStatus.AVAILABLE, "price": {"$lte": 40000}
+    }
+    assert update["$set"]["status"] == VehicleStatus.RESERVED
+    assert collection.find_one_and_update.call_args.kwargs["sort"] == [("price", 1), ("_id", 1)]
+
+@pytest.mark.asyncio
+async def test_bulk_update_status_identifies_rows_by_call_token(repository, collection):
+    # Arrange
+    first, second = "65a000000000000000000001", "65a000000000000000000002"
+    collection.bulk_write = AsyncMock(return_value=MagicMock(matched_count=1))
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{"_id": ObjectId(second)}])
+    collection.find.return_value = cursor
+
+    # Act
+    updated = await repository.bulk_update_status([
+        (first, VehicleStatus.AVAILABLE, VehicleStatus.RESERVED),
+        (second, VehicleStatus.AVAILABLE, VehicleStatus.RESERVED),
+    ])
+
+    # Assert
+    assert updated == [second]
+    operations = collection.bulk_write.call_args.args[0]
+    tokens = {operation._doc["$set"]["status_change"] for operation in operations}
+    assert len(tokens) == 1
+    query = collection.find.call_args.args[0]
+    assert query["status_change"] == tokens.pop()
+    assert "updated_at" not in query
@@ -0,0 +1,49 @@
+import os
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.adapters.api import admin
+from app.infrastructure.profiling import ProfilingMiddleware, RequestProfiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+@pytest_asyncio.fixture
+async def client(tmp_path, monkeypatch):
+    profiler = RequestProfiler("secret", directory=str(tmp_path), max_files=5)
+    monkeypatch.setattr(admin, "admin_token", "secret")
+    monkeypatch.setattr(admin, "profiler", profiler)
+    app = FastAPI()
+
+    @app.get("/vehicles/{vehicle_id}")
+    async def get_vehicle(vehicle_id: str):
+        return {"id": vehicle_id}
+
+    app.include_router(admin.router)
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, profiler
+
+@pytest.mark.asyncio
+async def test_armed_route_is_profiled_once(client, tmp_path):
+    client, profiler = client
+    assert (await client.post("/admin/profiling", json={"route": "/vehicles/{vehicle_id}"})).status_code == 401
+
+    await client.post("/admin/profiling", json={"route": "/vehicles/{vehicle_id}", "requests": 1}, headers=ADMIN)
+    await client.get("/vehicles/a")
+    await client.get("/vehicles/b")
+
+    [profile] = (await client.get("/admin/profiling", headers=ADMIN)).json()["profiles"]
+    assert (profile["path"], profile["route"], profile["trigger"]) == ("/vehicles/a", "/vehicles/{vehicle_id}", "armed")
+    assert os.listdir(tmp_path) == [profile["name"]]
+    summary = await client.get(f"/admin/profiling/{profile['name']}/summary", headers=ADMIN)
+    assert "function calls" in summary.text
+
+@pytest.mark.asyncio
+async def test_debug_header_requires_admin_token(client):
+    client, profiler = client
+
+    await client.get("/vehicles/a", headers={"X-Debug-Profile": "wrong"})
+    await client.get("/vehicles/b", headers={"X-Debug-Profile": "secret"})
+
+    assert [(p["path"], p["trigger"]) for p in profiler.list_profiles()] == [("/vehicles/b", "header")]
@@ -0,0 +1,49 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import APIRouter, FastAPI
+from httpx import AsyncClient
+from app.infrastructure import request_cost
+from app.infrastructure.mongo_monitoring import MongoCommandMonitor
+from app.infrastructure.server_timing import ServerTimingMiddleware, TimedRoute
+
+def run_find(monitor, request_id, documents=0):
+    command = {"find": "vehicles", "filter": {}}
+    monitor.started(SimpleNamespace(
+        command_name="find", command=command, database_name="core_db",
+        connection_id=("localhost", 27017), request_id=request_id
+    ))
+    monitor.succeeded(SimpleNamespace(
+        connection_id=("localhost", 27017), request_id=request_id, duration_micros=1500,
+        reply={"cursor": {"id": 0, "firstBatch": [{}] * documents}}
+    ))
+
+@pytest.mark.asyncio
+async def test_server_timing_header_includes_mongo_cost():
+    monitor = MongoCommandMonitor(slow_ms=1000)
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/test-timing")
+    async def timed():
+        run_find(monitor, 1, documents=4)
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/vehicles")
+    app.add_middleware(ServerTimingMiddleware)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/vehicles/test-timing")
+
+    entries = response.headers["server-timing"].split(", ")
+    assert [entry.split(";")[0] for entry in entries] == ["validation", "app", "mongo", "serialization", "total"]
+    assert 'mongo;dur=1.5;desc="comandos=1 documentos=4"' in entries
+
+def test_round_trip_budget_catches_extra_commands():
+    monitor = MongoCommandMonitor(slow_ms=1000)
+    with request_cost.round_trip_budget(mongo=1) as cost:
+        run_find(monitor, 1)
+    with pytest.raises(AssertionError, match="2 comandos ao MongoDB, o limite é 1"):
+        with request_cost.round_trip_budget(mongo=1):
+            run_find(monitor, 2)
+            run_find(monitor, 3)
+
+    assert cost.mongo_commands == 1
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.adapters.api import endpoints
+from app.adapters.api.dependencies import get_vehicle_service
+from app.domain.vehicle import Vehicle, VehicleStatus
+from app.infrastructure import deadline
+from app.infrastructure.stale_cache import STALENESS_HEADER, StaleWhileRevalidate
+
+class SlowLoader:
+    def __init__(self):
+        self.calls = 0
+        self.delay = 0.0
+        self.error = None
+        self.remaining = None
+
+    async def __call__(self):
+        self.calls += 1
+        self.remaining = deadline.remaining()
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"lista {self.calls}"
+
+@pytest.mark.asyncio
+async def test_serves_snapshot_when_live_query_exceeds_budget():
+    cache = StaleWhileRevalidate("test_swr", latency_budget_ms=20)
+    loader = SlowLoader()
+    assert await cache.get("AVAILABLE", loader) == ("lista 1", None)
+
+    loader.delay = 0.1
+    value, age = await cache.get("AVAILABLE", loader)
+    assert value == "lista 1" and age is not None and age >= 0.02
+    await asyncio.sleep(0.15)
+
+    loader.delay = 0.0
+    assert await cache.get("AVAILABLE", loader) == ("lista 3", None)
+    assert loader.calls == 3
+
+@pytest.mark.asyncio
+async def test_single_refresh_in_flight_per_key():
+    cache = StaleWhileRevalidate("test_swr", latency_budget_ms=10)
+    loader = SlowLoader()
+    await cache.get("SOLD", loader)
+    loader.delay = 0.1
+
+    results = await asyncio.gather(*(cache.get("SOLD", loader) for _ in range(5)))
+
+    assert {value for value, _ in results} == {"lista 1"}
+    assert loader.calls == 2
+    await asyncio.sleep(0.15)
+    assert (await cache.get("SOLD", loader))[0] == "lista 2"
+    await cache.close()
+
+@pytest.mark.asyncio
+async def test_failed_query_serves_snapshot_or_raises_without_one():
+    cache = StaleWhileRevalidate("test_swr", latency_budget_ms=50)
+    loader = SlowLoader()
+    loader.error = RuntimeError("mongo indisponível")
+    with pytest.raises(RuntimeError):
+        await cache.get("RESERVED", loader)
+
+    loader.error = None
+    await cache.get("RESERVED", loader)
+    loader.error = RuntimeError("mongo indisponível")
+    value, age = await cache.get("RESERVED", loader)
+    assert value == "lista 2" and age is not None
+
+@pytest.mark.asyncio
+async def test_too_old_snapshot_is_not_served():
+    now = [0.0]
+    cache = StaleWhileRevalidate("test_swr", latency_budget_ms=10, max_stale_seconds=60, clock=lambda: now[0])
+    loader = SlowLoader()
+    await cache.get("AVAILABLE", loader)
+    now[0] = 61.0
+    loader.delay = 0.05
+
+    assert await cache.get("AVAILABLE", loader) == ("lista 2", None)
+
+@pytest.mark.asyncio
+async def test_refresh_runs_outside_the_request_deadline():
+    cache = StaleWhileRevalidate("test_swr", refresh_timeout_seconds=30)
+    loader = SlowLoader()
+
+    with deadline.deadline_scope(0.5):
+        await cache.get("AVAILABLE", loader)
+
+    assert loader.remaining > 25
+
+@pytest.mark.asyncio
+async def test_status_route_flags_stale_response(monkeypatch):
+    vehicle = Vehicle(
+        brand="Toyota", model="Corolla", year=2020, color="Preto", price=85000.0,
+        status=VehicleStatus.AVAILABLE,
+        created_at=datetime.now(timezone.utc), updated_at=datetime.now(timezone.utc)
+    )
+    delay = 0.0
+
+    class FakeService:
+        async def list_vehicles_by_status(self, status):
+            await asyncio.sleep(delay)
+            return [vehicle]
+
+    cache = StaleWhileRevalidate("test_swr", latency_budget_ms=20)
+    monkeypatch.setattr(endpoints, "vehicle_lists", cache)
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/vehicles")
+    app.dependency_overrides[get_vehicle_service] = FakeService
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        fresh = await client.get("/vehicles/available/")
+        delay = 0.2
+        stale = await client.get("/vehicles/available/")
+    await cache.close()
+
+    assert STALENESS_HEADER not in fresh.headers
+    assert float(stale.headers[STALENESS_HEADER]) >= 0.02
+    assert stale.json() == fresh.json()
+    assert stale.json()[0]["brand"] == "Toyota"
@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.adapters.repository.mongodb_vehicle_repository import MongoDBVehicleRepository
+from app.infrastructure import tracing
+from app.infrastructure.tracing import InMemoryExporter, RateLimitedSampler, Tracer, TracingMiddleware
+
+INCOMING = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    previous = tracing.set_tracer(Tracer("core-service", exporter, RateLimitedSampler(1000)))
+    yield exporter
+    tracing.set_tracer(previous)
+
+@pytest.mark.asyncio
+async def test_incoming_trace_continues_into_repository(exporter):
+    collection = MagicMock()
+    collection.name = "vehicles"
+    collection.find_one = AsyncMock(return_value=None)
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    repository = MongoDBVehicleRepository(db)
+    app = FastAPI()
+
+    @app.get("/vehicles/{vehicle_id}")
+    async def get_vehicle(vehicle_id: str):
+        return {"found": await repository.find_by_id(vehicle_id) is not None}
+
+    app.add_middleware(TracingMiddleware)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(f"/vehicles/{ObjectId()}", headers={"traceparent": INCOMING})
+
+    assert response.status_code == 200
+    [spans] = exporter.traces().values()
+    server, find = spans
+    assert (server.name, server.parent_id) == ("GET /vehicles/{vehicle_id}", "b7ad6b7169203331")
+    assert server.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert (find.name, find.parent_id) == ("MongoDBVehicleRepository.find_by_id", server.context.span_id)
+    assert find.attributes == {"db.system": "mongodb", "db.collection": "vehicles"}
+
+def test_sampler_limits_new_traces():
+    now = [0.0]
+    tracer = Tracer("core-service", InMemoryExporter(), RateLimitedSampler(1, clock=lambda: now[0]))
+
+    sampled = []
+    for _ in range(3):
+        with tracer.start_span("root") as span:
+            sampled.append(span.context.sampled)
+
+    assert sampled == [True, False, False]
+    assert len(tracer.exporter.spans()) == 1
+
+def test_sampler_with_fractional_rate_samples_every_few_seconds():
+    now = [0.0]
+    sampler = RateLimitedSampler(0.5, clock=lambda: now[0])
+
+    sampled = []
+    for second in range(20):
+        now[0] = float(second)
+        sampled.append(sampler.should_sample())
+
+    assert sum(sampled) == 10
+    assert sampled[:4] == [True, False, True, False]
+    assert RateLimitedSampler(0).should_sample() is False
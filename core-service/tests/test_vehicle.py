@@ -244,4 +244,37 @@ def test_mark_as_sold_reserved():
 
     # Assert
     assert vehicle.status == VehicleStatus.SOLD
-    assert vehicle.updated_at is not None 
\ No newline at end of file
+    assert vehicle.updated_at is not None 
+
+def test_mark_as_available_reserved():
+    # Arrange
+    vehicle = Vehicle(
+        brand="Toyota",
+        model="Corolla",
+        year=2022,
+        color="Prata",
+        price=100000.0,
+        status=VehicleStatus.RESERVED
+    )
+
+    # Act
+    vehicle.mark_as_available()
+
+    # Assert
+    assert vehicle.status == VehicleStatus.AVAILABLE
+    assert vehicle.updated_at is not None
+
+def test_transition_to_available_from_sold():
+    # Arrange
+    vehicle = Vehicle(
+        brand="Toyota",
+        model="Corolla",
+        year=2022,
+        color="Prata",
+        price=100000.0,
+        status=VehicleStatus.SOLD
+    )
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Apenas veículos reservados podem ser marcados como disponíveis"):
+        vehicle.transition_to(VehicleStatus.AVAILABLE)
@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.domain.vehicle import VehicleStatus
+from app.domain.vehicle_import import VehicleImporter, ImportFormat
+
+CSV_CONTENT = (
+    "brand,model,year,color,price,status\n"
+    "Toyota,Corolla,2022,Prata,100000.0,\n"
+    "Honda,Civic,abc,Preto,110000.0,\n"
+    "Fiat,Uno,2019,Branco,35000.0,USADO\n"
+    "Fiat,Argo,2020,Vermelho\n"
+    "Ford,Ka,2018,Azul,40000.0,DISPONÍVEL\n"
+).encode()
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+@pytest.fixture
+def mock_repository():
+    repository = AsyncMock()
+    repository.save_many.side_effect = lambda vehicles: len(vehicles)
+    return repository
+
+@pytest.mark.asyncio
+async def test_import_csv_in_chunks(mock_repository):
+    # Arrange
+    importer = VehicleImporter(mock_repository, chunk_size=2)
+
+    # Act
+    result = await importer.import_stream(_chunks(CSV_CONTENT, 7), ImportFormat.CSV)
+
+    # Assert
+    assert result.total_rows == 5
+    assert result.inserted == 2
+    assert result.failed == 3
+    assert result.batches == 1
+    assert [error.line for error in result.errors] == [3, 4, 5]
+    saved = mock_repository.save_many.call_args.args[0]
+    assert [vehicle.model for vehicle in saved] == ["Corolla", "Ka"]
+    assert saved[0].status == VehicleStatus.AVAILABLE
+
+@pytest.mark.asyncio
+async def test_import_ndjson_reports_invalid_lines(mock_repository):
+    # Arrange
+    content = (
+        b'{"brand": "Toyota", "model": "Corolla", "year": 2022, "color": "Prata", "price": 100000.0}\n'
+        b'\n'
+        b'not json\n'
+        b'[1, 2]\n'
+        b'{"brand": "Honda", "model": "Civic", "year": 2023, "color": "Preto", "price": 110000.0}'
+    )
+    importer = VehicleImporter(mock_repository, chunk_size=1)
+
+    # Act
+    result = await importer.import_stream(_chunks(content, 16), ImportFormat.NDJSON)
+
+    # Assert
+    assert result.inserted == 2
+    assert result.batches == 2
+    assert [error.line for error in result.errors] == [3, 4]
+
+@pytest.mark.asyncio
+async def test_import_limits_batches_in_flight():
+    # Arrange
+    in_flight = 0
+    peak = 0
+
+    async def save_many(vehicles):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return len(vehicles)
+
+    repository = AsyncMock()
+    repository.save_many.side_effect = save_many
+    rows = b"".join(
+        b'{"brand": "Fiat", "model": "Uno", "year": 2019, "color": "Branco", "price": 35000.0}\n'
+        for _ in range(50)
+    )
+    importer = VehicleImporter(repository, chunk_size=5, max_in_flight=2)
+    progress = []
+
+    # Act
+    result = await importer.import_stream(_chunks(rows, 64), ImportFormat.NDJSON, progress=progress.append)
+
+    # Assert
+    assert result.inserted == 50
+    assert result.batches == 10
+    assert peak == 2
+    assert progress
+
+@pytest.mark.asyncio
+async def test_import_counts_rows_not_written():
+    # Arrange
+    repository = AsyncMock()
+    repository.save_many.side_effect = Exception("conexão perdida")
+    content = b'{"brand": "Fiat", "model": "Uno", "year": 2019, "color": "Branco", "price": 35000.0}\n' * 3
+    importer = VehicleImporter(repository, chunk_size=10)
+
+    # Act
+    result = await importer.import_stream(_chunks(content, 1024), ImportFormat.NDJSON)
+
+    # Assert
+    assert result.inserted == 0
+    assert result.failed == 3
+    assert "conexão perdida" in result.errors[0].error
+
+@pytest.mark.asyncio
+async def test_import_csv_quoted_field_with_newlines(mock_repository):
+    # Arrange
+    content = (
+        'brand,model,year,color,price\n'
+        'Toyota,"Corolla\nAltis",2022,Prata,100000.0\n'
+        '\n'
+        'Honda,"Civic ""Si""",2023,"Preto\n\nFosco",110000.0\n'
+        'Fiat,Uno,abc,Branco,35000.0\n'
+    ).encode()
+    importer = VehicleImporter(mock_repository)
+
+    # Act
+    result = await importer.import_stream(_chunks(content, 5), ImportFormat.CSV)
+
+    # Assert
+    assert result.total_rows == 3
+    assert result.inserted == 2
+    assert [error.line for error in result.errors] == [8]
+    saved = mock_repository.save_many.call_args.args[0]
+    assert [vehicle.model for vehicle in saved] == ["Corolla\nAltis", 'Civic "Si"']
+    assert saved[1].color == "Preto\n\nFosco"
+
+@pytest.mark.asyncio
+async def test_import_reports_unclosed_quote(mock_repository):
+    # Arrange
+    content = b'brand,model,year,color,price\nToyota,Corolla,2022,Prata,100000.0\nHonda,"Civic,2023,Preto,1\n'
+    importer = VehicleImporter(mock_repository)
+
+    # Act
+    result = await importer.import_stream(_chunks(content, 8), ImportFormat.CSV)
+
+    # Assert
+    assert result.aborted is True
+    assert result.inserted == 1
+    assert result.errors[-1].line == 3
+    assert "Aspas não fechadas" in result.errors[-1].error
+
+@pytest.mark.asyncio
+async def test_import_stops_at_oversized_line_keeping_rows_read(mock_repository):
+    # Arrange
+    row = b'{"brand": "Fiat", "model": "Uno", "year": 2019, "color": "Branco", "price": 35000.0}\n'
+    importer = VehicleImporter(mock_repository, chunk_size=1, max_line_bytes=128)
+
+    # Act
+    result = await importer.import_stream(_chunks(row * 3 + b"x" * 300, 10), ImportFormat.NDJSON)
+
+    # Assert
+    assert result.aborted is True
+    assert result.inserted == 3
+    assert mock_repository.save_many.await_count == 3
+    assert result.errors[-1].line == 4
+    assert "excede o tamanho máximo" in result.errors[-1].error
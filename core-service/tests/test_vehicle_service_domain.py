@@ -1,7 +1,16 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from app.domain.vehicle_service import VehicleService
-from app.domain.vehicle import Vehicle, VehicleStatus
+from app.domain.vehicle import (
+    Vehicle,
+    VehicleStatus,
+    VehicleUpdate,
+    VehicleStatusTransition,
+    VehicleFilter,
+    VehicleReservationRequest,
+    PriceRule,
+    PriceAdjustmentRequest,
+)
 from datetime import datetime, timezone
 
 @pytest.fixture
@@ -185,4 +194,139 @@ async def test_update_vehicle_status_invalid_transition(service, mock_repository
     
     # Act & Assert
     with pytest.raises(ValueError, match="Apenas veículos reservados podem ser marcados como disponíveis"):
-        await service.update_vehicle_status("123", VehicleStatus.AVAILABLE) 
\ No newline at end of file
+        await service.update_vehicle_status("123", VehicleStatus.AVAILABLE)
+
+@pytest.mark.asyncio
+async def test_bulk_update_vehicle_status(service, mock_repository):
+    # Arrange
+    def vehicle(vehicle_id, status):
+        return Vehicle(id=vehicle_id, brand="Fiat", model="Uno", year=2019, color="Branco", price=35000.0, status=status)
+
+    mock_repository.find_by_ids.return_value = [
+        vehicle("1", VehicleStatus.RESERVED),
+        vehicle("2", VehicleStatus.SOLD),
+        vehicle("3", VehicleStatus.AVAILABLE),
+        vehicle("4", VehicleStatus.RESERVED),
+    ]
+    mock_repository.bulk_update_status.return_value = ["1", "3"]
+    transitions = [
+        VehicleStatusTransition(vehicle_id="1", status=VehicleStatus.AVAILABLE),
+        VehicleStatusTransition(vehicle_id="2", status=VehicleStatus.SOLD),
+        VehicleStatusTransition(vehicle_id="3", status=VehicleStatus.SOLD),
+        VehicleStatusTransition(vehicle_id="4", status=VehicleStatus.SOLD),
+        VehicleStatusTransition(vehicle_id="5", status=VehicleStatus.SOLD),
+        VehicleStatusTransition(vehicle_id="1", status=VehicleStatus.SOLD),
+    ]
+
+    # Act
+    result = await service.bulk_update_vehicle_status(transitions)
+
+    # Assert
+    assert result.transitioned == ["1", "3"]
+    reasons = {rejection.vehicle_id: rejection.reason for rejection in result.rejected}
+    assert reasons == {
+        "1": "Veículo repetido na requisição",
+        "2": "Veículo já está vendido",
+        "4": "Status do veículo foi alterado por outra operação",
+        "5": "Veículo não encontrado",
+    }
+    mock_repository.find_by_ids.assert_called_once_with(["1", "2", "3", "4", "5"])
+    mock_repository.bulk_update_status.assert_called_once_with([
+        ("1", VehicleStatus.RESERVED, VehicleStatus.AVAILABLE),
+        ("3", VehicleStatus.AVAILABLE, VehicleStatus.SOLD),
+        ("4", VehicleStatus.RESERVED, VehicleStatus.SOLD),
+    ])
+
+@pytest.mark.asyncio
+async def test_lookup_vehicles(service, mock_repository, mock_vehicle):
+    # Arrange
+    mock_vehicle.id = "1"
+    mock_repository.find_by_ids.return_value = [mock_vehicle]
+
+    # Act
+    result = await service.lookup_vehicles(["1", "2", "1"])
+
+    # Assert
+    assert result.vehicles == [mock_vehicle]
+    assert result.missing == ["2"]
+    mock_repository.find_by_ids.assert_called_once_with(["1", "2"])
+
+@pytest.mark.asyncio
+async def test_list_vehicles_with_filters(service, mock_repository, mock_vehicle):
+    # Arrange
+    filters = VehicleFilter(brand="Toyota", year=2020)
+    mock_repository.find_by_filter.return_value = [mock_vehicle]
+
+    # Act
+    result = await service.list_vehicles(filters)
+
+    # Assert
+    assert result == [mock_vehicle]
+    mock_repository.find_by_filter.assert_called_once_with(filters)
+    mock_repository.find_all.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_adjust_prices_only_available_vehicles(service, mock_repository):
+    # Arrange
+    adjustment = PriceAdjustmentRequest(filter=VehicleFilter(brand="Fiat", year=2019), rule=PriceRule(percent=-5))
+
+    # Act
+    await service.adjust_prices(adjustment, dry_run=True)
+
+    # Assert
+    filters, rule = mock_repository.adjust_prices.call_args.args
+    assert filters.brand == "Fiat"
+    assert filters.status == VehicleStatus.AVAILABLE
+    assert rule.percent == -5
+    assert mock_repository.adjust_prices.call_args.kwargs["dry_run"] is True
+
+@pytest.mark.asyncio
+async def test_adjust_prices_rejects_sold_filter(service, mock_repository):
+    # Arrange
+    adjustment = PriceAdjustmentRequest(filter=VehicleFilter(status=VehicleStatus.SOLD), rule=PriceRule(absolute=100))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Apenas veículos disponíveis podem ter o preço ajustado"):
+        await service.adjust_prices(adjustment)
+    mock_repository.adjust_prices.assert_not_called()
+
+def test_price_rule_requires_adjustment():
+    # Act & Assert
+    with pytest.raises(ValueError):
+        PriceRule(round_to=100)
+
+@pytest.mark.asyncio
+async def test_update_vehicle_fields_sends_only_changed_fields(service, mock_repository, mock_vehicle):
+    # Arrange
+    mock_repository.update_fields.return_value = mock_vehicle
+
+    # Act
+    result = await service.update_vehicle_fields("123", VehicleUpdate(price=80000.0, version=2), expected_version=2)
+
+    # Assert
+    assert result == mock_vehicle
+    mock_repository.update_fields.assert_called_once_with("123", {"price": 80000.0}, 2)
+
+@pytest.mark.asyncio
+async def test_reserve_any_vehicle(service, mock_repository, mock_vehicle):
+    # Arrange
+    mock_repository.reserve_first_available.return_value = mock_vehicle
+
+    # Act
+    result = await service.reserve_any_vehicle(VehicleReservationRequest(brand="Toyota", max_price=90000))
+
+    # Assert
+    assert result == mock_vehicle
+    filters = mock_repository.reserve_first_available.call_args.args[0]
+    assert filters.brand == "Toyota"
+    assert filters.max_price == 90000
+    assert filters.status == VehicleStatus.AVAILABLE
+
+@pytest.mark.asyncio
+async def test_reserve_any_vehicle_none_available(service, mock_repository):
+    # Arrange
+    mock_repository.reserve_first_available.return_value = None
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Nenhum veículo disponível para os critérios informados"):
+        await service.reserve_any_vehicle(VehicleReservationRequest(model="Corolla"))
@@ -7,13 +7,36 @@ import logging
 import asyncio
 from typing import Optional
 
+from app.controllers import admin_controller, sale_controller
+from app.controllers.admin_controller import AdminSettings, router as admin_router
 from app.controllers.sale_controller import router as sale_router
-from app.infrastructure.mongodb_config import MongoDB
+from app.infrastructure.mongodb_config import MongoDB, set_mongodb, close_mongodb
 from app.adapters.mongodb_sale_repository import MongoDBSaleRepository
+from app.adapters.mongodb_idempotency_repository import MongoDBIdempotencyRepository
+from app.services.idempotency_service import IdempotencyService, IdempotencySettings
+from app.adapters.mongodb_payment_event_queue import MongoDBPaymentEventQueue
+from app.services.payment_event_processor import PaymentEventProcessor
+from app.services.payment_event_workers import PaymentEventWorkerPool, PaymentQueueSettings
+from app.services.vehicle_lookup import VehicleLookup, VehicleLookupSettings
 from app.services.sale_service_impl import SaleServiceImpl
+from app.services.pending_sale_sweeper import PendingSaleSweeper, SweeperSettings
+from app.infrastructure.core_service_client import CoreServiceClient
+from app.infrastructure.admission import AdmissionController, AdmissionMiddleware, AdmissionSettings
+from app.infrastructure.deadline import DeadlineMiddleware, DeadlineSettings
+from app.infrastructure.http_metrics import MetricsMiddleware, metrics_endpoint
+from app.infrastructure.mongo_monitoring import COMMAND_MONITOR, POOL_MONITOR
+from app.infrastructure.server_timing import ServerTimingMiddleware, ServerTimingSettings
+from app.infrastructure import tracing
+from app.infrastructure.profiling import ProfilingMiddleware, ProfilingSettings, RequestProfiler
+from app.infrastructure.loop_monitor import LoopMonitor, LoopMonitorSettings
+from app.infrastructure.logging_setup import LoggingSettings, LogSamplingMiddleware, configure_logging
+from app.infrastructure import metrics
+from app.infrastructure.memory_profiling import MemoryProfiler, MemoryProfilingSettings, container_report
 
-# Configuração do logging
-logging.basicConfig(level=logging.INFO)
+# Configuração do logging: os registros passam por uma fila e são escritos
+# por uma thread própria, fora do event loop
+logging_settings = LoggingSettings()
+log_listener = configure_logging(logging_settings)
 logger = logging.getLogger(__name__)
 
 # Carrega variáveis de ambiente
@@ -21,6 +44,11 @@ load_dotenv()
 
 app = FastAPI(title="Sales Service API")
 
+# Prazo de cada requisição, aplicado ao MongoDB e repassado ao core-service
+deadline_settings = DeadlineSettings()
+if deadline_settings.enabled:
+    app.add_middleware(DeadlineMiddleware, settings=deadline_settings)
+
 # Configuração do CORS
 app.add_middleware(
     CORSMiddleware,
@@ -30,9 +58,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Controle de admissão: sob pressão, recusa leituras com 503 antes de chegarem
+# ao pool do MongoDB; fica dentro das métricas para que as recusas sejam contadas
+admission_settings = AdmissionSettings()
+if admission_settings.enabled:
+    app.add_middleware(AdmissionMiddleware, controller=AdmissionController(admission_settings))
+
+# Métricas HTTP por rota, expostas em /metrics no formato do Prometheus
+app.add_middleware(MetricsMiddleware)
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# Rastreamento distribuído, propagado ao core-service pelo cabeçalho traceparent
+if tracing.configure():
+    app.add_middleware(tracing.TracingMiddleware)
+
+# Cabeçalho Server-Timing com o custo de cada requisição (desativado por padrão)
+if ServerTimingSettings().enabled:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Amostragem dos logs abaixo de WARNING por prefixo de caminho
+if logging_settings.sampling:
+    app.add_middleware(LogSamplingMiddleware, sampling=logging_settings.sampling)
+
+# Profiling sob demanda, armado pelas rotas /admin/profiling; sem PROFILING_ENABLED
+# o middleware nem é instalado
+admin_controller.admin_token = AdminSettings().token
+profiling_settings = ProfilingSettings()
+if profiling_settings.enabled:
+    admin_controller.profiler = RequestProfiler(profiling_settings, admin_controller.admin_token)
+    app.add_middleware(ProfilingMiddleware, profiler=admin_controller.profiler)
+
+# Profiling de memória pelas rotas /admin/memory: tracemalloc sob demanda e
+# tamanho dos caches e pools do processo
+memory_profiler = MemoryProfiler(MemoryProfilingSettings())
+admin_controller.memory_profiler = memory_profiler
+memory_profiler.register("log_queue", lambda: {
+    "entries": log_listener.queue.qsize(), "max_entries": log_listener.queue.maxsize
+})
+memory_profiler.register("metric_series", lambda: {
+    metric.name: len(metric.series()) for metric in metrics.REGISTRY.metrics()
+})
+memory_profiler.register("mongo_pools", POOL_MONITOR.stats)
+if COMMAND_MONITOR:
+    memory_profiler.register("mongo_slow_shapes", lambda: container_report(COMMAND_MONITOR.slow_shapes()))
+if isinstance(getattr(tracing.get_tracer(), "exporter", None), tracing.InMemoryExporter):
+    memory_profiler.register("trace_spans", lambda: container_report(tracing.get_tracer().exporter.spans()))
+if admin_controller.profiler:
+    memory_profiler.register("cpu_profiles", lambda: container_report(admin_controller.profiler.profiles))
+
 # Inicialização das dependências
 repository = None
 service = None
+core_client = None
+sweeper = None
+payment_workers = None
+loop_monitor = None
 
 @app.get("/health")
 async def health_check():
@@ -44,28 +124,34 @@ async def try_connect_mongodb(max_retries: int = 5, retry_delay: int = 5) -> Opt
     mongodb = MongoDB()
     for attempt in range(max_retries):
         try:
-            logger.info(f"Tentativa {attempt + 1} de {max_retries} de conexão com MongoDB...")
+            logger.info("Tentativa %d de %d de conexão com MongoDB...", attempt + 1, max_retries)
             await mongodb.connect()
             return mongodb
         except Exception as e:
             if attempt == max_retries - 1:
-                logger.error(f"Falha em todas as tentativas de conexão com MongoDB: {str(e)}")
+                logger.error("Falha em todas as tentativas de conexão com MongoDB: %s", e)
                 raise
-            logger.warning(f"Falha na tentativa {attempt + 1}. Tentando novamente em {retry_delay} segundos...")
+            logger.warning("Falha na tentativa %d. Tentando novamente em %d segundos...", attempt + 1, retry_delay)
             await asyncio.sleep(retry_delay)
     return None
 
 @app.on_event("startup")
 async def startup_event():
-    global repository, service
+    global repository, service, core_client, sweeper, payment_workers, loop_monitor
     try:
         logger.info("Iniciando o serviço...")
+        # Atraso e bloqueios do event loop
+        loop_monitor_settings = LoopMonitorSettings()
+        if loop_monitor_settings.enabled:
+            loop_monitor = LoopMonitor(loop_monitor_settings)
+            loop_monitor.start()
         # Conecta ao MongoDB com retry
         mongodb = await try_connect_mongodb()
         if not mongodb:
             raise Exception("Não foi possível conectar ao MongoDB após todas as tentativas")
         
         logger.info("Conectado ao MongoDB com sucesso!")
+        set_mongodb(mongodb)
         
         # Inicializa o repositório e o serviço
         repository = MongoDBSaleRepository(
@@ -74,16 +160,86 @@ async def startup_event():
             mongodb.settings.collection
         )
         service = SaleServiceImpl(repository)
+        await repository.ensure_indexes()
+
+        # Chaves de idempotência para criação de vendas e webhooks
+        idempotency_settings = IdempotencySettings()
+        idempotency_repository = MongoDBIdempotencyRepository(
+            mongodb.client,
+            mongodb.settings.db_name,
+            idempotency_settings.collection,
+            ttl_seconds=idempotency_settings.ttl_seconds,
+            lock_seconds=idempotency_settings.lock_seconds
+        )
+        await idempotency_repository.ensure_indexes()
+        sale_controller.idempotency_service = IdempotencyService(idempotency_repository)
+
+        core_client = CoreServiceClient()
+        sale_controller.core_client = core_client
+
+        # Cache de veículos usado na validação das vendas
+        lookup_settings = VehicleLookupSettings()
+        if lookup_settings.enabled:
+            sale_controller.vehicle_lookup = VehicleLookup(core_client, lookup_settings)
+            vehicle_cache = sale_controller.vehicle_lookup.cache
+            memory_profiler.register("vehicle_cache", lambda: {
+                **vehicle_cache.stats(), "approximate_bytes": vehicle_cache.approximate_bytes()
+            })
+            service = SaleServiceImpl(repository, sale_controller.vehicle_lookup)
+
+        # Fila assíncrona de eventos de pagamento
+        queue_settings = PaymentQueueSettings()
+        if queue_settings.enabled:
+            queue = MongoDBPaymentEventQueue(
+                mongodb.client,
+                mongodb.settings.db_name,
+                queue_settings.collection,
+                lease_seconds=queue_settings.lease_seconds
+            )
+            await queue.ensure_indexes()
+            payment_workers = PaymentEventWorkerPool(
+                queue, PaymentEventProcessor(repository, core_client, sale_controller.vehicle_lookup), queue_settings
+            )
+            payment_workers.start()
+            sale_controller.payment_event_workers = payment_workers
+            logger.info("Fila de eventos de pagamento iniciada com %d workers.", queue_settings.workers)
+
+        # Varredura de vendas pendentes expiradas
+        sweeper_settings = SweeperSettings()
+        if sweeper_settings.enabled:
+            sweeper = PendingSaleSweeper(repository, core_client, sweeper_settings, sale_controller.vehicle_lookup)
+            sweeper.start()
+            logger.info("Varredura de vendas pendentes iniciada.")
+
+        # Explain periódico das consultas mais lentas
+        if COMMAND_MONITOR and COMMAND_MONITOR.start_explainer(mongodb.client):
+            logger.info("Análise de consultas lentas iniciada.")
         logger.info("Serviço inicializado com sucesso!")
     except Exception as e:
-        logger.error(f"Erro ao inicializar o serviço: {str(e)}")
+        logger.error("Erro ao inicializar o serviço: %s", e)
         raise HTTPException(status_code=500, detail=f"Erro ao inicializar o serviço: {str(e)}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    if repository and repository.client:
-        await repository.client.close()
-        logger.info("Conexão com MongoDB fechada.")
+    sale_controller.payment_event_workers = None
+    if payment_workers:
+        await payment_workers.stop()
+    if sweeper:
+        await sweeper.stop()
+    if core_client:
+        await core_client.close()
+    if COMMAND_MONITOR:
+        await COMMAND_MONITOR.stop_explainer()
+    if loop_monitor:
+        await loop_monitor.stop()
+    sale_controller.idempotency_service = None
+    sale_controller.core_client = None
+    sale_controller.vehicle_lookup = None
+    await close_mongodb()
+    logger.info("Conexão com MongoDB fechada.")
+    tracing.shutdown()
+    log_listener.stop()
 
 # Inclui as rotas
-app.include_router(sale_router, tags=["sales"]) 
\ No newline at end of file
+app.include_router(sale_router, tags=["sales"]) 
+app.include_router(admin_router)
\ No newline at end of file
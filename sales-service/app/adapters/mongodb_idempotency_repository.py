@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.ports.idempotency_repository import IdempotencyRepository, STATE_COMPLETED, STATE_IN_PROGRESS
+from app.infrastructure.tracing import trace_methods
+
+
+@trace_methods
+class MongoDBIdempotencyRepository(IdempotencyRepository):
+    """
+    Chaves de idempotência guardadas no MongoDB.
+
+    A chave é o próprio `_id`, então cada consulta usa o índice primário. O campo
+    `expires_at` tem um índice TTL: registros em andamento expiram após
+    `lock_seconds` (caso o processo caia no meio da requisição) e respostas
+    gravadas após `ttl_seconds`. Uma reserva vencida pode ser assumida por
+    outra requisição antes de o índice TTL removê-la.
+    """
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        db_name: str = "sales_db",
+        collection_name: str = "idempotency_keys",
+        ttl_seconds: int = 24 * 60 * 60,
+        lock_seconds: int = 60,
+    ):
+        self.client = client
+        self.db = client[db_name]
+        self.collection = self.db[collection_name]
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    async def ensure_indexes(self) -> None:
+        """Cria o índice TTL que remove as chaves expiradas."""
+        await self.collection.create_index("expires_at", expireAfterSeconds=0, name="expires_at_ttl")
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Reserva a chave em uma única operação e retorna o registro anterior, se houver."""
+        now = datetime.utcnow()
+        lock = {
+            "state": STATE_IN_PROGRESS,
+            "fingerprint": fingerprint,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.lock_seconds)
+        }
+        try:
+            try:
+                previous = await self.collection.find_one_and_update(
+                    {"_id": key},
+                    {"$setOnInsert": lock},
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
+                )
+            except DuplicateKeyError:
+                # Duas requisições simultâneas tentaram inserir a mesma chave; a
+                # outra venceu e o registro dela já existe.
+                previous = await self.collection.find_one({"_id": key})
+            if previous is None or previous["state"] != STATE_IN_PROGRESS or previous["expires_at"] >= now:
+                return previous
+
+            # Reserva vencida de um processo que caiu no meio da requisição: o
+            # monitor de TTL do MongoDB só a remove até um minuto depois, então
+            # a chave é assumida aqui. O filtro garante que só uma requisição
+            # assume a reserva.
+            taken = await self.collection.find_one_and_update(
+                {"_id": key, "state": STATE_IN_PROGRESS, "expires_at": {"$lt": now}},
+                {"$set": lock}
+            )
+            if taken is not None:
+                return None
+            current = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            raise ValueError(f"Erro ao reservar chave de idempotência: {str(e)}")
+        # Outra requisição assumiu a reserva; se ela já foi removida, tenta de novo
+        return current if current is not None else await self.reserve(key, fingerprint)
+
+    async def complete(self, key: str, status_code: int, body: Any) -> None:
+        try:
+            await self.collection.update_one(
+                {"_id": key, "state": STATE_IN_PROGRESS},
+                {"$set": {
+                    "state": STATE_COMPLETED,
+                    "status_code": status_code,
+                    "body": body,
+                    "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+                }}
+            )
+        except Exception as e:
+            raise ValueError(f"Erro ao gravar resposta idempotente: {str(e)}")
+
+    async def release(self, key: str) -> None:
+        try:
+            await self.collection.delete_one({"_id": key, "state": STATE_IN_PROGRESS})
+        except Exception as e:
+            raise ValueError(f"Erro ao liberar chave de idempotência: {str(e)}")
@@ -0,0 +1,197 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DeleteOne, UpdateOne
+from app.ports.payment_event_queue import PaymentEventQueue
+
+STATE_PENDING = "pending"
+STATE_CLAIMED = "claimed"
+STATE_FAILED = "failed"
+
+
+class MongoDBPaymentEventQueue(PaymentEventQueue):
+    """
+    Fila de eventos de pagamento guardada no MongoDB.
+
+    Um evento reservado por um worker fica bloqueado por `lease_seconds`; se o
+    worker cair antes de confirmar, o evento volta a ficar disponível quando o
+    prazo vence. Eventos que esgotam as tentativas ficam com o estado `failed`
+    para análise e deixam de ser entregues.
+
+    Os eventos de um mesmo código de pagamento ficam com um worker por vez,
+    para que não sejam aplicados fora de ordem por lotes diferentes.
+    """
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        db_name: str = "sales_db",
+        collection_name: str = "payment_event_queue",
+        lease_seconds: int = 60,
+    ):
+        self.client = client
+        self.db = client[db_name]
+        self.collection = self.db[collection_name]
+        self.lease_seconds = lease_seconds
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index(
+            [("state", ASCENDING), ("enqueued_at", ASCENDING)],
+            name="state_enqueued_at"
+        )
+        await self.collection.create_index("claim", name="claim", sparse=True)
+        await self.collection.create_index("event.payment_code", name="event_payment_code", sparse=True)
+
+    async def enqueue(self, event: dict) -> str:
+        try:
+            result = await self.collection.insert_one({
+                "event": event,
+                "state": STATE_PENDING,
+                "attempts": 0,
+                "enqueued_at": datetime.utcnow()
+            })
+            return str(result.inserted_id)
+        except Exception as e:
+            raise ValueError(f"Erro ao enfileirar evento de pagamento: {str(e)}")
+
+    async def claim(self, limit: int) -> List[dict]:
+        """
+        Reserva eventos em três operações: busca os ids disponíveis, marca-os com
+        um token de reserva (condicionado ao estado lido, para que dois workers
+        não fiquem com o mesmo evento) e lê os que ficaram com o token.
+
+        Códigos de pagamento com evento reservado por outro worker são pulados.
+        Se duas reservas simultâneas ainda assim pegarem eventos do mesmo
+        código, fica com eles a que tiver o evento mais antigo; a outra os
+        devolve sem contar a tentativa.
+        """
+        try:
+            now = datetime.utcnow()
+            available = {"$or": [
+                {"state": STATE_PENDING},
+                {"state": STATE_CLAIMED, "lease_until": {"$lt": now}}
+            ]}
+            held = {"state": STATE_CLAIMED, "lease_until": {"$gte": now}}
+            query = dict(available)
+            locked = await self.collection.distinct("event.payment_code", held)
+            if locked:
+                query["event.payment_code"] = {"$nin": locked}
+            cursor = self.collection.find(query, {"_id": 1}).sort("enqueued_at", ASCENDING).limit(limit)
+            ids = [entry["_id"] async for entry in cursor]
+            if not ids:
+                return []
+
+            token = uuid.uuid4().hex
+            await self.collection.update_many(
+                {"_id": {"$in": ids}, **available},
+                {
+                    "$set": {
+                        "state": STATE_CLAIMED,
+                        "claim": token,
+                        "lease_until": now + timedelta(seconds=self.lease_seconds)
+                    },
+                    "$inc": {"attempts": 1}
+                }
+            )
+            cursor = self.collection.find({"claim": token}).sort("enqueued_at", ASCENDING)
+            entries = [_to_entry(entry) async for entry in cursor]
+            return await self._release_contended(entries, token, held)
+        except Exception as e:
+            raise ValueError(f"Erro ao reservar eventos de pagamento: {str(e)}")
+
+    async def _release_contended(self, entries: List[dict], token: str, held: dict) -> List[dict]:
+        """Devolve os eventos cujo código tem um evento mais antigo reservado por outro worker."""
+        ours = {}
+        for entry in entries:
+            code = _payment_code(entry["event"])
+            if code is not None:
+                ours[code] = min(ours.get(code, _position(entry)), _position(entry))
+        if not ours:
+            return entries
+
+        cursor = self.collection.find(
+            {"event.payment_code": {"$in": list(ours)}, "claim": {"$ne": token}, **held},
+            {"event.payment_code": 1, "enqueued_at": 1}
+        )
+        lost = set()
+        async for other in cursor:
+            code = other["event"]["payment_code"]
+            if (other["enqueued_at"], other["_id"]) < ours[code]:
+                lost.add(code)
+        if not lost:
+            return entries
+
+        released = [entry for entry in entries if _payment_code(entry["event"]) in lost]
+        await self.collection.update_many(
+            {"_id": {"$in": [ObjectId(entry["id"]) for entry in released]}, "claim": token},
+            {
+                "$set": {"state": STATE_PENDING},
+                "$unset": {"claim": "", "lease_until": ""},
+                "$inc": {"attempts": -1}
+            }
+        )
+        return [entry for entry in entries if _payment_code(entry["event"]) not in lost]
+
+    async def ack(self, entries: List[dict]) -> None:
+        if not entries:
+            return
+        try:
+            # Só remove eventos ainda reservados por este worker: se o prazo
+            # venceu e outro worker os reservou, a confirmação é dele
+            await self.collection.bulk_write([
+                DeleteOne({"_id": ObjectId(entry["id"]), "claim": entry["claim"]}) for entry in entries
+            ], ordered=False)
+        except Exception as e:
+            raise ValueError(f"Erro ao confirmar eventos de pagamento: {str(e)}")
+
+    async def retry(self, entries: List[dict], max_attempts: int) -> int:
+        if not entries:
+            return 0
+        try:
+            operations = []
+            discarded = 0
+            for entry in entries:
+                exhausted = entry["attempts"] >= max_attempts
+                discarded += exhausted
+                operations.append(UpdateOne(
+                    {"_id": ObjectId(entry["id"]), "claim": entry["claim"]},
+                    {
+                        "$set": {"state": STATE_FAILED if exhausted else STATE_PENDING},
+                        "$unset": {"claim": "", "lease_until": ""}
+                    }
+                ))
+            await self.collection.bulk_write(operations, ordered=False)
+            return discarded
+        except Exception as e:
+            raise ValueError(f"Erro ao devolver eventos de pagamento à fila: {str(e)}")
+
+    async def depth(self) -> int:
+        return await self.collection.count_documents({"state": {"$in": [STATE_PENDING, STATE_CLAIMED]}})
+
+    async def oldest_enqueued_at(self) -> Optional[datetime]:
+        entry = await self.collection.find_one(
+            {"state": {"$in": [STATE_PENDING, STATE_CLAIMED]}},
+            {"enqueued_at": 1},
+            sort=[("enqueued_at", ASCENDING)]
+        )
+        return entry["enqueued_at"] if entry else None
+
+
+def _to_entry(document: dict) -> dict:
+    return {
+        "id": str(document["_id"]),
+        "event": document["event"],
+        "attempts": document.get("attempts", 0),
+        "claim": document.get("claim"),
+        "enqueued_at": document.get("enqueued_at"),
+    }
+
+
+def _payment_code(event) -> Optional[str]:
+    return event.get("payment_code") if isinstance(event, dict) else None
+
+
+def _position(entry: dict) -> Tuple[datetime, ObjectId]:
+    return entry["enqueued_at"], ObjectId(entry["id"])
@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
-from app.domain.sale import Sale
+from pymongo import ASCENDING, ReturnDocument, UpdateMany, UpdateOne
+from app.domain.sale import Sale, PaymentStatus, PaymentUpdateOutcome
 from app.ports.sale_repository import SaleRepository
+from app.infrastructure.tracing import trace_methods
 from datetime import datetime
 
+@trace_methods
 class MongoDBSaleRepository(SaleRepository):
     """Implementação do repositório de vendas usando MongoDB."""
 
@@ -13,6 +16,23 @@ class MongoDBSaleRepository(SaleRepository):
         self.db = client[db_name]
         self.collection = self.db[collection_name]
 
+    async def ensure_indexes(self) -> None:
+        """Cria os índices usados pelas consultas do serviço."""
+        await self.collection.create_index(
+            [("payment_status", ASCENDING), ("created_at", ASCENDING)],
+            name="payment_status_created_at"
+        )
+        await self.collection.create_index("payment_code", name="payment_code")
+        await self.collection.create_index("vehicle_id", name="vehicle_id")
+        # Só as vendas canceladas cujo veículo ainda não foi liberado têm o campo
+        await self.collection.create_index(
+            "vehicle_release_pending", name="vehicle_release_pending", sparse=True
+        )
+        await self.collection.create_index(
+            [("vehicle.brand", ASCENDING), ("vehicle.model", ASCENDING), ("vehicle.year", ASCENDING)],
+            name="vehicle_brand_model_year"
+        )
+
     async def save(self, sale: Sale) -> Sale:
         """Salva uma venda."""
         try:
@@ -73,6 +93,42 @@ class MongoDBSaleRepository(SaleRepository):
         except Exception as e:
             raise ValueError(f"Erro ao listar vendas por status: {str(e)}")
 
+    async def find_by_vehicle(
+        self, brand: Optional[str] = None, model: Optional[str] = None, year: Optional[int] = None
+    ) -> List[Sale]:
+        """Lista vendas pelos dados do veículo guardados na própria venda."""
+        query = {}
+        if brand is not None:
+            query["vehicle.brand"] = brand
+        if model is not None:
+            query["vehicle.model"] = model
+        if year is not None:
+            query["vehicle.year"] = year
+        try:
+            return [Sale.from_dict(sale) async for sale in self.collection.find(query)]
+        except Exception as e:
+            raise ValueError(f"Erro ao listar vendas por veículo: {str(e)}")
+
+    async def refresh_vehicle_statuses(self, statuses: Dict[str, str]) -> int:
+        """
+        Atualiza o status do veículo guardado nas vendas, com um único
+        bulk_write. Vendas sem snapshot do veículo são ignoradas.
+        """
+        operations = [
+            UpdateMany(
+                {"vehicle_id": vehicle_id, "vehicle": {"$type": "object"}},
+                {"$set": {"vehicle.status": status}}
+            )
+            for vehicle_id, status in statuses.items()
+        ]
+        if not operations:
+            return 0
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            return result.modified_count
+        except Exception as e:
+            raise ValueError(f"Erro ao atualizar dados dos veículos nas vendas: {str(e)}")
+
     async def update(self, sale: Sale) -> Optional[Sale]:
         """Atualiza uma venda."""
         try:
@@ -87,10 +143,162 @@ class MongoDBSaleRepository(SaleRepository):
         except Exception as e:
             raise ValueError(f"Erro ao atualizar venda: {str(e)}")
 
+    async def update_fields(self, sale_id: str, fields: dict) -> Optional[Sale]:
+        """Aplica somente os campos informados e retorna a venda já atualizada."""
+        try:
+            if not ObjectId.is_valid(sale_id):
+                return None
+            sale = await self.collection.find_one_and_update(
+                {"_id": ObjectId(sale_id)},
+                {"$set": fields},
+                return_document=ReturnDocument.AFTER
+            )
+            if sale:
+                return Sale.from_dict(sale)
+            return None
+        except Exception as e:
+            raise ValueError(f"Erro ao atualizar venda: {str(e)}")
+
     async def delete(self, sale_id: str) -> bool:
         """Remove uma venda."""
         try:
             result = await self.collection.delete_one({"_id": ObjectId(sale_id)})
             return result.deleted_count > 0
         except Exception as e:
-            raise ValueError(f"Erro ao remover venda: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Erro ao remover venda: {str(e)}")
+
+    async def apply_payment_statuses(
+        self, statuses: Dict[str, PaymentStatus]
+    ) -> Dict[str, Tuple[PaymentUpdateOutcome, Optional[Sale]]]:
+        """
+        Aplica o status de pagamento de várias vendas, identificadas pelo código
+        de pagamento, com uma leitura e um único bulk_write.
+
+        Cada atualização só é aplicada se a venda ainda tiver o status lido;
+        vendas alteradas por outra operação entre a leitura e a escrita são
+        retornadas como CONFLICT.
+        """
+        if not statuses:
+            return {}
+        try:
+            sales = {}
+            async for sale in self.collection.find({"payment_code": {"$in": list(statuses)}}):
+                sales.setdefault(sale["payment_code"], sale)
+
+            # Identifica as vendas alteradas por esta chamada; `updated_at` não
+            # serve, pois outra operação no mesmo milissegundo teria o mesmo valor.
+            token = ObjectId()
+            now = datetime.utcnow()
+            outcomes: Dict[str, Tuple[PaymentUpdateOutcome, Optional[Sale]]] = {}
+            operations = []
+            pending: Dict[ObjectId, str] = {}
+            for payment_code, status in statuses.items():
+                sale = sales.get(payment_code)
+                if sale is None:
+                    outcomes[payment_code] = (PaymentUpdateOutcome.NOT_FOUND, None)
+                    continue
+                current = sale["payment_status"]
+                if current == status:
+                    outcomes[payment_code] = (PaymentUpdateOutcome.UNCHANGED, Sale.from_dict(sale))
+                    continue
+                operations.append(UpdateOne(
+                    {"_id": sale["_id"], "payment_status": current},
+                    {"$set": {"payment_status": status.value, "updated_at": now, "status_change": token}}
+                ))
+                sale.update(payment_status=status.value, updated_at=now)
+                outcomes[payment_code] = (PaymentUpdateOutcome.UPDATED, Sale.from_dict(sale))
+                pending[sale["_id"]] = payment_code
+
+            if operations:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                if result.modified_count < len(operations):
+                    applied = set()
+                    async for sale in self.collection.find(
+                        {"_id": {"$in": list(pending)}, "status_change": token}, {"_id": 1}
+                    ):
+                        applied.add(sale["_id"])
+                    for sale_id, payment_code in pending.items():
+                        if sale_id not in applied:
+                            outcomes[payment_code] = (PaymentUpdateOutcome.CONFLICT, None)
+            return outcomes
+        except Exception as e:
+            raise ValueError(f"Erro ao atualizar status de pagamento em lote: {str(e)}")
+
+    async def find_expired_pending(self, cutoff: datetime, limit: int) -> List[Tuple[str, str]]:
+        """
+        Retorna até `limit` vendas pendentes criadas antes de `cutoff`, das mais
+        antigas para as mais novas, como pares (id da venda, id do veículo).
+        """
+        try:
+            cursor = self.collection.find(
+                {"payment_status": PaymentStatus.PENDING.value, "created_at": {"$lt": cutoff}},
+                {"_id": 1, "vehicle_id": 1}
+            ).sort("created_at", ASCENDING).limit(limit)
+            return [(str(sale["_id"]), sale["vehicle_id"]) async for sale in cursor]
+        except Exception as e:
+            raise ValueError(f"Erro ao buscar vendas pendentes expiradas: {str(e)}")
+
+    async def cancel_pending(self, sales: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Cancela em uma única operação as vendas informadas que ainda estiverem
+        pendentes e retorna as que foram de fato canceladas.
+
+        Vendas pagas ou canceladas por outra operação depois da busca são
+        ignoradas, pois o filtro exige o status PENDENTE. As canceladas ficam
+        marcadas com `vehicle_release_pending` até o veículo ser liberado no
+        core-service (veja `clear_release_pending`).
+        """
+        if not sales:
+            return []
+        try:
+            ids = [ObjectId(sale_id) for sale_id, _ in sales]
+            # Identifica as vendas canceladas por esta chamada; `updated_at` não
+            # serve, pois outra operação no mesmo milissegundo teria o mesmo valor.
+            token = ObjectId()
+            result = await self.collection.update_many(
+                {"_id": {"$in": ids}, "payment_status": PaymentStatus.PENDING.value},
+                {"$set": {
+                    "payment_status": PaymentStatus.CANCELLED.value,
+                    "updated_at": datetime.utcnow(),
+                    "status_change": token,
+                    "vehicle_release_pending": True
+                }}
+            )
+            if result.modified_count == len(sales):
+                return list(sales)
+            if result.modified_count == 0:
+                return []
+            cursor = self.collection.find(
+                {"_id": {"$in": ids}, "status_change": token},
+                {"_id": 1}
+            )
+            cancelled = {str(sale["_id"]) async for sale in cursor}
+            return [sale for sale in sales if sale[0] in cancelled]
+        except Exception as e:
+            raise ValueError(f"Erro ao cancelar vendas pendentes: {str(e)}")
+
+    async def find_release_pending(self, limit: int) -> List[Tuple[str, str]]:
+        """
+        Retorna até `limit` vendas canceladas cujo veículo ainda não foi
+        liberado no core-service, como pares (id da venda, id do veículo).
+        """
+        try:
+            cursor = self.collection.find(
+                {"vehicle_release_pending": True}, {"_id": 1, "vehicle_id": 1}
+            ).limit(limit)
+            return [(str(sale["_id"]), sale["vehicle_id"]) async for sale in cursor]
+        except Exception as e:
+            raise ValueError(f"Erro ao buscar vendas com veículo a liberar: {str(e)}")
+
+    async def clear_release_pending(self, vehicle_ids: List[str]) -> int:
+        """Remove a marca de liberação pendente das vendas dos veículos já liberados."""
+        if not vehicle_ids:
+            return 0
+        try:
+            result = await self.collection.update_many(
+                {"vehicle_id": {"$in": vehicle_ids}, "vehicle_release_pending": True},
+                {"$unset": {"vehicle_release_pending": ""}}
+            )
+            return result.modified_count
+        except Exception as e:
+            raise ValueError(f"Erro ao remover a marca de liberação pendente: {str(e)}")
@@ -0,0 +1,192 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel, BaseSettings, Field
+
+from app.infrastructure.memory_profiling import GROUP_BY, MemoryProfiler
+from app.infrastructure.profiling import RequestProfiler
+
+
+class AdminSettings(BaseSettings):
+    """Acesso às rotas de administração; sem token, as rotas ficam desativadas."""
+    token: str = ""
+
+    class Config:
+        env_prefix = "ADMIN_"
+        env_file = ".env"
+
+
+# Definidos na inicialização da aplicação
+admin_token: str = ""
+profiler: Optional[RequestProfiler] = None
+memory_profiler: Optional[MemoryProfiler] = None
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")) -> None:
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Rotas de administração desativadas")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Token de administração inválido")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)], include_in_schema=False)
+
+
+class ProfilingRequest(BaseModel):
+    """Arma o profiling das próximas `requests` requisições de uma rota."""
+    route: str = Field(..., description="Template da rota, por exemplo /sales/{sale_id}")
+    method: str = "GET"
+    requests: int = Field(1, gt=0, le=1000)
+
+
+def get_profiler() -> RequestProfiler:
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling desativado")
+    return profiler
+
+
+def _profiling_state(profiler: RequestProfiler) -> dict:
+    return {
+        "armed": [
+            {"method": method, "route": route, "remaining": remaining}
+            for (method, route), remaining in profiler.armed.items()
+        ],
+        "header": profiler.settings.debug_header if profiler.header_enabled else None,
+        "profiles": profiler.list_profiles(),
+    }
+
+
+@router.get("/profiling")
+async def get_profiling(profiler: RequestProfiler = Depends(get_profiler)):
+    return _profiling_state(profiler)
+
+
+@router.post("/profiling")
+async def arm_profiling(body: ProfilingRequest, request: Request, profiler: RequestProfiler = Depends(get_profiler)):
+    method = body.method.upper()
+    if not any(
+        getattr(route, "path", None) == body.route and method in (getattr(route, "methods", None) or ())
+        for route in request.app.routes
+    ):
+        raise HTTPException(status_code=404, detail="Rota não encontrada")
+    profiler.arm(method, body.route, body.requests)
+    return _profiling_state(profiler)
+
+
+@router.delete("/profiling")
+async def disarm_profiling(profiler: RequestProfiler = Depends(get_profiler)):
+    profiler.disarm()
+    return _profiling_state(profiler)
+
+
+@router.get("/profiling/{name}")
+async def download_profile(name: str, profiler: RequestProfiler = Depends(get_profiler)):
+    if profiler.find(name) is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(profiler.path(name), media_type="application/octet-stream", filename=name)
+
+
+@router.get("/profiling/{name}/summary", response_class=PlainTextResponse)
+async def profile_summary(
+    name: str,
+    top: int = Query(30, gt=0, le=500),
+    profiler: RequestProfiler = Depends(get_profiler)
+):
+    if profiler.find(name) is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return PlainTextResponse(profiler.summary(name, top))
+
+
+class TracemallocRequest(BaseModel):
+    """Liga o tracemalloc guardando `frames` quadros por alocação."""
+    frames: Optional[int] = Field(None, gt=0, le=100)
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    if memory_profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling de memória desativado")
+    return memory_profiler
+
+
+def _group_by(group_by: str = Query("lineno", description="lineno, filename ou traceback")) -> str:
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"group_by deve ser um de {', '.join(GROUP_BY)}")
+    return group_by
+
+
+def _require_snapshot(memory_profiler: MemoryProfiler, name: str) -> None:
+    if memory_profiler.find(name) is None:
+        raise HTTPException(status_code=404, detail="Snapshot não encontrado")
+
+
+@router.get("/memory")
+async def get_memory(memory_profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    return memory_profiler.status()
+
+
+@router.get("/memory/caches")
+async def get_memory_caches(memory_profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    return memory_profiler.caches()
+
+
+@router.post("/memory/tracemalloc")
+async def start_tracemalloc(
+    body: Optional[TracemallocRequest] = None,
+    memory_profiler: MemoryProfiler = Depends(get_memory_profiler)
+):
+    memory_profiler.start(body.frames if body else None)
+    return memory_profiler.status()
+
+
+@router.delete("/memory/tracemalloc")
+async def stop_tracemalloc(memory_profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshots", status_code=201)
+async def take_snapshot(memory_profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    try:
+        info = await memory_profiler.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return info
+
+
+@router.delete("/memory/snapshots")
+async def clear_snapshots(memory_profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    memory_profiler.clear()
+    return memory_profiler.status()
+
+
+@router.get("/memory/snapshots/{name}")
+async def snapshot_top(
+    name: str,
+    group_by: str = Depends(_group_by),
+    top: int = Query(25, gt=0, le=500),
+    memory_profiler: MemoryProfiler = Depends(get_memory_profiler)
+):
+    _require_snapshot(memory_profiler, name)
+    return {
+        "snapshot": memory_profiler.find(name),
+        "statistics": await memory_profiler.top(name, group_by, top),
+    }
+
+
+@router.get("/memory/diff")
+async def snapshot_diff(
+    base: str,
+    target: str,
+    group_by: str = Depends(_group_by),
+    top: int = Query(25, gt=0, le=500),
+    memory_profiler: MemoryProfiler = Depends(get_memory_profiler)
+):
+    _require_snapshot(memory_profiler, base)
+    _require_snapshot(memory_profiler, target)
+    return {
+        "base": memory_profiler.find(base),
+        "target": memory_profiler.find(target),
+        "statistics": await memory_profiler.compare(base, target, group_by, top),
+    }
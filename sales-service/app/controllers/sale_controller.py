@@ -1,9 +1,8 @@
-from venv import logger
-from fastapi import APIRouter, HTTPException, Depends, Query
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Query, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from typing import List, Optional
-import httpx
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
 from bson import ObjectId
 
 from app.services.sale_service import SaleService
@@ -12,18 +11,35 @@ from app.schemas.sale_schema import (
     SaleCreate,
     SaleResponse,
     SaleUpdate,
-    PaymentStatus
+    VehicleSnapshotResponse,
+    PaymentStatus,
+    PaymentEventBatch,
+    PaymentEventBatchResult
 )
-from app.domain.sale import Sale
-from app.infrastructure.mongodb_config import MongoDB, MongoDBSettings
+from app.domain.sale import Sale, VehicleSnapshot
+from app.infrastructure.mongodb_config import get_mongodb
 from app.services.sale_service_impl import SaleServiceImpl
-from app.exceptions import SaleNotFoundError
+from app.services.idempotency_service import IdempotencyService
+from app.services.payment_event_processor import PaymentEventProcessor, refresh_vehicle_statuses
+from app.services.payment_event_workers import PaymentEventWorkerPool
+from app.infrastructure.core_service_client import CoreServiceClient, VEHICLE_STATUS_BY_PAYMENT_STATUS
+from app.infrastructure.server_timing import TimedRoute
+from app.services.vehicle_lookup import VehicleLookup, VehicleLoader
+from app.exceptions import SaleNotFoundError, InvalidSaleDataError
 
-router = APIRouter(tags=["sales"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["sales"], route_class=TimedRoute)
+
+# Configurado na inicialização da aplicação; sem ele as rotas ignoram as
+# chaves de idempotência.
+idempotency_service: Optional[IdempotencyService] = None
+core_client: Optional[CoreServiceClient] = None
+payment_event_workers: Optional[PaymentEventWorkerPool] = None
+vehicle_lookup: Optional[VehicleLookup] = None
 
 async def get_repository():
-    mongodb = MongoDB()
-    await mongodb.connect()
+    mongodb = await get_mongodb()
     return MongoDBSaleRepository(
         mongodb.client,
         mongodb.settings.db_name,
@@ -31,14 +47,98 @@ async def get_repository():
     )
 
 async def get_service(repository: MongoDBSaleRepository = Depends(get_repository)):
-    return SaleServiceImpl(repository)
+    return SaleServiceImpl(repository, vehicle_lookup)
+
+def get_idempotency_service() -> Optional[IdempotencyService]:
+    return idempotency_service
+
+def get_payment_event_workers() -> Optional[PaymentEventWorkerPool]:
+    return payment_event_workers
+
+def get_vehicle_loader() -> Optional[VehicleLoader]:
+    # Um carregador por requisição: o cache de veículos vale só para ela
+    return VehicleLoader(core_client) if core_client is not None else None
+
+async def notify_vehicle_status(sale: Sale, service: SaleServiceImpl) -> None:
+    """
+    Atualiza no core-service o status do veículo da venda. Falhas são apenas
+    registradas: a venda já foi gravada e a resposta não depende do core-service.
+    """
+    if core_client is None:
+        logger.warning("core-service não configurado; veículo %s não foi atualizado", sale.vehicle_id)
+        return
+    status = VEHICLE_STATUS_BY_PAYMENT_STATUS[sale.payment_status.value]
+    try:
+        response = await core_client.update_vehicle_statuses({sale.vehicle_id: status})
+    except Exception as e:
+        logger.error("Erro ao notificar o serviço principal: %s", e)
+        return
+    finally:
+        # O veículo em cache pode estar com o status anterior
+        if vehicle_lookup is not None:
+            vehicle_lookup.invalidate(sale.vehicle_id)
+    if sale.vehicle_id in response.get("transitioned", []):
+        await refresh_vehicle_statuses(service.repository, {sale.vehicle_id: status})
+    for rejection in response.get("rejected", []):
+        logger.warning(
+            "core-service recusou a alteração do veículo %s: %s", rejection.get("vehicle_id"), rejection.get("reason")
+        )
+
+async def to_responses(sales: List[Sale], loader: Optional[VehicleLoader] = None) -> List[SaleResponse]:
+    """
+    Converte as vendas em respostas. Com um carregador, os dados do veículo
+    guardados na venda são substituídos pelos atuais do core-service, buscados
+    em uma única chamada; se ela falhar, os dados guardados são mantidos.
+    """
+    responses = [SaleResponse.from_domain(sale) for sale in sales]
+    if loader is None or not sales:
+        return responses
+    try:
+        vehicles = await loader.load_many(sale.vehicle_id for sale in sales)
+    except Exception as e:
+        logger.warning("Erro ao buscar veículos de %d vendas no core-service: %s", len(sales), e)
+        return responses
+    for response, vehicle in zip(responses, vehicles):
+        if vehicle is not None:
+            response.vehicle = VehicleSnapshotResponse.from_orm(VehicleSnapshot.from_core(vehicle))
+    return responses
+
+async def get_payment_event_processor(repository: MongoDBSaleRepository = Depends(get_repository)):
+    return PaymentEventProcessor(repository, core_client, vehicle_lookup)
+
+async def run_idempotent(
+    idempotency: Optional[IdempotencyService], scope: str, key: Optional[str], payload, operation, status_code: int = 200
+):
+    """Executa a operação uma única vez por chave e repete a resposta gravada nas demais chamadas."""
+    if idempotency is None or not key:
+        body = await operation()
+    else:
+        status_code, body, replayed = await idempotency.execute(scope, key, payload, operation, status_code)
+        if replayed:
+            return JSONResponse(status_code=status_code, content=body, headers={"Idempotent-Replayed": "true"})
+    if status_code != 200:
+        return JSONResponse(status_code=status_code, content=body)
+    return body
 
 @router.post("/sales", response_model=SaleResponse)
 async def create_sale(
     sale: SaleCreate,
-    service: SaleServiceImpl = Depends(get_service)
+    service: SaleServiceImpl = Depends(get_service),
+    idempotency: Optional[IdempotencyService] = Depends(get_idempotency_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
-    """Cria uma nova venda."""
+    """
+    Cria uma nova venda.
+
+    Com o cabeçalho Idempotency-Key, repetições da mesma requisição recebem a
+    venda criada na primeira chamada em vez de criar outra.
+    """
+    async def operation():
+        return jsonable_encoder(await _create_sale(sale, service))
+
+    return await run_idempotent(idempotency, "create_sale", idempotency_key, sale.dict(), operation)
+
+async def _create_sale(sale: SaleCreate, service: SaleServiceImpl) -> SaleResponse:
     try:
         # Cria o objeto de domínio
         domain_sale = Sale(
@@ -55,6 +155,8 @@ async def create_sale(
         
         # Converte para o schema de resposta
         return SaleResponse.from_domain(created_sale)
+    except InvalidSaleDataError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -72,20 +174,41 @@ async def get_sale(sale_id: str, service: SaleService = Depends(get_service)):
         raise HTTPException(status_code=404, detail="Venda não encontrada")
 
 @router.get("/sales", response_model=List[SaleResponse])
-async def get_sales(service: SaleServiceImpl = Depends(get_service)):
-    """Lista todas as vendas."""
+async def get_sales(
+    brand: Optional[str] = Query(None, description="Marca do veículo"),
+    model: Optional[str] = Query(None, description="Modelo do veículo"),
+    year: Optional[int] = Query(None, description="Ano do veículo"),
+    include_vehicle: bool = Query(False, description="Inclui os dados atuais do veículo consultados no core-service"),
+    service: SaleServiceImpl = Depends(get_service),
+    loader: Optional[VehicleLoader] = Depends(get_vehicle_loader)
+):
+    """
+    Lista todas as vendas.
+
+    Os filtros por marca, modelo e ano usam os dados do veículo guardados na
+    venda, sem consultar o core-service. Com `include_vehicle`, os veículos de
+    todas as vendas listadas são buscados em uma única chamada ao core-service.
+    """
     try:
-        sales = await service.get_all_sales()
-        return [SaleResponse.from_domain(sale) for sale in sales]
+        if brand is None and model is None and year is None:
+            sales = await service.get_all_sales()
+        else:
+            sales = await service.search_sales(brand=brand, model=model, year=year)
+        return await to_responses(sales, loader if include_vehicle else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao listar vendas: {str(e)}")
 
 @router.get("/sales/status/{status}", response_model=List[SaleResponse])
-async def get_sales_by_status(status: PaymentStatus, service: SaleServiceImpl = Depends(get_service)):
+async def get_sales_by_status(
+    status: PaymentStatus,
+    include_vehicle: bool = Query(False, description="Inclui os dados atuais do veículo consultados no core-service"),
+    service: SaleServiceImpl = Depends(get_service),
+    loader: Optional[VehicleLoader] = Depends(get_vehicle_loader)
+):
     """Lista vendas por status."""
     try:
         sales = await service.get_sales_by_status(status)
-        return [SaleResponse.from_domain(sale) for sale in sales]
+        return await to_responses(sales, loader if include_vehicle else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao listar vendas por status: {str(e)}")
 
@@ -145,18 +268,8 @@ async def mark_sale_as_open(
             raise HTTPException(status_code=404, detail="Venda não encontrada")
         
         # Notifica o serviço principal sobre a mudança de status
-        async with httpx.AsyncClient() as client:
-            try:
-                await client.post(
-                    "http://core-service:8000/vehicles/sale-status",
-                    json={
-                        "vehicle_id": updated_sale.vehicle_id,
-                        "status": PaymentStatus.CANCELLED
-                    }
-                )
-            except Exception as e:
-                print(f"Erro ao notificar o serviço principal: {e}")
-        
+        await notify_vehicle_status(updated_sale, service)
+
         return SaleResponse.from_domain(updated_sale)
     except HTTPException:
         raise
@@ -175,18 +288,8 @@ async def mark_sale_as_pending(
             raise HTTPException(status_code=404, detail="Venda não encontrada")
         
         # Notifica o serviço principal sobre a mudança de status
-        async with httpx.AsyncClient() as client:
-            try:
-                await client.post(
-                    "http://core-service:8000/vehicles/sale-status",
-                    json={
-                        "vehicle_id": updated_sale.vehicle_id,
-                        "status": PaymentStatus.PENDING
-                    }
-                )
-            except Exception as e:
-                print(f"Erro ao notificar o serviço principal: {e}")
-        
+        await notify_vehicle_status(updated_sale, service)
+
         return SaleResponse.from_domain(updated_sale)
     except HTTPException:
         raise
@@ -205,87 +308,141 @@ async def mark_sale_as_paid(
             raise HTTPException(status_code=404, detail="Venda não encontrada")
         
         # Notifica o serviço principal sobre a mudança de status
-        async with httpx.AsyncClient() as client:
-            try:
-                await client.post(
-                    "http://core-service:8000/vehicles/sale-status",
-                    json={
-                        "vehicle_id": updated_sale.vehicle_id,
-                        "status": PaymentStatus.PAID
-                    }
-                )
-            except Exception as e:
-                print(f"Erro ao notificar o serviço principal: {e}")
-        
+        await notify_vehicle_status(updated_sale, service)
+
         return SaleResponse.from_domain(updated_sale)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao marcar venda como Pago: {str(e)}")
 
+@router.post("/sales/webhook/payment/batch", response_model=PaymentEventBatchResult)
+async def payment_webhook_batch(
+    batch: PaymentEventBatch,
+    processor: PaymentEventProcessor = Depends(get_payment_event_processor),
+    idempotency: Optional[IdempotencyService] = Depends(get_idempotency_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Webhook para atualização de status de pagamento em lote (até 1000 eventos).
+
+    Eventos inválidos não impedem o processamento dos demais; para o mesmo
+    payment_code vale o último evento do lote. Retorna o resultado de cada
+    evento, na ordem recebida.
+    """
+    async def operation():
+        try:
+            return jsonable_encoder(await processor.process(batch.events))
+        except ValueError as e:
+            logger.error(f"Erro ao processar lote de eventos de pagamento: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Erro ao processar lote de eventos de pagamento: {str(e)}")
+
+    return await run_idempotent(idempotency, "payment_webhook_batch", idempotency_key, batch.events, operation)
+
 @router.post("/sales/webhook/payment", response_model=SaleResponse)
 async def payment_webhook(
     payment_data: dict,
-    service: SaleServiceImpl = Depends(get_service)
+    service: SaleServiceImpl = Depends(get_service),
+    idempotency: Optional[IdempotencyService] = Depends(get_idempotency_service),
+    workers: Optional[PaymentEventWorkerPool] = Depends(get_payment_event_workers),
+    event_id_header: Optional[str] = Header(None, alias="X-Event-Id"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
-    """Webhook para atualização de status de pagamento."""
+    """
+    Webhook para atualização de status de pagamento.
+
+    Com a fila de eventos ativa, o evento é validado, gravado na fila e a rota
+    responde 202 imediatamente; os workers aplicam os eventos em lote. Sem a
+    fila, o evento é aplicado durante a requisição.
+
+    O identificador do evento (campo event_id, cabeçalho X-Event-Id ou
+    Idempotency-Key) evita que reenvios do provedor repitam a atualização e a
+    notificação ao core-service.
+    """
+    event_id = payment_data.get("event_id") or event_id_header or idempotency_key
+    payload = {key: value for key, value in payment_data.items() if key != "event_id"}
+
+    if workers is not None:
+        async def enqueue():
+            return await _enqueue_payment_event(payload, event_id, workers)
+
+        return await run_idempotent(idempotency, "payment_webhook", event_id, payload, enqueue, status_code=202)
+
+    async def operation():
+        return jsonable_encoder(await _process_payment_webhook(payload, service))
+
+    return await run_idempotent(idempotency, "payment_webhook", event_id, payload, operation)
+
+@router.get("/sales/webhook/payment/queue")
+async def payment_queue_stats(workers: Optional[PaymentEventWorkerPool] = Depends(get_payment_event_workers)):
+    """Profundidade da fila de eventos de pagamento, idade do evento mais antigo e eventos processados."""
+    if workers is None:
+        raise HTTPException(status_code=503, detail="Fila de eventos de pagamento não está ativa")
+    return await workers.refresh_stats()
+
+def _parse_payment_data(payment_data: dict):
+    """Valida os campos obrigatórios do evento e retorna (payment_code, status, vehicle_id)."""
+    payment_code = payment_data.get("payment_code")
+    status = payment_data.get("status")
+    vehicle_id = payment_data.get("vehicle_id")
+
+    if not all([payment_code, status, vehicle_id]):
+        raise HTTPException(
+            status_code=400,
+            detail="Dados de pagamento incompletos. São necessários: payment_code, status e vehicle_id"
+        )
+
+    # Valida o status
     try:
-        logger.info(f"Recebido webhook de pagamento: {payment_data}")
-        
-        payment_code = payment_data.get("payment_code")
-        status = payment_data.get("status")
-        vehicle_id = payment_data.get("vehicle_id")
+        payment_status = PaymentStatus(str(status).upper())
+    except ValueError:
+        logger.error(f"Status inválido: {status}")
+        raise HTTPException(
+            status_code=400,
+            detail="Status de pagamento inválido. Valores aceitos: PAGO, PENDENTE, CANCELADO"
+        )
+    return payment_code, payment_status, vehicle_id
 
-        if not all([payment_code, status, vehicle_id]):
-            raise HTTPException(
-                status_code=400,
-                detail="Dados de pagamento incompletos. São necessários: payment_code, status e vehicle_id"
-            )
+async def _enqueue_payment_event(payment_data: dict, event_id: Optional[str], workers: PaymentEventWorkerPool) -> dict:
+    payment_code, payment_status, vehicle_id = _parse_payment_data(payment_data)
+    try:
+        queue_id = await workers.queue.enqueue({
+            "payment_code": payment_code,
+            "status": payment_status.value,
+            "vehicle_id": vehicle_id,
+            "event_id": event_id
+        })
+    except ValueError as e:
+        logger.error(f"Erro ao enfileirar webhook de pagamento: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao processar webhook de pagamento: {str(e)}")
+    workers.notify()
+    return {"status": "accepted", "queue_id": queue_id, "event_id": event_id, "payment_code": payment_code}
 
-        # Valida o status
-        try:
-            logger.info(f"Tentando converter status: {status}")
-            payment_status = PaymentStatus(status.upper())
-            logger.info(f"Status convertido com sucesso: {payment_status}")
-        except ValueError:
-            logger.error(f"Status inválido: {status}")
-            raise HTTPException(
-                status_code=400,
-                detail="Status de pagamento inválido. Valores aceitos: PAGO, PENDENTE, CANCELADO"
-            )
+async def _process_payment_webhook(payment_data: dict, service: SaleServiceImpl) -> SaleResponse:
+    try:
+        # Logs com argumentos, não f-strings: a mensagem só é formatada pela
+        # thread do log, e apenas se o registro não for descartado
+        logger.debug("Webhook de pagamento recebido: %s", payment_data)
+        payment_code, payment_status, vehicle_id = _parse_payment_data(payment_data)
 
         # Busca a venda pelo código de pagamento
-        logger.info(f"Buscando venda pelo código de pagamento: {payment_code}")
         sale = await service.get_sale_by_payment_code(payment_code)
         if not sale:
-            logger.error(f"Venda não encontrada para o código: {payment_code}")
+            logger.error("Venda não encontrada para o código: %s", payment_code)
             raise HTTPException(status_code=404, detail="Venda não encontrada para o código de pagamento fornecido")
-        
-        logger.info(f"Venda encontrada: {sale.id}")
 
         # Atualiza o status da venda usando o ID
-        logger.info(f"Atualizando status da venda {sale.id} para {payment_status}")
         updated_sale = await service.update_payment_status(sale.id, payment_status)
         if not updated_sale:
-            logger.error(f"Erro ao atualizar status da venda {sale.id}")
+            logger.error("Erro ao atualizar status da venda %s", sale.id)
             raise HTTPException(status_code=404, detail="Erro ao atualizar status da venda")
 
         # Notifica o serviço principal sobre a mudança de status
-        logger.info(f"Notificando core-service sobre mudança de status do veículo {vehicle_id}")
-        async with httpx.AsyncClient() as client:
-            try:
-                await client.post(
-                    "http://core-service:8000/vehicles/sale-status",
-                    json={
-                        "vehicle_id": vehicle_id,
-                        "status": payment_status.value
-                    }
-                )
-                logger.info("Notificação enviada com sucesso")
-            except Exception as e:
-                logger.error(f"Erro ao notificar o serviço principal: {e}")
-                # Não interrompe o fluxo se falhar a notificação
-                pass
+        await notify_vehicle_status(updated_sale, service)
+        logger.info(
+            "Pagamento %s aplicado à venda %s", payment_status.value, sale.id,
+            extra={"sale_id": sale.id, "payment_code": payment_code, "vehicle_id": updated_sale.vehicle_id}
+        )
 
         return SaleResponse.from_domain(updated_sale)
     except HTTPException:
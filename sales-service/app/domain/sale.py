@@ -9,6 +9,14 @@ class PaymentStatus(str, Enum):
     PAID = "PAGO"
     CANCELLED = "CANCELADA"
 
+class PaymentUpdateOutcome(str, Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"
+    INVALID = "invalid"
+    SUPERSEDED = "superseded"
+
 class PyObjectId(ObjectId):
     @classmethod
     def __get_validators__(cls):
@@ -24,6 +32,27 @@ class PyObjectId(ObjectId):
     def __modify_schema__(cls, field_schema):
         field_schema.update(type="string")
 
+class VehicleSnapshot(BaseModel):
+    """Cópia resumida do veículo no core-service, guardada junto com a venda."""
+    brand: str
+    model: str
+    year: int
+    color: Optional[str] = None
+    list_price: Optional[float] = None
+    status: Optional[str] = None
+
+    @classmethod
+    def from_core(cls, vehicle: dict) -> "VehicleSnapshot":
+        """Cria o snapshot a partir do veículo retornado pelo core-service."""
+        return cls(
+            brand=vehicle["brand"],
+            model=vehicle["model"],
+            year=vehicle["year"],
+            color=vehicle.get("color"),
+            list_price=vehicle.get("price"),
+            status=vehicle.get("status")
+        )
+
 class Sale(BaseModel):
     """Modelo de domínio para uma venda."""
     id: Optional[str] = None
@@ -32,6 +61,7 @@ class Sale(BaseModel):
     sale_price: float
     payment_code: str
     payment_status: PaymentStatus = PaymentStatus.PENDING
+    vehicle: Optional[VehicleSnapshot] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -65,6 +95,7 @@ class Sale(BaseModel):
             "sale_price": self.sale_price,
             "payment_code": self.payment_code,
             "payment_status": self.payment_status,
+            "vehicle": self.vehicle.dict() if self.vehicle else None,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
@@ -79,6 +110,7 @@ class Sale(BaseModel):
             sale_price=data["sale_price"],
             payment_code=data["payment_code"],
             payment_status=PaymentStatus(data["payment_status"]),
+            vehicle=VehicleSnapshot(**data["vehicle"]) if data.get("vehicle") else None,
             created_at=data.get("created_at"),
             updated_at=data.get("updated_at")
         ) 
\ No newline at end of file
@@ -18,4 +18,20 @@ class DuplicatePaymentCodeError(Exception):
 
 class InvalidPaymentStatusError(Exception):
     def __init__(self, message="Status de pagamento inválido"):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class IdempotencyKeyInProgressError(HTTPException):
+    """Exceção lançada quando uma requisição com a mesma chave ainda está em processamento."""
+    def __init__(self, key: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Requisição com a chave de idempotência {key} ainda está em processamento"
+        )
+
+class IdempotencyKeyMismatchError(HTTPException):
+    """Exceção lançada quando uma chave de idempotência é reutilizada com outro conteúdo."""
+    def __init__(self, key: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Chave de idempotência {key} já foi usada com um conteúdo diferente"
+        )
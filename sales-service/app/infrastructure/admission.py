@@ -0,0 +1,154 @@
+import json
+from typing import Callable, Dict, Literal, Optional
+
+from pydantic import BaseSettings, Field
+
+from app.infrastructure import metrics
+from app.infrastructure.mongo_monitoring import POOL_MONITOR
+
+READ = "read"
+WRITE = "write"
+WEBHOOK = "webhook"
+# Rotas fora do controle de admissão
+EXEMPT = "exempt"
+
+ROUTE_CLASSES = (READ, WRITE, WEBHOOK)
+
+ADMISSION_IN_FLIGHT = metrics.gauge(
+    "sales_admission_in_flight",
+    "Requisições em andamento, por classe de rota",
+    ["route_class"]
+)
+ADMISSION_REJECTED = metrics.counter(
+    "sales_admission_rejected_total",
+    "Requisições recusadas com 503 pelo controle de admissão, por classe de rota e motivo (limit, pool)",
+    ["route_class", "reason"]
+)
+
+
+class AdmissionSettings(BaseSettings):
+    """
+    Controle de admissão: limita as requisições simultâneas por classe de rota
+    e recusa leituras enquanto há fila de espera no pool do MongoDB.
+    """
+    enabled: bool = False
+    # Requisições simultâneas por classe; 0 desativa o limite
+    max_reads: int = Field(100, ge=0)
+    max_writes: int = Field(0, ge=0)
+    max_webhooks: int = Field(0, ge=0)
+    # Operações aguardando conexão no pool a partir das quais leituras são
+    # recusadas; 0 desativa
+    pool_waiters_limit: int = Field(10, ge=0)
+    retry_after_seconds: int = Field(1, gt=0)
+    # Classe por prefixo de caminho, valendo o mais longo; sem prefixo, GET e
+    # HEAD são leituras e os demais métodos, escritas
+    route_classes: Dict[str, Literal["read", "write", "webhook", "exempt"]] = {
+        "/sales/webhook/payment": WEBHOOK,
+        "/sales/webhook/payment/queue": READ,
+        "/health": EXEMPT,
+        "/metrics": EXEMPT,
+        "/admin": EXEMPT,
+        "/docs": EXEMPT,
+        "/openapi.json": EXEMPT,
+    }
+
+    class Config:
+        env_prefix = "ADMISSION_"
+        env_file = ".env"
+
+
+class AdmissionController:
+    """
+    Conta as requisições em andamento por classe de rota e decide quais
+    entram. Leituras são as primeiras a sair: além do próprio limite, são
+    recusadas quando o pool do MongoDB já tem operações esperando conexão,
+    pois aceitá-las só aumentaria a fila até tudo estourar o prazo. Escritas
+    e webhooks só são recusados pelos próprios limites, desligados por
+    padrão.
+
+    Roda só no event loop, então os contadores dispensam lock.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[AdmissionSettings] = None,
+        pool_waiters: Callable[[], int] = POOL_MONITOR.waiters,
+    ):
+        self.settings = settings or AdmissionSettings()
+        self.pool_waiters = pool_waiters
+        self.limits = {
+            READ: self.settings.max_reads,
+            WRITE: self.settings.max_writes,
+            WEBHOOK: self.settings.max_webhooks,
+        }
+        self.in_flight = dict.fromkeys(ROUTE_CLASSES, 0)
+        self.prefixes = sorted(self.settings.route_classes.items(), key=lambda item: len(item[0]), reverse=True)
+        self._gauges = {route_class: ADMISSION_IN_FLIGHT.labels(route_class) for route_class in ROUTE_CLASSES}
+
+    def classify(self, method: str, path: str) -> str:
+        for prefix, route_class in self.prefixes:
+            if path.startswith(prefix):
+                return route_class
+        return READ if method in ("GET", "HEAD") else WRITE
+
+    def rejection(self, route_class: str) -> Optional[str]:
+        """Motivo para recusar uma requisição da classe agora, ou None."""
+        limit = self.limits[route_class]
+        if limit and self.in_flight[route_class] >= limit:
+            return "limit"
+        waiters_limit = self.settings.pool_waiters_limit
+        if route_class == READ and waiters_limit and self.pool_waiters() >= waiters_limit:
+            return "pool"
+        return None
+
+    def enter(self, route_class: str) -> None:
+        self.in_flight[route_class] += 1
+        self._gauges[route_class].inc()
+
+    def leave(self, route_class: str) -> None:
+        self.in_flight[route_class] -= 1
+        self._gauges[route_class].dec()
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI do controle de admissão. Recusa antes de ler o corpo da
+    requisição, com 503 e Retry-After, para que a recusa custe pouco.
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or AdmissionController()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        if route_class == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        reason = self.controller.rejection(route_class)
+        if reason is not None:
+            ADMISSION_REJECTED.labels(route_class, reason).inc()
+            await _send_overloaded(send, self.controller.settings.retry_after_seconds)
+            return
+        self.controller.enter(route_class)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.leave(route_class)
+
+
+async def _send_overloaded(send, retry_after_seconds: int) -> None:
+    body = json.dumps({"detail": "Serviço sobrecarregado; tente novamente em instantes"}, ensure_ascii=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after_seconds).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+from app.infrastructure import metrics
+
+LOADER_REQUESTS = metrics.counter(
+    "sales_batch_loader_requests_total",
+    "Chaves pedidas aos carregadores em lote, por resultado (fetched, cached)",
+    ["loader", "result"]
+)
+LOADER_BATCHES = metrics.counter(
+    "sales_batch_loader_batches_total",
+    "Consultas em lote feitas pelos carregadores",
+    ["loader"]
+)
+
+BatchFunction = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    """
+    Carregador em lote no estilo DataLoader.
+
+    Todas as chaves pedidas com `load` na mesma volta do event loop são
+    reunidas, sem repetição, em uma única chamada a `batch_fn` (dividida em
+    lotes de no máximo `max_batch_size`). Os resultados ficam guardados na
+    instância, então cada chave é consultada no máximo uma vez enquanto o
+    carregador existir; crie um carregador por requisição. Chaves ausentes do
+    resultado de `batch_fn` retornam None. Falhas não são guardadas.
+    """
+
+    def __init__(self, name: str, batch_fn: BatchFunction, max_batch_size: int = 1000):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size deve ser maior que zero")
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self._batch_fn = batch_fn
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        self._pending: List[Hashable] = []
+        self._dispatch_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.fetched = 0
+        self.cached = 0
+        self._fetched_metric = LOADER_REQUESTS.labels(name, "fetched")
+        self._cached_metric = LOADER_REQUESTS.labels(name, "cached")
+        self._batches_metric = LOADER_BATCHES.labels(name)
+
+    async def load(self, key: Hashable) -> Optional[Any]:
+        future = self._results.get(key)
+        if future is not None:
+            self.cached += 1
+            self._cached_metric.inc()
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            self._pending.append(key)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        self._dispatch_scheduled = False
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(self._run_batch(keys[start:start + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[Hashable]) -> None:
+        self.batches += 1
+        self.fetched += len(keys)
+        self._batches_metric.inc()
+        self._fetched_metric.inc(len(keys))
+        try:
+            results = await self._batch_fn(keys)
+        except BaseException as e:
+            for key in keys:
+                future = self._results.pop(key)
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    # Evita o aviso de exceção não recuperada quando ninguém aguardava
+                    future.exception()
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key in keys:
+            self._results[key].set_result(results.get(key))
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "batches": self.batches,
+            "fetched": self.fetched,
+            "cached": self.cached,
+        }
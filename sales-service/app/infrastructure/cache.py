@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.infrastructure import metrics
+from app.infrastructure.memory_profiling import approximate_size
+
+CACHE_REQUESTS = metrics.counter(
+    "sales_cache_requests_total",
+    "Consultas aos caches em memória, por resultado (hit, miss, coalesced)",
+    ["cache", "result"]
+)
+CACHE_EVICTIONS = metrics.counter(
+    "sales_cache_evictions_total",
+    "Entradas removidas dos caches em memória por limite de tamanho",
+    ["cache"]
+)
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por tempo e descarte LRU.
+
+    `get_or_load` agrupa consultas simultâneas da mesma chave: o valor é
+    carregado uma vez, numa tarefa compartilhada, e todas aguardam o mesmo
+    resultado em vez de repetir a consulta. Resultados None são guardados por
+    `negative_ttl_seconds` (cache negativo), para que ids inexistentes não
+    gerem uma consulta a cada chamada.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 10000,
+        ttl_seconds: float = 30.0,
+        negative_ttl_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size deve ser maior que zero")
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._hits = CACHE_REQUESTS.labels(name, "hit")
+        self._misses = CACHE_REQUESTS.labels(name, "miss")
+        self._coalesced = CACHE_REQUESTS.labels(name, "coalesced")
+        self._evictions = CACHE_EVICTIONS.labels(name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Retorna (encontrado, valor) sem carregar valores ausentes."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds if value is not None else self.negative_ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        self._entries[key] = (self._clock() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        found, value = self.get(key)
+        if found:
+            self._hits.inc()
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._coalesced.inc()
+        else:
+            self._misses.inc()
+            # O carregamento roda numa tarefa própria: cancelar quem o iniciou
+            # não cancela os demais que aguardam o mesmo resultado
+            task = asyncio.create_task(self._load(key, loader))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader(key)
+        finally:
+            current = self._inflight.get(key) is task
+            if current:
+                del self._inflight[key]
+        # Se a chave foi invalidada durante a consulta, o valor pode ser anterior
+        # à mudança: é entregue a quem já aguardava, mas não fica em cache
+        if current:
+            self.set(key, value)
+        return value
+
+    def approximate_bytes(self) -> int:
+        """Tamanho aproximado das entradas; percorre todas, então é só para diagnóstico."""
+        return approximate_size(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "inflight": len(self._inflight),
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "coalesced": self._coalesced.value,
+            "evictions": self._evictions.value,
+        }
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Evita o aviso de exceção não recuperada quando ninguém mais aguardava
+    if not task.cancelled():
+        task.exception()
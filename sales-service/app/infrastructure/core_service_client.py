@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from pydantic import BaseSettings, Field
+
+from app.infrastructure import deadline as request_deadline
+from app.infrastructure import request_cost, tracing
+from app.infrastructure.resilience import CircuitBreaker, LatencyTracker, hedged
+
+# Carrega variáveis de ambiente
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VEHICLE_AVAILABLE = "DISPONÍVEL"
+VEHICLE_RESERVED = "RESERVADO"
+VEHICLE_SOLD = "VENDIDO"
+
+# Status do veículo no core-service correspondente a cada status de pagamento
+VEHICLE_STATUS_BY_PAYMENT_STATUS = {
+    "PAGO": VEHICLE_SOLD,
+    "PENDENTE": VEHICLE_RESERVED,
+    "CANCELADA": VEHICLE_AVAILABLE,
+}
+
+# Recusas do core-service que indicam que o veículo já não está reservado:
+# não há mais o que liberar
+RELEASE_SETTLED_REASONS = frozenset({
+    "Apenas veículos reservados podem ser marcados como disponíveis",
+    "Veículo não encontrado",
+})
+
+# Limite de transições aceito por POST /vehicles/bulk-status no core-service
+MAX_TRANSITIONS_PER_CALL = 1000
+# Limite de ids aceito por POST /vehicles/lookup no core-service
+MAX_LOOKUP_IDS_PER_CALL = 1000
+
+
+class CoreServiceSettings(BaseSettings):
+    """Configurações de acesso ao core-service."""
+    url: str = os.getenv("CORE_SERVICE_URL", "http://core-service:8000")
+    # Prazo total de cada chamada, incluindo a requisição de reserva
+    timeout_seconds: float = Field(5.0, gt=0)
+    read_timeout_seconds: float = Field(2.0, gt=0)
+    breaker_failure_threshold: int = Field(5, gt=0)
+    breaker_reset_seconds: float = Field(30.0, gt=0)
+    hedge_enabled: bool = True
+    hedge_percentile: float = Field(0.95, gt=0, le=1)
+    hedge_min_samples: int = Field(20, gt=0)
+    hedge_min_delay_ms: float = Field(5.0, ge=0)
+
+    class Config:
+        env_prefix = "CORE_SERVICE_"
+        env_file = ".env"
+
+
+class CoreServiceClient:
+    """
+    Cliente HTTP do core-service, com uma única conexão reaproveitada entre chamadas.
+
+    Cada rota do core-service tem seu próprio disjuntor: com o core-service
+    fora do ar as chamadas falham na hora, sem esperar o timeout. Toda chamada
+    tem um prazo total; leituras idempotentes disparam uma segunda requisição
+    quando a primeira passa do p95 de latência da rota e usam a que responder
+    primeiro.
+    """
+
+    def __init__(self, settings: Optional[CoreServiceSettings] = None, http_client: Optional[httpx.AsyncClient] = None):
+        self.settings = settings or CoreServiceSettings()
+        self._client = http_client
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.settings.url.rstrip("/"),
+                timeout=self.settings.timeout_seconds
+            )
+        return self._client
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                f"core_service.{endpoint}",
+                failure_threshold=self.settings.breaker_failure_threshold,
+                reset_timeout_seconds=self.settings.breaker_reset_seconds,
+            )
+        return breaker
+
+    def _latency(self, endpoint: str) -> LatencyTracker:
+        tracker = self._latencies.get(endpoint)
+        if tracker is None:
+            tracker = self._latencies[endpoint] = LatencyTracker(min_samples=self.settings.hedge_min_samples)
+        return tracker
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        if not self.settings.hedge_enabled:
+            return None
+        delay = self._latency(endpoint).percentile(self.settings.hedge_percentile)
+        if delay is None:
+            return None
+        return max(delay, self.settings.hedge_min_delay_ms / 1000)
+
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        timeout: float,
+        idempotent: bool = False,
+        json: Optional[Any] = None,
+    ) -> httpx.Response:
+        """
+        Faz a chamada passando pelo disjuntor da rota. Erros de rede, prazo
+        esgotado e respostas 5xx contam como falha; demais respostas, como
+        sucesso.
+
+        O prazo da chamada nunca passa do prazo da requisição em andamento,
+        que é repassado ao core-service no cabeçalho X-Request-Timeout-Ms,
+        junto com o traceparent do trace atual. Se é esse prazo que se
+        esgota, a chamada levanta DeadlineExceeded e não conta como falha do
+        core-service.
+        """
+        timeout = request_deadline.bound(timeout)
+        breaker = self.breaker(endpoint)
+        breaker.before_call()
+        latency = self._latency(endpoint)
+        call_deadline = time.monotonic() + timeout
+
+        async def attempt() -> httpx.Response:
+            with tracing.span(f"core-service {endpoint}", tracing.KIND_CLIENT, **{
+                "http.method": method, "http.url": url
+            }) as client_span:
+                started = time.monotonic()
+                response = await self.client.request(
+                    method, url, json=json,
+                    headers={**request_deadline.outgoing_headers(), **tracing.outgoing_headers()},
+                    timeout=max(call_deadline - started, 0.001)
+                )
+                latency.observe(time.monotonic() - started)
+                client_span.set_attribute("http.status_code", response.status_code)
+                return response
+
+        delay = self._hedge_delay(endpoint) if idempotent else None
+        call = attempt() if delay is None else hedged(endpoint, attempt, delay, is_failure=_is_server_error)
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(call, timeout)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            if request_deadline.expired():
+                breaker.release()
+                raise request_deadline.DeadlineExceeded() from e
+            breaker.record_failure()
+            raise
+        finally:
+            request_cost.record_http(time.perf_counter() - started)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def get_vehicle(self, vehicle_id: str) -> Optional[dict]:
+        """Busca um veículo via GET /vehicles/{id}; retorna None se ele não existir."""
+        response = await self._request(
+            "get_vehicle", "GET", f"/vehicles/{vehicle_id}",
+            timeout=self.settings.read_timeout_seconds, idempotent=True
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def get_vehicles(self, vehicle_ids: List[str]) -> Dict[str, dict]:
+        """
+        Busca vários veículos via POST /vehicles/lookup, indexados pelo id.
+
+        Ids inexistentes ficam fora do resultado. Listas maiores que o limite
+        da rota são divididas em várias chamadas.
+        """
+        vehicles: Dict[str, dict] = {}
+        for start in range(0, len(vehicle_ids), MAX_LOOKUP_IDS_PER_CALL):
+            response = await self._request(
+                "lookup", "POST", "/vehicles/lookup",
+                timeout=self.settings.read_timeout_seconds, idempotent=True,
+                json={"ids": vehicle_ids[start:start + MAX_LOOKUP_IDS_PER_CALL]}
+            )
+            response.raise_for_status()
+            for vehicle in response.json().get("vehicles", []):
+                vehicles[vehicle["id"]] = vehicle
+        return vehicles
+
+    async def update_vehicle_statuses(self, transitions: Dict[str, str]) -> Dict[str, List]:
+        """
+        Altera o status de vários veículos via POST /vehicles/bulk-status.
+
+        Retorna os ids dos veículos alterados e os rejeitados, no formato do core-service.
+        Lotes maiores que o limite da rota são divididos em várias chamadas.
+        """
+        items = [{"vehicle_id": vehicle_id, "status": status} for vehicle_id, status in transitions.items()]
+        result: Dict[str, List] = {"transitioned": [], "rejected": []}
+        for start in range(0, len(items), MAX_TRANSITIONS_PER_CALL):
+            response = await self._request(
+                "bulk_status", "POST", "/vehicles/bulk-status",
+                timeout=self.settings.timeout_seconds,
+                json={"transitions": items[start:start + MAX_TRANSITIONS_PER_CALL]}
+            )
+            response.raise_for_status()
+            body = response.json()
+            result["transitioned"].extend(body.get("transitioned", []))
+            result["rejected"].extend(body.get("rejected", []))
+        return result
+
+    async def release_vehicles(self, vehicle_ids: Iterable[str]) -> Dict[str, List]:
+        """Marca os veículos como disponíveis novamente."""
+        return await self.update_vehicle_statuses({vehicle_id: VEHICLE_AVAILABLE for vehicle_id in vehicle_ids})
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _is_server_error(response: httpx.Response) -> bool:
+    return response.status_code >= 500
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+import pymongo
+from pydantic import BaseSettings, Field
+
+from app.infrastructure import metrics
+
+# Tempo restante, em milissegundos, que o chamador ainda espera pela resposta
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+
+DEADLINE_EXCEEDED = metrics.counter(
+    "sales_deadline_exceeded_total",
+    "Requisições encerradas com 504 porque o prazo do chamador se esgotou"
+)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """O prazo da requisição atual se esgotou."""
+
+    def __init__(self, message: str = "Prazo da requisição esgotado"):
+        super().__init__(message)
+
+
+class DeadlineSettings(BaseSettings):
+    """Prazos das requisições recebidas pelo serviço."""
+    enabled: bool = True
+    default_timeout_ms: int = Field(10000, gt=0)
+    max_timeout_ms: int = Field(60000, gt=0)
+    # Prazo padrão por prefixo de caminho; vale o prefixo mais longo
+    route_timeouts_ms: Dict[str, int] = {"/sales/webhook/payment/batch": 30000}
+
+    class Config:
+        env_prefix = "DEADLINE_"
+        env_file = ".env"
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes até o prazo da requisição atual, ou None se não houver prazo."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def bound(timeout: float) -> float:
+    """Limita `timeout` ao tempo restante; levanta DeadlineExceeded se o prazo já passou."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(timeout, left)
+
+
+def outgoing_headers() -> Dict[str, str]:
+    """Cabeçalhos que repassam o prazo restante a outro serviço."""
+    left = remaining()
+    if left is None:
+        return {}
+    return {TIMEOUT_HEADER: str(max(math.floor(left * 1000), 1))}
+
+
+@contextmanager
+def deadline_scope(timeout_seconds: float) -> Iterator[None]:
+    """
+    Define o prazo do bloco. As operações do MongoDB feitas dentro dele
+    recebem o tempo restante como maxTimeMS (pymongo.timeout).
+    """
+    token = _deadline.set(time.monotonic() + timeout_seconds)
+    try:
+        with pymongo.timeout(max(timeout_seconds, 0.001)):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """
+    Middleware ASGI que define o prazo de cada requisição HTTP.
+
+    O prazo vem do cabeçalho X-Request-Timeout-Ms (limitado a
+    `max_timeout_ms`) ou, sem ele, do padrão da rota. Ao fim do prazo o
+    processamento é cancelado e o cliente recebe 504; erros 5xx causados pelo
+    prazo esgotado (por exemplo, maxTimeMS no MongoDB) também viram 504.
+    """
+
+    def __init__(self, app, settings: Optional[DeadlineSettings] = None):
+        self.app = app
+        self.settings = settings or DeadlineSettings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self._timeout_seconds(scope)
+        response_started = False
+        replaced = False
+
+        async def send_with_deadline(message):
+            nonlocal response_started, replaced
+            if message["type"] == "http.response.start":
+                if message["status"] >= 500 and expired():
+                    replaced = True
+                    await _send_timeout(send)
+                    return
+                response_started = True
+            elif replaced:
+                return
+            await send(message)
+
+        async def call_app():
+            with deadline_scope(timeout):
+                await self.app(scope, receive, send_with_deadline)
+
+        deadline = time.monotonic() + timeout
+        try:
+            await asyncio.wait_for(call_app(), timeout)
+        except asyncio.TimeoutError:
+            # TimeoutError levantado pela própria rota antes do prazo não é nosso
+            if time.monotonic() < deadline:
+                raise
+            if not response_started and not replaced:
+                await _send_timeout(send)
+
+    def _timeout_seconds(self, scope) -> float:
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-timeout-ms":
+                try:
+                    timeout_ms = int(value)
+                except ValueError:
+                    break
+                if timeout_ms > 0:
+                    return min(timeout_ms, self.settings.max_timeout_ms) / 1000
+                break
+
+        path = scope.get("path", "")
+        timeout_ms, matched = self.settings.default_timeout_ms, ""
+        for prefix, route_timeout_ms in self.settings.route_timeouts_ms.items():
+            if path.startswith(prefix) and len(prefix) > len(matched):
+                timeout_ms, matched = route_timeout_ms, prefix
+        return timeout_ms / 1000
+
+
+async def _send_timeout(send) -> None:
+    DEADLINE_EXCEEDED.inc()
+    body = json.dumps({"detail": "Prazo da requisição esgotado"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 504,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
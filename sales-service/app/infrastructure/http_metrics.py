@@ -0,0 +1,82 @@
+import time
+from typing import Dict, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.infrastructure import metrics
+
+# Rótulo das requisições que não casaram com nenhuma rota, para que caminhos
+# arbitrários (404) não criem uma série cada
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = metrics.counter(
+    "sales_http_requests_total",
+    "Requisições HTTP atendidas, por método, rota e status",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "sales_http_request_duration_seconds",
+    "Latência das requisições HTTP, por método, rota e status",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = metrics.gauge(
+    "sales_http_requests_in_progress",
+    "Requisições HTTP em andamento"
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede contagem, latência e requisições em andamento.
+
+    As séries são identificadas pelo template da rota (`/sales/{sale_id}`),
+    não pelo caminho, e ficam em cache por (método, rota, status): depois da
+    primeira requisição de cada combinação, registrar uma requisição custa uma
+    busca em dicionário, um incremento e uma observação no histograma. As
+    requisições em andamento são contadas sem lock, no event loop, e o gauge
+    só lê o valor quando as métricas são expostas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.in_progress = 0
+        self._series: Dict[Tuple[str, str, int], Tuple[metrics.Counter, metrics.Histogram]] = {}
+        HTTP_REQUESTS_IN_PROGRESS.set_function(lambda: self.in_progress)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.record(scope, status, time.perf_counter() - started)
+            self.in_progress -= 1
+
+    def record(self, scope, status: int, duration: float) -> None:
+        route = scope.get("route")
+        key = (scope["method"], route.path if route is not None else UNMATCHED_ROUTE, status)
+        series = self._series.get(key)
+        if series is None:
+            labels = (key[0], key[1], str(status))
+            series = self._series[key] = (HTTP_REQUESTS.labels(*labels), HTTP_REQUEST_DURATION.labels(*labels))
+        requests, duration_histogram = series
+        requests.inc()
+        duration_histogram.observe(duration)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Expõe as métricas do processo no formato texto do Prometheus."""
+    return Response(metrics.render(), headers={"Content-Type": metrics.CONTENT_TYPE})
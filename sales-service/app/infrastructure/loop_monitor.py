@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from pydantic import BaseSettings, Field
+
+from app.infrastructure import metrics
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG = metrics.histogram(
+    "sales_event_loop_lag_seconds",
+    "Atraso entre o horário previsto e o real de execução de um callback no event loop",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+EVENT_LOOP_BLOCKED = metrics.counter(
+    "sales_event_loop_blocked_total",
+    "Vezes em que o event loop ficou bloqueado além do limite"
+)
+
+
+class LoopMonitorSettings(BaseSettings):
+    """Monitor de atraso e bloqueio do event loop."""
+    enabled: bool = True
+    # Intervalo entre as medições do atraso
+    interval_ms: float = Field(100.0, gt=0)
+    # Bloqueio a partir do qual a pilha do event loop é registrada em log
+    block_threshold_ms: float = Field(250.0, gt=0)
+
+    class Config:
+        env_prefix = "LOOP_MONITOR_"
+        env_file = ".env"
+
+
+class LoopMonitor:
+    """
+    Mede o atraso do event loop e detecta bloqueios.
+
+    Uma tarefa no loop dorme `interval_ms` e registra no histograma quanto
+    acordou depois do previsto; cada despertar é um batimento. Uma thread de
+    vigia confere os batimentos: se o último ficou mais de
+    `interval_ms + block_threshold_ms` para trás, o loop está preso em algum
+    callback síncrono, e a vigia registra em log a pilha da thread do loop
+    naquele momento (uma vez por bloqueio).
+    """
+
+    def __init__(self, settings: Optional[LoopMonitorSettings] = None):
+        self.settings = settings or LoopMonitorSettings()
+        self.interval = self.settings.interval_ms / 1000
+        self.threshold = self.settings.block_threshold_ms / 1000
+        self.blocks = 0
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            EVENT_LOOP_LAG.observe(max(now - expected, 0.0))
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(check_every):
+            self.check()
+
+    def check(self) -> bool:
+        """Confere o último batimento; registra o bloqueio e retorna True se o loop está preso."""
+        heartbeat = self._heartbeat
+        stalled = time.monotonic() - heartbeat - self.interval
+        if stalled < self.threshold or self._reported_heartbeat == heartbeat:
+            return False
+        self._reported_heartbeat = heartbeat
+        self.blocks += 1
+        EVENT_LOOP_BLOCKED.inc()
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "(pilha indisponível)\n"
+        logger.warning(
+            "Event loop bloqueado há %.0f ms; pilha da thread do loop:\n%s",
+            stalled * 1000, stack.rstrip("\n")
+        )
+        return True
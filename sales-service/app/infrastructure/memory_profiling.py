@@ -0,0 +1,210 @@
+import asyncio
+import gc
+import sys
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseSettings, Field
+
+# Agrupamentos aceitos pelo tracemalloc nas estatísticas
+GROUP_BY = ("lineno", "filename", "traceback")
+
+# Alocações do próprio tracemalloc e do carregamento de módulos não interessam.
+# São removidas das estatísticas já agrupadas: Snapshot.filter_traces percorre
+# cada trace em Python e leva segundos com cem mil alocações.
+_IGNORED_FILES = frozenset({
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+})
+
+# Objetos compartilhados pelo processo inteiro, fora do tamanho de um cache
+_SHARED_TYPES = (type, ModuleType, FunctionType)
+
+
+class MemoryProfilingSettings(BaseSettings):
+    """Snapshots do tracemalloc, ligados sob demanda pelas rotas de administração."""
+    # Quadros guardados por alocação; mais quadros custam mais memória e CPU
+    frames: int = Field(10, gt=0, le=100)
+    # Snapshots mantidos em memória; o mais antigo é descartado
+    max_snapshots: int = Field(5, gt=0)
+
+    class Config:
+        env_prefix = "MEMORY_PROFILING_"
+        env_file = ".env"
+
+
+@dataclass
+class SnapshotInfo:
+    name: str
+    created_at: str
+    frames: int
+    traced_bytes: int
+    blocks: int
+
+
+def approximate_size(obj: Any, max_objects: int = 1_000_000) -> int:
+    """
+    Soma do sys.getsizeof de `obj` e de tudo o que ele referencia, cada objeto
+    contado uma vez. Classes, módulos e funções ficam de fora. Para quando
+    percorre `max_objects` objetos, então o resultado é um mínimo.
+    """
+    seen = set()
+    pending = [obj]
+    total = 0
+    while pending and len(seen) < max_objects:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+    return total
+
+
+def container_report(items) -> dict:
+    """Relatório de tamanho de uma coleção: número de itens e tamanho aproximado."""
+    return {"entries": len(items), "approximate_bytes": approximate_size(items)}
+
+
+def rss_bytes() -> Optional[int]:
+    """Memória residente do processo (VmRSS); None fora do Linux."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _statistics(statistics, group_by: str, limit: int) -> List[dict]:
+    relevant = (statistic for statistic in statistics if statistic.traceback[0].filename not in _IGNORED_FILES)
+    return [_statistic(statistic, group_by) for statistic in islice(relevant, limit)]
+
+
+def _statistic(statistic, group_by: str) -> dict:
+    frame = statistic.traceback[0]
+    entry = {
+        "file": frame.filename,
+        "line": frame.lineno if group_by != "filename" else None,
+        "size_bytes": statistic.size,
+        "count": statistic.count,
+    }
+    if hasattr(statistic, "size_diff"):
+        entry["size_diff_bytes"] = statistic.size_diff
+        entry["count_diff"] = statistic.count_diff
+    if group_by == "traceback":
+        entry["traceback"] = [f"{frame.filename}:{frame.lineno}" for frame in reversed(statistic.traceback)]
+    return entry
+
+
+class MemoryProfiler:
+    """
+    Estado do profiling de memória: liga e desliga o tracemalloc, guarda os
+    últimos snapshots e compara dois deles agrupando por arquivo e linha.
+
+    Também reúne os relatórios de tamanho dos caches e pools do processo,
+    registrados na inicialização com `register`. Cada relatório é uma função
+    sem argumentos que devolve um dict.
+
+    O tracemalloc só mede as alocações feitas depois de ligado e deixa cada
+    alocação mais cara, então deve ficar ligado só durante a investigação.
+    """
+
+    def __init__(self, settings: Optional[MemoryProfilingSettings] = None):
+        self.settings = settings or MemoryProfilingSettings()
+        self.snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self.infos: Dict[str, SnapshotInfo] = {}
+        self.reports: Dict[str, Callable[[], dict]] = {}
+        self._sequence = 0
+
+    def register(self, name: str, report: Callable[[], dict]) -> None:
+        self.reports[name] = report
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: Optional[int] = None) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.settings.frames)
+
+    def stop(self) -> None:
+        """Desliga o tracemalloc; os snapshots já tirados continuam disponíveis."""
+        tracemalloc.stop()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit() if self.tracing else None,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "rss_bytes": rss_bytes(),
+            "snapshots": self.list_snapshots(),
+        }
+
+    async def take_snapshot(self) -> SnapshotInfo:
+        if not self.tracing:
+            raise RuntimeError("tracemalloc não está ativo")
+        snapshot = tracemalloc.take_snapshot()
+        self._sequence += 1
+        name = f"snapshot-{self._sequence}"
+        info = SnapshotInfo(
+            name=name,
+            created_at=datetime.now(timezone.utc).isoformat(),
+            frames=snapshot.traceback_limit,
+            traced_bytes=tracemalloc.get_traced_memory()[0],
+            blocks=len(snapshot.traces),
+        )
+        self.snapshots[name] = snapshot
+        self.infos[name] = info
+        while len(self.snapshots) > self.settings.max_snapshots:
+            old, _ = self.snapshots.popitem(last=False)
+            del self.infos[old]
+        return info
+
+    def find(self, name: str) -> Optional[SnapshotInfo]:
+        return self.infos.get(name)
+
+    def list_snapshots(self) -> List[dict]:
+        return [asdict(info) for info in reversed(list(self.infos.values()))]
+
+    def clear(self) -> None:
+        self.snapshots.clear()
+        self.infos.clear()
+
+    # Agrupar os traces é trabalho em Python proporcional ao número de
+    # alocações (cerca de um segundo para cem mil); roda fora do event loop
+
+    async def top(self, name: str, group_by: str = "lineno", limit: int = 25) -> List[dict]:
+        """Maiores grupos de alocações vivas no snapshot."""
+        snapshot = self.snapshots[name]
+        statistics = await asyncio.to_thread(snapshot.statistics, group_by)
+        return _statistics(statistics, group_by, limit)
+
+    async def compare(self, base: str, target: str, group_by: str = "lineno", limit: int = 25) -> List[dict]:
+        """Grupos que mais cresceram (ou diminuíram) de `base` para `target`."""
+        statistics = await asyncio.to_thread(
+            self.snapshots[target].compare_to, self.snapshots[base], group_by
+        )
+        return _statistics(statistics, group_by, limit)
+
+    def caches(self) -> Dict[str, dict]:
+        """Tamanho atual dos caches e pools registrados."""
+        sizes = {}
+        for name, report in self.reports.items():
+            try:
+                sizes[name] = report()
+            except Exception as e:
+                sizes[name] = {"error": str(e)}
+        return sizes
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseSettings, Field
+from pymongo import common, monitoring
+
+from app.infrastructure import metrics, request_cost
+
+logger = logging.getLogger(__name__)
+
+COMMAND_DURATION = metrics.histogram(
+    "sales_mongo_command_duration_seconds",
+    "Duração dos comandos enviados ao MongoDB, por coleção e comando",
+    ["collection", "command"]
+)
+COMMAND_FAILURES = metrics.counter(
+    "sales_mongo_command_failures_total",
+    "Comandos do MongoDB que falharam, por coleção e comando",
+    ["collection", "command"]
+)
+SLOW_COMMANDS = metrics.counter(
+    "sales_mongo_slow_commands_total",
+    "Comandos do MongoDB acima do limite de lentidão, por coleção e comando",
+    ["collection", "command"]
+)
+POOL_WAITERS = metrics.gauge(
+    "sales_mongo_pool_waiters",
+    "Operações aguardando uma conexão livre nos pools do MongoDB"
+)
+
+# Comandos de conexão, autenticação e sessão: não dizem nada sobre as consultas
+IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "saslStart", "saslContinue",
+    "authenticate", "getnonce", "endSessions", "killCursors", "explain",
+})
+# Comandos de leitura que podem ser analisados com explain
+EXPLAINABLE_COMMANDS = frozenset({"find", "aggregate", "count", "distinct", "findAndModify"})
+# Campos do comando que não fazem parte da consulta
+_SESSION_FIELDS = frozenset({"lsid", "txnNumber", "$clusterTime", "$db", "$readPreference", "autocommit", "startTransaction"})
+
+
+class MongoMonitoringSettings(BaseSettings):
+    """Monitoramento dos comandos enviados ao MongoDB."""
+    enabled: bool = True
+    slow_ms: float = Field(100.0, ge=0)
+    max_slow_shapes: int = Field(100, gt=0)
+    explain_enabled: bool = False
+    explain_top: int = Field(5, gt=0)
+    explain_interval_seconds: float = Field(60.0, gt=0)
+
+    class Config:
+        env_prefix = "MONGO_MONITOR_"
+        env_file = ".env"
+
+
+def redact(value: Any) -> Any:
+    """
+    Troca os valores de um filtro por "?", mantendo campos e operadores.
+    Listas viram um único elemento, para que `$in` com tamanhos diferentes
+    tenham o mesmo formato.
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(value[0])] if value else []
+    return "?"
+
+
+def command_shape(command_name: str, command: dict) -> Optional[dict]:
+    """Extrai do comando o filtro (ou pipeline) com os valores ocultos."""
+    if command_name in ("find", "count", "distinct"):
+        query = command.get("filter", command.get("query"))
+    elif command_name == "findAndModify":
+        query = command.get("query")
+    elif command_name == "aggregate":
+        query = {"pipeline": [
+            {stage: redact(spec) if stage == "$match" else "..." for stage, spec in step.items()}
+            for step in command.get("pipeline", [])
+        ]}
+        return query
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or []
+        query = statements[0].get("q") if statements else None
+    else:
+        return None
+    return redact(query) if query is not None else None
+
+
+def _documents(reply: dict) -> int:
+    """Documentos devolvidos pelo comando (lote do cursor ou findAndModify)."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    return 1 if reply.get("value") is not None else 0
+
+
+def _collection(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+
+@dataclass
+class SlowShape:
+    """Estatísticas de um formato de consulta lento."""
+    database: str
+    collection: str
+    command_name: str
+    shape: Optional[dict]
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    # Último comando lento completo, usado apenas para o explain
+    sample: Optional[dict] = field(default=None, repr=False)
+    explain: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "collection": self.collection,
+            "command": self.command_name,
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "explain": self.explain,
+        }
+
+
+class MongoCommandMonitor(monitoring.CommandListener):
+    """
+    Listener de comandos registrado no cliente compartilhado do Motor.
+
+    Mede a duração de cada comando por coleção e comando e registra em log os
+    que passam de `slow_ms`, com o filtro sem os valores. Os formatos lentos
+    ficam agregados em memória; com `explain_enabled`, uma tarefa periódica
+    roda explain para os `explain_top` mais lentos.
+
+    Os callbacks são chamados pelas threads do Motor, com uma cópia do
+    contexto de quem fez a chamada, e devem ser baratos. É por eles que cada
+    comando entra no custo da requisição (request_cost).
+    """
+
+    def __init__(self, settings: Optional[MongoMonitoringSettings] = None):
+        self.settings = settings or MongoMonitoringSettings()
+        self._pending: Dict[Tuple[Any, int], Tuple[str, str, str, dict]] = {}
+        self._slow: Dict[str, SlowShape] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.database_name, _collection(event.command_name, event.command), event.command_name, event.command
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False, documents=_documents(event.reply))
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool, documents: int = 0) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        database, collection, command_name, command = pending
+        seconds = event.duration_micros / 1_000_000
+        COMMAND_DURATION.labels(collection, command_name).observe(seconds)
+        request_cost.record_mongo(seconds, documents)
+        if failed:
+            COMMAND_FAILURES.labels(collection, command_name).inc()
+        if seconds * 1000 >= self.settings.slow_ms:
+            self._record_slow(database, collection, command_name, command, seconds)
+
+    def _record_slow(self, database: str, collection: str, command_name: str, command: dict, seconds: float) -> None:
+        SLOW_COMMANDS.labels(collection, command_name).inc()
+        shape = command_shape(command_name, command)
+        shape_json = json.dumps(shape, sort_keys=True, default=str)
+        logger.warning(
+            "Comando lento no MongoDB: %s.%s %s em %.1f ms; filtro: %s",
+            database, collection, command_name, seconds * 1000, shape_json
+        )
+        key = f"{database}.{collection}.{command_name}:{shape_json}"
+        with self._lock:
+            slow = self._slow.get(key)
+            if slow is None:
+                if len(self._slow) >= self.settings.max_slow_shapes:
+                    fastest = min(self._slow, key=lambda k: self._slow[k].max_seconds)
+                    if self._slow[fastest].max_seconds >= seconds:
+                        return
+                    del self._slow[fastest]
+                slow = self._slow[key] = SlowShape(database, collection, command_name, shape)
+            slow.count += 1
+            slow.total_seconds += seconds
+            if seconds >= slow.max_seconds:
+                slow.max_seconds = seconds
+                if self.settings.explain_enabled and command_name in EXPLAINABLE_COMMANDS:
+                    slow.sample = {k: v for k, v in command.items() if k not in _SESSION_FIELDS}
+
+    def slow_shapes(self) -> List[SlowShape]:
+        """Formatos lentos observados, do mais lento para o mais rápido."""
+        with self._lock:
+            return sorted(self._slow.values(), key=lambda slow: slow.max_seconds, reverse=True)
+
+    async def explain_slowest(self, client) -> int:
+        """Roda explain para os formatos mais lentos que ainda não têm um; retorna quantos."""
+        explained = 0
+        for slow in self.slow_shapes()[:self.settings.explain_top]:
+            if slow.explain is not None or slow.sample is None:
+                continue
+            try:
+                result = await client[slow.database].command({"explain": slow.sample, "verbosity": "queryPlanner"})
+            except Exception as e:
+                logger.warning(f"Erro ao executar explain em {slow.collection}.{slow.command_name}: {str(e)}")
+                continue
+            slow.explain = result.get("queryPlanner", result)
+            slow.sample = None
+            explained += 1
+            logger.warning(
+                "Plano da consulta lenta %s.%s %s: %s",
+                slow.collection, slow.command_name,
+                json.dumps(slow.shape, sort_keys=True, default=str),
+                json.dumps(slow.explain.get("winningPlan", slow.explain), default=str)
+            )
+        return explained
+
+    async def run_explainer(self, client) -> None:
+        while True:
+            await asyncio.sleep(self.settings.explain_interval_seconds)
+            try:
+                await self.explain_slowest(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao analisar consultas lentas: {str(e)}")
+
+    def start_explainer(self, client) -> Optional[asyncio.Task]:
+        if not self.settings.explain_enabled:
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_explainer(client))
+        return self._task
+
+    async def stop_explainer(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class ConnectionPoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Listener de pool de conexões: conta, por servidor, as conexões abertas,
+    as que estão em uso e as operações aguardando uma conexão livre (a fila
+    de espera do pool, usada pelo controle de admissão). Como os callbacks de
+    comandos, roda nas threads do Motor.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Any, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, address, field_name: str, amount: int) -> None:
+        with self._lock:
+            pool = self._pools.get(address)
+            if pool is not None:
+                pool[field_name] += amount
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        with self._lock:
+            self._pools[event.address] = {
+                "max_pool_size": event.options.get("maxPoolSize", common.MAX_POOL_SIZE),
+                "open": 0,
+                "checked_out": 0,
+                "waiting": 0,
+            }
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        with self._lock:
+            self._pools.pop(event.address, None)
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self._add(event.address, "open", 1)
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self._add(event.address, "open", -1)
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        self._add(event.address, "waiting", 1)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        self._add(event.address, "waiting", -1)
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            pool = self._pools.get(event.address)
+            if pool is not None:
+                pool["waiting"] -= 1
+                pool["checked_out"] += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self._add(event.address, "checked_out", -1)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Conexões de cada pool, por "host:porta"."""
+        with self._lock:
+            return {f"{host}:{port}": dict(pool) for (host, port), pool in self._pools.items()}
+
+    def waiters(self) -> int:
+        """Operações aguardando conexão, somando todos os pools."""
+        with self._lock:
+            return sum(pool["waiting"] for pool in self._pools.values())
+
+
+_settings = MongoMonitoringSettings()
+# Listener compartilhado pelos clientes do processo; None se desativado
+COMMAND_MONITOR: Optional[MongoCommandMonitor] = MongoCommandMonitor(_settings) if _settings.enabled else None
+# Listener de pool compartilhado; só contadores, então fica sempre ligado
+POOL_MONITOR = ConnectionPoolMonitor()
+POOL_WAITERS.set_function(POOL_MONITOR.waiters)
+
+
+def event_listeners() -> List[Any]:
+    """Listeners a registrar no cliente do Motor."""
+    listeners: List[Any] = [POOL_MONITOR]
+    if COMMAND_MONITOR is not None:
+        listeners.append(COMMAND_MONITOR)
+    return listeners
@@ -1,11 +1,18 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseSettings
 from dotenv import load_dotenv
+from typing import Optional
+import asyncio
+import logging
 import os
 
+from app.infrastructure.mongo_monitoring import event_listeners
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class MongoDBSettings(BaseSettings):
     """Configurações do MongoDB."""
     url: str = os.getenv("MONGODB_URL", "mongodb://sales-mongodb:27017")
@@ -25,16 +32,47 @@ class MongoDB:
     async def connect(self):
         """Estabelece conexão com o MongoDB."""
         try:
-            print(f"Conectando ao MongoDB em: {self.settings.url}")
-            self.client = AsyncIOMotorClient(self.settings.url)
+            logger.info(f"Conectando ao MongoDB em: {self.settings.url}")
+            self.client = AsyncIOMotorClient(self.settings.url, event_listeners=event_listeners())
             # Testa a conexão
             await self.client.admin.command('ping')
-            print("Conexão com MongoDB estabelecida com sucesso!")
+            logger.info("Conexão com MongoDB estabelecida com sucesso!")
         except Exception as e:
-            print(f"Erro ao conectar ao MongoDB: {str(e)}")
+            logger.error(f"Erro ao conectar ao MongoDB: {str(e)}")
             raise Exception(f"Erro ao conectar ao MongoDB: {str(e)}")
 
     async def disconnect(self):
         """Fecha a conexão com o MongoDB."""
         if self.client:
-            self.client.close() 
\ No newline at end of file
+            self.client.close()
+
+# Conexão compartilhada pelo processo: o cliente do Motor mantém seu próprio
+# pool e deve ser criado uma única vez, não a cada requisição.
+_shared: Optional[MongoDB] = None
+_shared_lock: Optional[asyncio.Lock] = None
+
+def set_mongodb(mongodb: MongoDB) -> None:
+    """Registra uma conexão já aberta como a conexão compartilhada."""
+    global _shared
+    _shared = mongodb
+
+async def get_mongodb() -> MongoDB:
+    """Retorna a conexão compartilhada, abrindo-a na primeira chamada."""
+    global _shared, _shared_lock
+    if _shared is not None and _shared.client is not None:
+        return _shared
+    if _shared_lock is None:
+        _shared_lock = asyncio.Lock()
+    async with _shared_lock:
+        if _shared is None or _shared.client is None:
+            mongodb = MongoDB()
+            await mongodb.connect()
+            _shared = mongodb
+    return _shared
+
+async def close_mongodb() -> None:
+    """Fecha a conexão compartilhada."""
+    global _shared
+    if _shared is not None:
+        await _shared.disconnect()
+        _shared = None
@@ -0,0 +1,199 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, TypeVar
+
+from app.infrastructure import metrics
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Valor do gauge de estado para cada estado do disjuntor
+_STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+BREAKER_STATE = metrics.gauge(
+    "sales_circuit_breaker_state",
+    "Estado atual dos disjuntores (0 = fechado, 1 = meio aberto, 2 = aberto)",
+    ["breaker"]
+)
+BREAKER_TRANSITIONS = metrics.counter(
+    "sales_circuit_breaker_transitions_total",
+    "Mudanças de estado dos disjuntores, pelo estado de destino",
+    ["breaker", "state"]
+)
+BREAKER_REJECTIONS = metrics.counter(
+    "sales_circuit_breaker_rejections_total",
+    "Chamadas recusadas sem acesso à rede porque o disjuntor estava aberto",
+    ["breaker"]
+)
+HEDGED_REQUESTS = metrics.counter(
+    "sales_hedged_requests_total",
+    "Requisições de reserva (hedge) disparadas e quantas responderam antes da original",
+    ["endpoint", "result"]
+)
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada porque o disjuntor do destino está aberto."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Disjuntor {name} aberto; nova tentativa em {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Disjuntor de três estados.
+
+    Após `failure_threshold` falhas seguidas o disjuntor abre e recusa as
+    chamadas com CircuitOpenError por `reset_timeout_seconds`. Depois disso
+    fica meio aberto e deixa passar `half_open_max_calls` chamadas de teste:
+    um sucesso fecha o disjuntor, uma falha o abre de novo.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold deve ser maior que zero")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._state_gauge = BREAKER_STATE.labels(name)
+        self._rejections = BREAKER_REJECTIONS.labels(name)
+        self._state_gauge.set(_STATE_VALUES[STATE_CLOSED])
+
+    @property
+    def state(self) -> str:
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+            self._transition(STATE_HALF_OPEN)
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserva uma chamada ou levanta CircuitOpenError."""
+        state = self.state
+        if state == STATE_OPEN:
+            self._rejections.inc()
+            retry_after = self.reset_timeout_seconds - (self._clock() - self._opened_at)
+            raise CircuitOpenError(self.name, max(retry_after, 0.0))
+        if state == STATE_HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                self._rejections.inc()
+                raise CircuitOpenError(self.name, 0.0)
+            self._probes += 1
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state == STATE_HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+            self._transition(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        if self._state == STATE_HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+            self._open()
+            return
+        self._failures += 1
+        if self._state == STATE_CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Libera uma chamada reservada que terminou sem resultado (cancelada)."""
+        if self._state == STATE_HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._transition(STATE_OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        self._probes = 0
+        if state == STATE_CLOSED:
+            self._failures = 0
+        self._state_gauge.set(_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(self.name, state).inc()
+
+
+class LatencyTracker:
+    """Percentis das últimas `window` latências observadas."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Retorna o percentil pedido ou None se ainda não houver amostras suficientes."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)
+        return ordered[index]
+
+
+async def hedged(
+    endpoint: str,
+    call: Callable[[], Awaitable[T]],
+    delay: float,
+    is_failure: Optional[Callable[[T], bool]] = None,
+) -> T:
+    """
+    Executa `call` e, se não houver resposta em `delay` segundos, dispara uma
+    segunda tentativa. Retorna o primeiro resultado bem-sucedido e cancela a
+    outra tentativa. Uma tentativa que levanta erro, ou cujo resultado
+    `is_failure` rejeita (como uma resposta 5xx), perde para a outra, que
+    continua sendo aguardada. Se as duas perderem, retorna o último resultado
+    rejeitado ou, sem nenhum, levanta o último erro. Use apenas com operações
+    idempotentes.
+    """
+    primary = asyncio.ensure_future(call())
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge = asyncio.ensure_future(call())
+        tasks.add(hedge)
+        HEDGED_REQUESTS.labels(endpoint, "sent").inc()
+        error: Optional[BaseException] = None
+        rejected: List[T] = []
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                if is_failure is not None and is_failure(task.result()):
+                    rejected.append(task.result())
+                    continue
+                if task is hedge:
+                    HEDGED_REQUESTS.labels(endpoint, "won").inc()
+                return task.result()
+        if rejected:
+            return rejected[-1]
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+STATE_IN_PROGRESS = "in_progress"
+STATE_COMPLETED = "completed"
+
+
+class IdempotencyRepository(ABC):
+    """Interface para o armazenamento de chaves de idempotência."""
+
+    @abstractmethod
+    async def reserve(self, key: str, fingerprint: str) -> Optional[dict]:
+        """
+        Reserva a chave para a requisição atual.
+
+        Retorna None quando a chave era nova, ou o registro já existente.
+        """
+        pass
+
+    @abstractmethod
+    async def complete(self, key: str, status_code: int, body: Any) -> None:
+        """Grava a resposta da requisição que reservou a chave."""
+        pass
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Libera uma chave reservada cuja requisição falhou."""
+        pass
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class PaymentEventQueue(ABC):
+    """Interface para a fila persistente de eventos de pagamento."""
+
+    @abstractmethod
+    async def enqueue(self, event: dict) -> str:
+        """Grava o evento na fila e retorna seu identificador."""
+        pass
+
+    @abstractmethod
+    async def claim(self, limit: int) -> List[dict]:
+        """
+        Reserva até `limit` eventos, dos mais antigos para os mais novos.
+        Eventos de um código de pagamento com evento reservado por outro
+        worker não são entregues.
+        """
+        pass
+
+    @abstractmethod
+    async def ack(self, entries: List[dict]) -> None:
+        """Remove da fila os eventos processados, se ainda estiverem reservados por quem os processou."""
+        pass
+
+    @abstractmethod
+    async def retry(self, entries: List[dict], max_attempts: int) -> int:
+        """Devolve os eventos à fila; os que esgotaram as tentativas são descartados. Retorna quantos foram descartados."""
+        pass
+
+    @abstractmethod
+    async def depth(self) -> int:
+        """Quantidade de eventos aguardando ou em processamento."""
+        pass
+
+    @abstractmethod
+    async def oldest_enqueued_at(self):
+        """Data de entrada do evento mais antigo ainda na fila."""
+        pass
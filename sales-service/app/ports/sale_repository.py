@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from ..domain.sale import Sale
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from ..domain.sale import Sale, PaymentStatus, PaymentUpdateOutcome
 from ..schemas.sale_schema import SaleCreate, SaleUpdate, SaleResponse
 
 class SaleRepository(ABC):
@@ -31,6 +32,18 @@ class SaleRepository(ABC):
         """Lista todas as vendas."""
         pass
 
+    @abstractmethod
+    async def find_by_vehicle(
+        self, brand: Optional[str] = None, model: Optional[str] = None, year: Optional[int] = None
+    ) -> List[Sale]:
+        """Lista vendas pela marca, modelo e ano do veículo."""
+        pass
+
+    @abstractmethod
+    async def refresh_vehicle_statuses(self, statuses: Dict[str, str]) -> int:
+        """Atualiza o status do veículo guardado nas vendas."""
+        pass
+
     @abstractmethod
     async def find_by_status(self, status: str) -> List[SaleResponse]:
         """Lista vendas por status."""
@@ -41,6 +54,38 @@ class SaleRepository(ABC):
         """Atualiza uma venda existente."""
         pass
 
+    @abstractmethod
+    async def update_fields(self, sale_id: str, fields: dict) -> Optional[Sale]:
+        """Atualiza apenas os campos informados de uma venda."""
+        pass
+
+    @abstractmethod
+    async def apply_payment_statuses(
+        self, statuses: Dict[str, PaymentStatus]
+    ) -> Dict[str, Tuple[PaymentUpdateOutcome, Optional[Sale]]]:
+        """Atualiza o status de pagamento de várias vendas pelo código de pagamento."""
+        pass
+
+    @abstractmethod
+    async def find_expired_pending(self, cutoff: datetime, limit: int) -> List[Tuple[str, str]]:
+        """Busca vendas pendentes criadas antes de `cutoff`."""
+        pass
+
+    @abstractmethod
+    async def cancel_pending(self, sales: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Cancela as vendas que ainda estiverem pendentes e as marca para liberar o veículo."""
+        pass
+
+    @abstractmethod
+    async def find_release_pending(self, limit: int) -> List[Tuple[str, str]]:
+        """Busca vendas canceladas cujo veículo ainda não foi liberado."""
+        pass
+
+    @abstractmethod
+    async def clear_release_pending(self, vehicle_ids: List[str]) -> int:
+        """Remove a marca de liberação pendente das vendas dos veículos informados."""
+        pass
+
     @abstractmethod
     async def delete(self, sale_id: str) -> None:
         """Remove uma venda."""
@@ -1,7 +1,7 @@
 from enum import Enum
 from datetime import datetime
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 
 class PaymentStatus(str, Enum):
     PENDING = "PENDENTE"
@@ -39,8 +39,20 @@ class SaleCreate(SaleBase):
 class SaleUpdate(SaleBase):
     pass
 
+class VehicleSnapshotResponse(BaseModel):
+    brand: str = Field(..., description="Marca do veículo")
+    model: str = Field(..., description="Modelo do veículo")
+    year: int = Field(..., description="Ano do veículo")
+    color: Optional[str] = Field(None, description="Cor do veículo")
+    list_price: Optional[float] = Field(None, description="Preço de tabela na criação da venda")
+    status: Optional[str] = Field(None, description="Último status do veículo conhecido pelo serviço de vendas")
+
+    class Config:
+        orm_mode = True
+
 class SaleResponse(SaleBase):
     id: str
+    vehicle: Optional[VehicleSnapshotResponse] = Field(None, description="Dados do veículo guardados com a venda")
     created_at: datetime
     updated_at: datetime
 
@@ -56,6 +68,47 @@ class SaleResponse(SaleBase):
             sale_price=sale.sale_price,
             payment_status=sale.payment_status,
             payment_code=sale.payment_code,
+            vehicle=VehicleSnapshotResponse.from_orm(sale.vehicle) if getattr(sale, "vehicle", None) else None,
             created_at=sale.created_at,
             updated_at=sale.updated_at
-        ) 
\ No newline at end of file
+        )
+
+class PaymentEvent(BaseModel):
+    """Evento de status de pagamento recebido do provedor."""
+    payment_code: str = Field(..., min_length=1, description="Código do pagamento")
+    status: PaymentStatus = Field(..., description="Novo status do pagamento")
+    vehicle_id: Optional[str] = Field(None, description="ID do veículo informado pelo provedor")
+    event_id: Optional[str] = Field(None, description="Identificador do evento no provedor")
+
+    @validator('status', pre=True)
+    def validate_status(cls, v):
+        if isinstance(v, str):
+            try:
+                return PaymentStatus(v.upper())
+            except ValueError:
+                raise ValueError(f"Status de pagamento inválido: {v}")
+        return v
+
+class PaymentEventBatch(BaseModel):
+    """Lote de eventos de pagamento. Cada evento é validado individualmente."""
+    events: List[dict] = Field(..., min_items=1, max_items=1000, description="Eventos de pagamento")
+
+class PaymentEventOutcome(BaseModel):
+    index: int = Field(..., description="Posição do evento no lote")
+    payment_code: Optional[str] = Field(None, description="Código do pagamento")
+    outcome: str = Field(..., description="updated, unchanged, not_found, conflict, invalid ou superseded")
+    sale_id: Optional[str] = Field(None, description="ID da venda afetada")
+    payment_status: Optional[PaymentStatus] = Field(None, description="Status da venda após o processamento")
+    detail: Optional[str] = Field(None, description="Motivo, para eventos não aplicados")
+
+class PaymentEventBatchResult(BaseModel):
+    outcomes: List[PaymentEventOutcome] = Field(default_factory=list)
+    updated: int = 0
+    unchanged: int = 0
+    not_found: int = 0
+    conflict: int = 0
+    invalid: int = 0
+    superseded: int = 0
+    vehicles_notified: int = Field(0, description="Veículos atualizados no core-service")
+    notification_error: Optional[str] = Field(None, description="Erro ao notificar o core-service, se houver")
+
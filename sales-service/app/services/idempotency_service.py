@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Tuple
+
+from dotenv import load_dotenv
+from pydantic import BaseSettings
+
+from app.exceptions import IdempotencyKeyInProgressError, IdempotencyKeyMismatchError
+from app.ports.idempotency_repository import IdempotencyRepository, STATE_COMPLETED
+
+# Carrega variáveis de ambiente
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencySettings(BaseSettings):
+    """Configurações das chaves de idempotência."""
+    collection: str = os.getenv("IDEMPOTENCY_COLLECTION", "idempotency_keys")
+    ttl_seconds: int = 24 * 60 * 60
+    lock_seconds: int = 60
+
+    class Config:
+        env_prefix = "IDEMPOTENCY_"
+        env_file = ".env"
+
+
+def fingerprint(payload: Any) -> str:
+    """Resumo do conteúdo da requisição, usado para detectar chaves reutilizadas."""
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Executa uma operação no máximo uma vez por chave.
+
+    A primeira requisição reserva a chave, executa a operação e grava a resposta;
+    repetições com o mesmo conteúdo recebem a resposta gravada sem executar a
+    operação de novo. Se a operação falhar a chave é liberada para que o cliente
+    possa tentar outra vez.
+    """
+
+    def __init__(self, repository: IdempotencyRepository):
+        self.repository = repository
+
+    async def execute(
+        self,
+        scope: str,
+        key: str,
+        payload: Any,
+        operation: Callable[[], Awaitable[Any]],
+        status_code: int = 200,
+    ) -> Tuple[int, Any, bool]:
+        """Retorna (status, corpo da resposta, se a resposta foi reaproveitada)."""
+        record_key = f"{scope}:{key}"
+        digest = fingerprint(payload)
+
+        existing = await self.repository.reserve(record_key, digest)
+        if existing is not None:
+            if existing.get("fingerprint") != digest:
+                raise IdempotencyKeyMismatchError(key)
+            if existing.get("state") != STATE_COMPLETED:
+                raise IdempotencyKeyInProgressError(key)
+            logger.info("Reaproveitando resposta da chave de idempotência %s", record_key)
+            return existing["status_code"], existing["body"], True
+
+        try:
+            body = await operation()
+        except BaseException:
+            await self._release(record_key)
+            raise
+
+        try:
+            await self.repository.complete(record_key, status_code, body)
+        except Exception as e:
+            # A operação já foi feita; falhar aqui faria o cliente repeti-la.
+            logger.error(f"Erro ao gravar resposta da chave {record_key}: {str(e)}")
+        return status_code, body, False
+
+    async def _release(self, record_key: str) -> None:
+        try:
+            await self.repository.release(record_key)
+        except Exception as e:
+            logger.error(f"Erro ao liberar chave de idempotência {record_key}: {str(e)}")
@@ -0,0 +1,142 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+
+from app.domain.sale import PaymentUpdateOutcome
+from app.infrastructure.core_service_client import CoreServiceClient, VEHICLE_STATUS_BY_PAYMENT_STATUS
+from app.ports.sale_repository import SaleRepository
+from app.schemas.sale_schema import PaymentEvent, PaymentEventBatchResult, PaymentEventOutcome
+from app.services.vehicle_lookup import VehicleLookup
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentEventProcessor:
+    """
+    Aplica lotes de eventos de pagamento.
+
+    Os eventos são validados um a um; para o mesmo código de pagamento vale o
+    último evento do lote e os anteriores são marcados como SUPERSEDED. As
+    vendas são atualizadas com uma única escrita em lote no repositório e os
+    veículos afetados são notificados ao core-service em uma única chamada,
+    e removidos do cache de veículos.
+    """
+
+    def __init__(
+        self,
+        repository: SaleRepository,
+        core_client: Optional[CoreServiceClient] = None,
+        vehicle_lookup: Optional[VehicleLookup] = None,
+    ):
+        self.repository = repository
+        self.core_client = core_client
+        self.vehicle_lookup = vehicle_lookup
+
+    async def process(self, raw_events: List[dict]) -> PaymentEventBatchResult:
+        outcomes: List[Optional[PaymentEventOutcome]] = [None] * len(raw_events)
+        latest: Dict[str, int] = {}
+        events: Dict[int, PaymentEvent] = {}
+
+        for index, raw in enumerate(raw_events):
+            try:
+                event = PaymentEvent.parse_obj(raw)
+            except ValidationError as e:
+                outcomes[index] = PaymentEventOutcome(
+                    index=index,
+                    payment_code=raw.get("payment_code") if isinstance(raw, dict) else None,
+                    outcome=PaymentUpdateOutcome.INVALID,
+                    detail=_format_validation_error(e)
+                )
+                continue
+            previous = latest.get(event.payment_code)
+            if previous is not None:
+                outcomes[previous] = PaymentEventOutcome(
+                    index=previous,
+                    payment_code=event.payment_code,
+                    outcome=PaymentUpdateOutcome.SUPERSEDED,
+                    detail=f"Substituído pelo evento {index} do lote"
+                )
+                del events[previous]
+            latest[event.payment_code] = index
+            events[index] = event
+
+        applied = await self.repository.apply_payment_statuses(
+            {event.payment_code: event.status for event in events.values()}
+        )
+
+        transitions: Dict[str, str] = {}
+        for index, event in events.items():
+            outcome, sale = applied[event.payment_code]
+            outcomes[index] = PaymentEventOutcome(
+                index=index,
+                payment_code=event.payment_code,
+                outcome=outcome,
+                sale_id=sale.id if sale else None,
+                payment_status=sale.payment_status if sale else None,
+                detail=_OUTCOME_DETAILS.get(outcome)
+            )
+            if outcome == PaymentUpdateOutcome.UPDATED:
+                transitions[sale.vehicle_id] = VEHICLE_STATUS_BY_PAYMENT_STATUS[sale.payment_status.value]
+
+        result = PaymentEventBatchResult(outcomes=outcomes)
+        for outcome in outcomes:
+            setattr(result, outcome.outcome, getattr(result, outcome.outcome) + 1)
+
+        if transitions:
+            await self._notify_core_service(transitions, result)
+        return result
+
+    async def _notify_core_service(self, transitions: Dict[str, str], result: PaymentEventBatchResult) -> None:
+        if self.core_client is None:
+            result.notification_error = "core-service não configurado"
+            return
+        try:
+            response = await self.core_client.update_vehicle_statuses(transitions)
+        except Exception as e:
+            logger.error(f"Erro ao notificar o core-service sobre {len(transitions)} veículos: {str(e)}")
+            result.notification_error = str(e)
+            return
+        finally:
+            invalidate_vehicles(self.vehicle_lookup, transitions)
+        transitioned = response.get("transitioned", [])
+        result.vehicles_notified = len(transitioned)
+        await refresh_vehicle_statuses(
+            self.repository, {vehicle_id: transitions[vehicle_id] for vehicle_id in transitioned}
+        )
+        rejected = response.get("rejected", [])
+        if rejected:
+            logger.warning(
+                "core-service recusou %d alterações de status: %s",
+                len(rejected), "; ".join(f"{r.get('vehicle_id')}: {r.get('reason')}" for r in rejected)
+            )
+
+
+def invalidate_vehicles(vehicle_lookup: Optional[VehicleLookup], vehicle_ids: Iterable[str]) -> None:
+    """Remove do cache de veículos os que tiveram o status alterado no core-service."""
+    if vehicle_lookup is None:
+        return
+    for vehicle_id in vehicle_ids:
+        vehicle_lookup.invalidate(vehicle_id)
+
+
+async def refresh_vehicle_statuses(repository: SaleRepository, statuses: Dict[str, str]) -> None:
+    """Grava nas vendas o novo status dos veículos alterados no core-service."""
+    if not statuses:
+        return
+    try:
+        await repository.refresh_vehicle_statuses(statuses)
+    except Exception as e:
+        logger.warning(f"Erro ao atualizar o status de {len(statuses)} veículos nas vendas: {str(e)}")
+
+
+_OUTCOME_DETAILS = {
+    PaymentUpdateOutcome.NOT_FOUND: "Venda não encontrada para o código de pagamento fornecido",
+    PaymentUpdateOutcome.CONFLICT: "Venda alterada por outra operação durante o processamento",
+}
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseSettings, Field
+
+from app.domain.sale import PaymentUpdateOutcome
+from app.infrastructure import metrics
+from app.ports.payment_event_queue import PaymentEventQueue
+from app.services.payment_event_processor import PaymentEventProcessor
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = metrics.gauge(
+    "sales_payment_event_queue_depth",
+    "Eventos de pagamento aguardando ou em processamento"
+)
+QUEUE_OLDEST_AGE = metrics.gauge(
+    "sales_payment_event_queue_oldest_age_seconds",
+    "Idade do evento de pagamento mais antigo na fila"
+)
+EVENTS_PROCESSED = metrics.counter(
+    "sales_payment_events_processed_total",
+    "Eventos de pagamento processados pelos workers, por resultado",
+    ["outcome"]
+)
+EVENTS_DISCARDED = metrics.counter(
+    "sales_payment_events_discarded_total",
+    "Eventos de pagamento descartados após esgotar as tentativas"
+)
+BATCH_SIZE = metrics.histogram(
+    "sales_payment_event_batch_size",
+    "Eventos agrupados em cada escrita em lote",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+BATCH_DURATION = metrics.histogram(
+    "sales_payment_event_batch_duration_seconds",
+    "Duração do processamento de cada lote de eventos"
+)
+
+
+class PaymentQueueSettings(BaseSettings):
+    """Configurações da fila assíncrona de eventos de pagamento."""
+    enabled: bool = True
+    collection: str = "payment_event_queue"
+    workers: int = Field(4, gt=0)
+    batch_size: int = Field(500, gt=0, le=1000)
+    coalesce_window_ms: int = Field(50, ge=0)
+    poll_interval_seconds: float = Field(1.0, gt=0)
+    lease_seconds: int = Field(60, gt=0)
+    max_attempts: int = Field(5, gt=0)
+    stats_interval_seconds: float = Field(5.0, gt=0)
+
+    class Config:
+        env_prefix = "PAYMENT_QUEUE_"
+        env_file = ".env"
+
+
+class PaymentEventWorkerPool:
+    """
+    Workers que esvaziam a fila de eventos de pagamento.
+
+    Ao encontrar eventos, o worker espera `coalesce_window_ms` para juntar os
+    que chegarem logo em seguida e processa tudo como um único lote: o
+    processador reduz os eventos ao último por código de pagamento, grava com
+    um bulk_write e notifica o core-service uma vez por lote. Eventos cuja
+    venda foi alterada por outra operação (CONFLICT) voltam à fila.
+    """
+
+    def __init__(
+        self,
+        queue: PaymentEventQueue,
+        processor: PaymentEventProcessor,
+        settings: Optional[PaymentQueueSettings] = None,
+    ):
+        self.queue = queue
+        self.processor = processor
+        self.settings = settings or PaymentQueueSettings()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """Acorda os workers ociosos quando um evento é enfileirado neste processo."""
+        self._wakeup.set()
+
+    async def process_available(self) -> int:
+        """Reserva e processa um lote; retorna quantos eventos foram tratados."""
+        entries = await self.queue.claim(self.settings.batch_size)
+        if not entries:
+            return 0
+        if len(entries) < self.settings.batch_size and self.settings.coalesce_window_ms:
+            await asyncio.sleep(self.settings.coalesce_window_ms / 1000)
+            entries += await self.queue.claim(self.settings.batch_size - len(entries))
+
+        started = time.perf_counter()
+        try:
+            result = await self.processor.process([entry["event"] for entry in entries])
+        except Exception as e:
+            logger.error("Erro ao processar lote de %d eventos de pagamento: %s", len(entries), e)
+            await self._retry(entries)
+            return len(entries)
+
+        # Vendas alteradas por outra operação durante o lote voltam à fila
+        # para serem reaplicadas sobre o estado atual
+        conflicts = {
+            outcome.index for outcome in result.outcomes if outcome.outcome == PaymentUpdateOutcome.CONFLICT
+        }
+        await self.queue.ack([entry for index, entry in enumerate(entries) if index not in conflicts])
+        if conflicts:
+            await self._retry([entries[index] for index in sorted(conflicts)])
+        BATCH_SIZE.observe(len(entries))
+        BATCH_DURATION.observe(time.perf_counter() - started)
+        for outcome in result.outcomes:
+            EVENTS_PROCESSED.labels(outcome.outcome).inc()
+        return len(entries)
+
+    async def _retry(self, entries: List[dict]) -> None:
+        discarded = await self.queue.retry(entries, self.settings.max_attempts)
+        if discarded:
+            EVENTS_DISCARDED.inc(discarded)
+            logger.error(
+                "%d eventos de pagamento descartados após %d tentativas", discarded, self.settings.max_attempts
+            )
+
+    async def refresh_stats(self) -> dict:
+        depth = await self.queue.depth()
+        oldest = await self.queue.oldest_enqueued_at()
+        age = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        QUEUE_DEPTH.set(depth)
+        QUEUE_OLDEST_AGE.set(max(age, 0.0))
+        return {
+            "depth": depth,
+            "oldest_age_seconds": max(age, 0.0),
+            "workers": self.settings.workers if self._tasks else 0,
+            "processed": {labels[0]: child.value for labels, child in EVENTS_PROCESSED.series()},
+            "discarded": EVENTS_DISCARDED.value,
+        }
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            try:
+                if await self.process_available():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no worker {number} da fila de pagamentos: {str(e)}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.settings.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _stats_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh_stats()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Erro ao atualizar métricas da fila de pagamentos: {str(e)}")
+            await asyncio.sleep(self.settings.stats_interval_seconds)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.settings.workers)]
+        self._tasks.append(asyncio.create_task(self._stats_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from pydantic import BaseSettings, Field
+
+from app.infrastructure import metrics
+from app.infrastructure.core_service_client import CoreServiceClient, RELEASE_SETTLED_REASONS, VEHICLE_AVAILABLE
+from app.ports.sale_repository import SaleRepository
+from app.services.payment_event_processor import invalidate_vehicles, refresh_vehicle_statuses
+from app.services.vehicle_lookup import VehicleLookup
+
+logger = logging.getLogger(__name__)
+
+SWEEP_DURATION = metrics.histogram(
+    "sales_pending_sweep_duration_seconds",
+    "Duração de cada varredura de vendas pendentes expiradas"
+)
+SALES_EXPIRED = metrics.counter(
+    "sales_pending_expired_total",
+    "Vendas pendentes canceladas por expiração"
+)
+VEHICLE_RELEASE_FAILURES = metrics.counter(
+    "sales_pending_vehicle_release_failures_total",
+    "Veículos que não puderam ser liberados no core-service após a expiração da venda"
+)
+
+
+class SweeperSettings(BaseSettings):
+    """Configurações da varredura de vendas pendentes expiradas."""
+    enabled: bool = True
+    interval_seconds: float = Field(60.0, gt=0)
+    batch_size: int = Field(200, gt=0)
+    max_batches: int = Field(5, gt=0)
+    max_age_minutes: float = Field(30.0, gt=0)
+
+    class Config:
+        env_prefix = "SALES_SWEEPER_"
+        env_file = ".env"
+
+
+@dataclass
+class SweepResult:
+    cancelled: int = 0
+    vehicles_released: int = 0
+    vehicles_not_released: int = 0
+    batches: int = 0
+    duration: float = 0.0
+
+
+class PendingSaleSweeper:
+    """
+    Cancela vendas que ficaram pendentes além do prazo e devolve seus veículos
+    ao estoque.
+
+    Cada varredura lê no máximo `max_batches` lotes de `batch_size` vendas pelo
+    índice (payment_status, created_at), cancela cada lote com uma única
+    escrita condicional e, no fim, libera todos os veículos em uma chamada ao
+    core-service.
+
+    A venda é cancelada já marcada com `vehicle_release_pending`, e a marca só
+    sai quando o core-service libera o veículo (ou responde que ele já não
+    está reservado). Se a chamada falhar, as varreduras seguintes tentam de
+    novo, então o veículo nunca fica reservado por uma venda cancelada.
+    """
+
+    def __init__(
+        self,
+        repository: SaleRepository,
+        core_client: CoreServiceClient,
+        settings: Optional[SweeperSettings] = None,
+        vehicle_lookup: Optional[VehicleLookup] = None,
+    ):
+        self.repository = repository
+        self.core_client = core_client
+        self.settings = settings or SweeperSettings()
+        self.vehicle_lookup = vehicle_lookup
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep_once(self, now: Optional[datetime] = None) -> SweepResult:
+        started = time.perf_counter()
+        result = SweepResult()
+        cutoff = (now or datetime.utcnow()) - timedelta(minutes=self.settings.max_age_minutes)
+        cancelled: List[Tuple[str, str]] = []
+
+        try:
+            try:
+                while result.batches < self.settings.max_batches:
+                    expired = await self.repository.find_expired_pending(cutoff, self.settings.batch_size)
+                    if not expired:
+                        break
+                    result.batches += 1
+                    cancelled.extend(await self.repository.cancel_pending(expired))
+                    if len(expired) < self.settings.batch_size:
+                        break
+            finally:
+                result.cancelled = len(cancelled)
+                SALES_EXPIRED.inc(result.cancelled)
+
+            # Além das canceladas agora, tenta de novo os veículos que uma
+            # varredura anterior não conseguiu liberar
+            vehicle_ids = dict.fromkeys(vehicle_id for _, vehicle_id in cancelled)
+            for _, vehicle_id in await self.repository.find_release_pending(self.settings.batch_size):
+                vehicle_ids.setdefault(vehicle_id)
+            if vehicle_ids:
+                await self._release_vehicles(list(vehicle_ids), result)
+        finally:
+            result.duration = time.perf_counter() - started
+            SWEEP_DURATION.observe(result.duration)
+
+        if result.cancelled or result.vehicles_released:
+            logger.info(
+                "Varredura de pendentes: %d vendas canceladas, %d veículos liberados em %.3fs",
+                result.cancelled, result.vehicles_released, result.duration
+            )
+        return result
+
+    async def _release_vehicles(self, vehicle_ids: List[str], result: SweepResult) -> None:
+        try:
+            response = await self.core_client.release_vehicles(vehicle_ids)
+        except Exception as e:
+            result.vehicles_not_released = len(vehicle_ids)
+            VEHICLE_RELEASE_FAILURES.inc(len(vehicle_ids))
+            logger.error(
+                "Falha ao liberar %d veículos de vendas canceladas: %s (veículos: %s)",
+                len(vehicle_ids), e, ", ".join(vehicle_ids)
+            )
+            return
+        finally:
+            invalidate_vehicles(self.vehicle_lookup, vehicle_ids)
+
+        transitioned = response.get("transitioned", [])
+        result.vehicles_released = len(transitioned)
+        await refresh_vehicle_statuses(self.repository, {vehicle_id: VEHICLE_AVAILABLE for vehicle_id in transitioned})
+        rejected = response.get("rejected", [])
+        settled = [r.get("vehicle_id") for r in rejected if r.get("reason") in RELEASE_SETTLED_REASONS]
+        await self._clear_release_pending(transitioned + settled)
+        failed = [r for r in rejected if r.get("reason") not in RELEASE_SETTLED_REASONS]
+        if failed:
+            result.vehicles_not_released = len(failed)
+            VEHICLE_RELEASE_FAILURES.inc(len(failed))
+            logger.warning(
+                "core-service recusou a liberação de %d veículos: %s",
+                len(failed), "; ".join(f"{r.get('vehicle_id')}: {r.get('reason')}" for r in failed)
+            )
+
+    async def _clear_release_pending(self, vehicle_ids: List[str]) -> None:
+        # Se falhar, a próxima varredura tenta liberar de novo e o core-service
+        # responde que o veículo já não está reservado
+        try:
+            await self.repository.clear_release_pending(vehicle_ids)
+        except Exception as e:
+            logger.warning("Erro ao remover a marca de liberação de %d veículos: %s", len(vehicle_ids), e)
+
+    async def run(self) -> None:
+        """Executa varreduras periódicas até a tarefa ser cancelada."""
+        while True:
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro na varredura de vendas pendentes: {str(e)}")
+            await asyncio.sleep(self.settings.interval_seconds)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -26,6 +26,13 @@ class SaleService(ABC):
         """Lista todas as vendas."""
         pass
     
+    @abstractmethod
+    async def search_sales(
+        self, brand: Optional[str] = None, model: Optional[str] = None, year: Optional[int] = None
+    ) -> List[Sale]:
+        """Lista vendas pelos dados do veículo guardados na venda."""
+        pass
+
     @abstractmethod
     async def get_sales_by_status(self, status: str) -> List[Sale]:
         """Lista vendas por status de pagamento."""
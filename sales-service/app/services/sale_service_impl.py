@@ -1,22 +1,34 @@
+import logging
 from typing import List, Optional
-from app.domain.sale import Sale, PaymentStatus
+from app.domain.sale import Sale, PaymentStatus, VehicleSnapshot
 from app.domain.sale_schema import SaleCreate, SaleUpdate
 from app.services.sale_service import SaleService
+from app.services.vehicle_lookup import VehicleLookup
 from app.adapters.mongodb_sale_repository import MongoDBSaleRepository
+from app.infrastructure.core_service_client import VEHICLE_AVAILABLE, VEHICLE_RESERVED
+from app.exceptions import InvalidSaleDataError
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Um veículo reservado pode ser vendido: a reserva é feita antes da venda
+SELLABLE_VEHICLE_STATUSES = (VEHICLE_AVAILABLE, VEHICLE_RESERVED)
+
 
 class SaleServiceImpl(SaleService):
-    def __init__(self, repository: MongoDBSaleRepository):
+    def __init__(self, repository: MongoDBSaleRepository, vehicle_lookup: Optional[VehicleLookup] = None):
         self.repository = repository
+        self.vehicle_lookup = vehicle_lookup
 
     async def create_sale(self, sale_data: SaleCreate) -> Sale:
+        vehicle = await self._validate_vehicle(sale_data)
         new_sale = Sale(
             vehicle_id=sale_data.vehicle_id,
             buyer_cpf=sale_data.buyer_cpf,
             sale_price=sale_data.sale_price,
             payment_code=sale_data.payment_code,
             payment_status=PaymentStatus.PENDING,
+            vehicle=VehicleSnapshot.from_core(vehicle) if vehicle else None,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
@@ -40,16 +52,20 @@ class SaleServiceImpl(SaleService):
     async def get_sales_by_status(self, status: str) -> List[Sale]:
         return await self.repository.find_by_status(status)
 
+    async def search_sales(
+        self, brand: Optional[str] = None, model: Optional[str] = None, year: Optional[int] = None
+    ) -> List[Sale]:
+        return await self.repository.find_by_vehicle(brand=brand, model=model, year=year)
+
     async def update_sale(self, sale_id: str, sale_data: SaleUpdate) -> Optional[Sale]:
-        existing = await self.repository.find_by_id(sale_id)
-        if not existing:
+        update_fields = sale_data.dict(exclude_unset=True, exclude_none=True)
+        if "vehicle_id" in update_fields and self.vehicle_lookup is not None:
+            update_fields["vehicle"] = await self._snapshot(update_fields["vehicle_id"])
+        update_fields["updated_at"] = datetime.utcnow()
+        updated = await self.repository.update_fields(sale_id, update_fields)
+        if not updated:
             raise Exception("Venda não encontrada")
-
-        update_fields = sale_data.dict(exclude_unset=True)
-        for key, value in update_fields.items():
-            setattr(existing, key, value)
-        existing.updated_at = datetime.utcnow()
-        return await self.repository.update(existing)
+        return updated
 
     async def delete_sale(self, sale_id: str) -> None:
         result = await self.repository.delete(sale_id)
@@ -57,15 +73,57 @@ class SaleServiceImpl(SaleService):
             raise Exception("Venda não encontrada")
 
     async def update_payment_status(self, sale_id: str, status: PaymentStatus) -> Optional[Sale]:
-        sale = await self.repository.find_by_id(sale_id)
-        if not sale:
+        updated = await self.repository.update_fields(
+            sale_id,
+            {"payment_status": status, "updated_at": datetime.utcnow()}
+        )
+        if not updated:
             raise Exception("Venda não encontrada")
-        sale.payment_status = status
-        sale.updated_at = datetime.utcnow()
-        return await self.repository.update(sale)
+        return updated
 
     async def get_sale_by_payment_code(self, payment_code: str) -> Optional[Sale]:
         sale = await self.repository.find_by_payment_code(payment_code)
         if not sale:
             raise Exception("Venda não encontrada")
         return sale
+
+    async def _snapshot(self, vehicle_id: str) -> Optional[dict]:
+        """Snapshot do veículo para gravar na venda; None se não for possível obtê-lo."""
+        try:
+            vehicle = await self.vehicle_lookup.get_vehicle(vehicle_id)
+        except Exception as e:
+            logger.warning(f"Não foi possível consultar o veículo {vehicle_id} no core-service: {str(e)}")
+            return None
+        return VehicleSnapshot.from_core(vehicle).dict() if vehicle else None
+
+    async def _validate_vehicle(self, sale_data: SaleCreate) -> Optional[dict]:
+        """
+        Confere a venda com os dados do veículo no core-service e retorna o veículo.
+
+        Se o core-service estiver indisponível a venda segue sem a validação,
+        para não bloquear vendas por uma falha de outro serviço.
+        """
+        if self.vehicle_lookup is None:
+            return None
+        try:
+            vehicle = await self.vehicle_lookup.get_vehicle(sale_data.vehicle_id)
+        except Exception as e:
+            logger.warning(f"Não foi possível validar o veículo {sale_data.vehicle_id} no core-service: {str(e)}")
+            return None
+
+        if vehicle is None:
+            raise InvalidSaleDataError(f"Veículo {sale_data.vehicle_id} não encontrado")
+        status = vehicle.get("status")
+        if status not in SELLABLE_VEHICLE_STATUSES:
+            raise InvalidSaleDataError(f"Veículo não está disponível para venda (status: {status})")
+
+        price = vehicle.get("price")
+        if price:
+            settings = self.vehicle_lookup.settings
+            minimum, maximum = price * settings.min_price_ratio, price * settings.max_price_ratio
+            if not minimum <= sale_data.sale_price <= maximum:
+                raise InvalidSaleDataError(
+                    f"Preço da venda fora da faixa permitida para o veículo: "
+                    f"entre {minimum:.2f} e {maximum:.2f} (preço de tabela {price:.2f})"
+                )
+        return vehicle
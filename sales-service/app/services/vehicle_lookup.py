@@ -0,0 +1,72 @@
+import logging
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pydantic import BaseSettings, Field
+
+from app.infrastructure.batch_loader import BatchLoader
+from app.infrastructure.cache import TTLCache
+from app.infrastructure.core_service_client import CoreServiceClient, MAX_LOOKUP_IDS_PER_CALL
+
+logger = logging.getLogger(__name__)
+
+
+class VehicleLookupSettings(BaseSettings):
+    """Configurações do cache de veículos consultados no core-service."""
+    enabled: bool = True
+    max_size: int = Field(10000, gt=0)
+    ttl_seconds: float = Field(30.0, ge=0)
+    negative_ttl_seconds: float = Field(5.0, ge=0)
+    min_price_ratio: float = Field(0.5, gt=0)
+    max_price_ratio: float = Field(1.5, gt=0)
+
+    class Config:
+        env_prefix = "VEHICLE_CACHE_"
+        env_file = ".env"
+
+
+class VehicleLookup:
+    """
+    Consulta veículos no core-service com cache em memória.
+
+    Acertos no cache não fazem nenhuma chamada de rede; consultas simultâneas ao
+    mesmo id compartilham uma única requisição, e ids inexistentes ficam em
+    cache por `negative_ttl_seconds`.
+    """
+
+    def __init__(self, core_client: CoreServiceClient, settings: Optional[VehicleLookupSettings] = None):
+        self.core_client = core_client
+        self.settings = settings or VehicleLookupSettings()
+        self.cache = TTLCache(
+            "vehicles",
+            max_size=self.settings.max_size,
+            ttl_seconds=self.settings.ttl_seconds,
+            negative_ttl_seconds=self.settings.negative_ttl_seconds,
+        )
+
+    async def get_vehicle(self, vehicle_id: str) -> Optional[dict]:
+        if not ObjectId.is_valid(vehicle_id):
+            return None
+        return await self.cache.get_or_load(vehicle_id, self.core_client.get_vehicle)
+
+    def invalidate(self, vehicle_id: str) -> None:
+        self.cache.invalidate(vehicle_id)
+
+
+class VehicleLoader(BatchLoader):
+    """
+    Carregador de veículos do core-service para uma única requisição.
+
+    Os ids pedidos na mesma volta do event loop viram uma só chamada a
+    POST /vehicles/lookup, em vez de uma chamada por venda.
+    """
+
+    def __init__(self, core_client: CoreServiceClient):
+        super().__init__("vehicles", self._load_vehicles, max_batch_size=MAX_LOOKUP_IDS_PER_CALL)
+        self.core_client = core_client
+
+    async def _load_vehicles(self, vehicle_ids: List[str]) -> Dict[str, dict]:
+        valid_ids = [vehicle_id for vehicle_id in vehicle_ids if ObjectId.is_valid(vehicle_id)]
+        if not valid_ids:
+            return {}
+        return await self.core_client.get_vehicles(valid_ids)
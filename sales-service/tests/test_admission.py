@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.infrastructure.admission import (
+    ADMISSION_REJECTED,
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionSettings,
+)
+
+
+def make_app(controller, release=None):
+    app = FastAPI()
+
+    @app.get("/sales")
+    async def list_sales():
+        if release is not None:
+            await release.wait()
+        return []
+
+    @app.post("/sales")
+    async def create_sale():
+        return {"id": "1"}
+
+    @app.post("/sales/webhook/payment")
+    async def webhook():
+        return {"status": "PAGA"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return app
+
+
+def test_routes_are_classified_by_prefix_then_method():
+    controller = AdmissionController(AdmissionSettings())
+
+    assert controller.classify("GET", "/sales") == "read"
+    assert controller.classify("POST", "/sales") == "write"
+    assert controller.classify("PATCH", "/sales/1/mark-as-paid") == "write"
+    assert controller.classify("POST", "/sales/webhook/payment") == "webhook"
+    assert controller.classify("POST", "/sales/webhook/payment/batch") == "webhook"
+    assert controller.classify("GET", "/sales/webhook/payment/queue") == "read"
+    assert controller.classify("GET", "/metrics") == "exempt"
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_queue_sheds_reads_but_admits_writes_and_webhooks():
+    waiters = 0
+    controller = AdmissionController(
+        AdmissionSettings(pool_waiters_limit=5, retry_after_seconds=2), pool_waiters=lambda: waiters
+    )
+    shed = ADMISSION_REJECTED.labels("read", "pool")
+    before = shed.value
+
+    async with AsyncClient(app=make_app(controller), base_url="http://test") as client:
+        assert (await client.get("/sales")).status_code == 200
+        waiters = 5
+        response = await client.get("/sales")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "2"
+        assert (await client.post("/sales")).status_code == 200
+        assert (await client.post("/sales/webhook/payment")).status_code == 200
+        assert (await client.get("/health")).status_code == 200
+
+    assert shed.value == before + 1
+    assert controller.in_flight == {"read": 0, "write": 0, "webhook": 0}
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_per_route_class():
+    release = asyncio.Event()
+    controller = AdmissionController(AdmissionSettings(max_reads=2), pool_waiters=lambda: 0)
+
+    async with AsyncClient(app=make_app(controller, release), base_url="http://test") as client:
+        pending = [asyncio.create_task(client.get("/sales")) for _ in range(2)]
+        while controller.in_flight["read"] < 2:
+            await asyncio.sleep(0.01)
+
+        assert (await client.get("/sales")).status_code == 503
+        assert (await client.post("/sales")).status_code == 200
+        release.set()
+        assert [response.status_code for response in await asyncio.gather(*pending)] == [200, 200]
+        assert (await client.get("/sales")).status_code == 200
+
+    assert controller.in_flight["read"] == 0
@@ -0,0 +1,121 @@
+import asyncio
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from pymongo import _csot
+from app.infrastructure import deadline
+from app.infrastructure.core_service_client import CoreServiceClient
+from app.infrastructure.deadline import DeadlineExceeded, DeadlineMiddleware, DeadlineSettings, deadline_scope
+from app.infrastructure.resilience import STATE_CLOSED
+
+
+@pytest_asyncio.fixture
+async def client():
+    app = FastAPI()
+    progress = {"finished": False}
+
+    @app.get("/budget")
+    async def budget():
+        return {"remaining": deadline.remaining(), "mongo_timeout": _csot.get_timeout()}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        progress["finished"] = True
+        return {}
+
+    @app.get("/blocking-error")
+    async def blocking_error():
+        time.sleep(0.06)
+        raise HTTPException(status_code=500, detail="operation exceeded time limit")
+
+    app.add_middleware(DeadlineMiddleware, settings=DeadlineSettings(
+        default_timeout_ms=2000,
+        max_timeout_ms=5000,
+        route_timeouts_ms={"/bud": 3000, "/budget": 4000}
+    ))
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, progress
+
+
+@pytest.mark.asyncio
+async def test_deadline_from_header_is_capped(client):
+    client, _ = client
+
+    response = await client.get("/budget", headers={"X-Request-Timeout-Ms": "500"})
+    body = response.json()
+    assert 0 < body["remaining"] <= 0.5
+    assert 0 < body["mongo_timeout"] <= 0.5
+
+    response = await client.get("/budget", headers={"X-Request-Timeout-Ms": "999999"})
+    assert 4.9 < response.json()["remaining"] <= 5
+
+
+@pytest.mark.asyncio
+async def test_route_default_uses_longest_prefix(client):
+    client, _ = client
+
+    response = await client.get("/budget", headers={"X-Request-Timeout-Ms": "invalid"})
+
+    assert 3.9 < response.json()["remaining"] <= 4
+
+
+@pytest.mark.asyncio
+async def test_expired_request_is_abandoned_with_504(client):
+    client, progress = client
+
+    started = time.monotonic()
+    response = await client.get("/slow", headers={"X-Request-Timeout-Ms": "50"})
+
+    assert response.status_code == 504
+    assert time.monotonic() - started < 0.5
+    await asyncio.sleep(0)
+    assert progress["finished"] is False
+
+
+@pytest.mark.asyncio
+async def test_server_error_after_deadline_becomes_504(client):
+    client, _ = client
+
+    response = await client.get("/blocking-error", headers={"X-Request-Timeout-Ms": "20"})
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Prazo da requisição esgotado"}
+
+
+@pytest.mark.asyncio
+async def test_core_client_forwards_remaining_budget():
+    headers = []
+
+    def handler(request):
+        headers.append(request.headers.get("X-Request-Timeout-Ms"))
+        return httpx.Response(200, json={"id": "1"})
+
+    core_client = CoreServiceClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://core"))
+
+    await core_client.get_vehicle("1")
+    with deadline_scope(0.3):
+        await core_client.get_vehicle("1")
+
+    assert headers[0] is None
+    assert 0 < int(headers[1]) <= 300
+
+
+@pytest.mark.asyncio
+async def test_core_client_skips_call_after_deadline():
+    handler_calls = []
+    core_client = CoreServiceClient(http_client=httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: handler_calls.append(request) or httpx.Response(200, json={})),
+        base_url="http://core"
+    ))
+
+    with deadline_scope(0.001):
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceeded):
+            await core_client.get_vehicle("1")
+
+    assert handler_calls == []
+    assert core_client.breaker("get_vehicle").state == STATE_CLOSED
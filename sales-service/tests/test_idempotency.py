@@ -0,0 +1,214 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from app.adapters.mongodb_idempotency_repository import MongoDBIdempotencyRepository
+from app.controllers.sale_controller import router, get_service, get_idempotency_service
+from app.domain.sale import Sale, PaymentStatus
+from app.exceptions import IdempotencyKeyInProgressError
+from app.ports.idempotency_repository import IdempotencyRepository, STATE_COMPLETED, STATE_IN_PROGRESS
+from app.services.idempotency_service import IdempotencyService, fingerprint
+
+
+class InMemoryIdempotencyRepository(IdempotencyRepository):
+    def __init__(self):
+        self.records = {}
+
+    async def reserve(self, key, fingerprint):
+        existing = self.records.get(key)
+        if existing is None:
+            self.records[key] = {"state": STATE_IN_PROGRESS, "fingerprint": fingerprint}
+        return existing
+
+    async def complete(self, key, status_code, body):
+        self.records[key].update(state=STATE_COMPLETED, status_code=status_code, body=body)
+
+    async def release(self, key):
+        self.records.pop(key, None)
+
+
+SALE_PAYLOAD = {
+    "vehicle_id": "test_vehicle_id",
+    "buyer_cpf": "12345678900",
+    "sale_price": 50000.0,
+    "payment_code": "PAY123"
+}
+
+
+def _sale(**overrides):
+    data = dict(
+        id=str(ObjectId()),
+        vehicle_id="test_vehicle_id",
+        buyer_cpf="12345678900",
+        sale_price=50000.0,
+        payment_code="PAY123",
+        payment_status=PaymentStatus.PENDING,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    data.update(overrides)
+    return Sale(**data)
+
+
+@pytest.fixture
+def idempotency_repository():
+    return InMemoryIdempotencyRepository()
+
+
+@pytest.fixture
+def mock_sale_service():
+    service = AsyncMock()
+    service.create_sale.side_effect = lambda sale: _sale(payment_code=sale.payment_code)
+    return service
+
+
+@pytest.fixture
+def app(mock_sale_service, idempotency_repository):
+    app = FastAPI()
+    app.dependency_overrides[get_service] = lambda: mock_sale_service
+    app.dependency_overrides[get_idempotency_service] = lambda: IdempotencyService(idempotency_repository)
+    app.include_router(router)
+    return app
+
+
+@pytest_asyncio.fixture
+async def client(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_create_sale_replays_first_response(client, mock_sale_service):
+    headers = {"Idempotency-Key": "checkout-1"}
+
+    first = await client.post("/sales", json=SALE_PAYLOAD, headers=headers)
+    second = await client.post("/sales", json=SALE_PAYLOAD, headers=headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert mock_sale_service.create_sale.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_create_sale_without_key_is_not_deduplicated(client, mock_sale_service):
+    await client.post("/sales", json=SALE_PAYLOAD)
+    await client.post("/sales", json=SALE_PAYLOAD)
+
+    assert mock_sale_service.create_sale.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_create_sale_key_reused_with_other_payload(client):
+    headers = {"Idempotency-Key": "checkout-1"}
+    await client.post("/sales", json=SALE_PAYLOAD, headers=headers)
+
+    response = await client.post("/sales", json={**SALE_PAYLOAD, "sale_price": 1.0}, headers=headers)
+
+    assert response.status_code == 422
+    assert "conteúdo diferente" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key(client, mock_sale_service, idempotency_repository):
+    mock_sale_service.create_sale.side_effect = [ValueError("Veículo inválido"), _sale()]
+    headers = {"Idempotency-Key": "checkout-1"}
+
+    failed = await client.post("/sales", json=SALE_PAYLOAD, headers=headers)
+    retried = await client.post("/sales", json=SALE_PAYLOAD, headers=headers)
+
+    assert failed.status_code == 400
+    assert retried.status_code == 200
+    assert mock_sale_service.create_sale.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_webhook_event_processed_once(client, mock_sale_service):
+    sale = _sale()
+    mock_sale_service.get_sale_by_payment_code.return_value = sale
+    mock_sale_service.update_payment_status.return_value = _sale(id=sale.id, payment_status=PaymentStatus.PAID)
+    event = {"event_id": "evt_1", "payment_code": "PAY123", "status": "PAGO", "vehicle_id": "test_vehicle_id"}
+
+    first = await client.post("/sales/webhook/payment", json=event)
+    second = await client.post("/sales/webhook/payment", json=event)
+
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert mock_sale_service.update_payment_status.await_count == 1
+    mock_sale_service.get_sale_by_payment_code.assert_awaited_once_with("PAY123")
+
+
+@pytest.mark.asyncio
+async def test_execute_rejects_key_still_in_progress(idempotency_repository):
+    service = IdempotencyService(idempotency_repository)
+    idempotency_repository.records["create_sale:k"] = {"state": STATE_IN_PROGRESS, "fingerprint": fingerprint({"a": 1})}
+    operation = AsyncMock(return_value={"ok": True})
+
+    with pytest.raises(IdempotencyKeyInProgressError):
+        await service.execute("create_sale", "k", {"a": 1}, operation)
+
+    operation.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_execute_replays_stored_response(idempotency_repository):
+    service = IdempotencyService(idempotency_repository)
+    idempotency_repository.records["create_sale:k"] = {
+        "state": STATE_COMPLETED, "fingerprint": fingerprint({"a": 1}), "status_code": 200, "body": {"id": "1"}
+    }
+    operation = AsyncMock()
+
+    assert await service.execute("create_sale", "k", {"a": 1}, operation) == (200, {"id": "1"}, True)
+    operation.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_repository_reserve_is_single_upsert():
+    repository = MongoDBIdempotencyRepository(AsyncMock(spec=AsyncIOMotorClient))
+    repository.collection.find_one_and_update = AsyncMock(return_value=None)
+
+    assert await repository.reserve("create_sale:k", "abc") is None
+
+    query, update = repository.collection.find_one_and_update.call_args.args
+    kwargs = repository.collection.find_one_and_update.call_args.kwargs
+    assert query == {"_id": "create_sale:k"}
+    assert update["$setOnInsert"]["fingerprint"] == "abc"
+    assert kwargs["upsert"] is True
+    assert kwargs["return_document"] == ReturnDocument.BEFORE
+
+
+@pytest.mark.asyncio
+async def test_repository_reserve_takes_over_expired_lock():
+    repository = MongoDBIdempotencyRepository(AsyncMock(spec=AsyncIOMotorClient))
+    expired = {
+        "_id": "create_sale:k", "state": STATE_IN_PROGRESS, "fingerprint": "abc",
+        "expires_at": datetime.utcnow() - timedelta(seconds=5)
+    }
+    repository.collection.find_one_and_update = AsyncMock(side_effect=[expired, expired])
+
+    assert await repository.reserve("create_sale:k", "abc") is None
+
+    query, update = repository.collection.find_one_and_update.call_args.args
+    assert query["_id"] == "create_sale:k"
+    assert query["state"] == STATE_IN_PROGRESS
+    assert "$lt" in query["expires_at"]
+    assert update["$set"]["expires_at"] > datetime.utcnow()
+
+
+@pytest.mark.asyncio
+async def test_repository_reserve_keeps_live_lock():
+    repository = MongoDBIdempotencyRepository(AsyncMock(spec=AsyncIOMotorClient))
+    live = {
+        "_id": "create_sale:k", "state": STATE_IN_PROGRESS, "fingerprint": "abc",
+        "expires_at": datetime.utcnow() + timedelta(seconds=30)
+    }
+    repository.collection.find_one_and_update = AsyncMock(return_value=live)
+
+    assert await repository.reserve("create_sale:k", "abc") == live
+    assert repository.collection.find_one_and_update.await_count == 1
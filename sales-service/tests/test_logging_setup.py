@@ -0,0 +1,91 @@
+import json
+import logging
+import queue
+import sys
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.infrastructure.logging_setup import (
+    LOG_RECORDS_DROPPED,
+    JsonFormatter,
+    LazyQueueHandler,
+    LogSamplingMiddleware,
+    SamplingFilter,
+)
+
+
+@pytest.fixture
+def records():
+    records = queue.Queue(10)
+    handler = LazyQueueHandler(records)
+    handler.addFilter(SamplingFilter())
+    logger = logging.getLogger("test_logging_setup")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    yield records
+    logger.removeHandler(handler)
+
+
+def drain(records):
+    items = []
+    while not records.empty():
+        items.append(records.get_nowait())
+    return items
+
+
+def test_queue_handler_defers_formatting(records):
+    payload = {"payment_code": "PAY123"}
+
+    logging.getLogger("test_logging_setup").info("Webhook %s", payload, extra={"sale_id": "abc"})
+
+    [record] = drain(records)
+    assert (record.msg, record.args) == ("Webhook %s", payload)
+    line = json.loads(JsonFormatter().format(record))
+    assert line["message"] == "Webhook {'payment_code': 'PAY123'}"
+    assert (line["level"], line["logger"], line["sale_id"]) == ("INFO", "test_logging_setup", "abc")
+
+
+def test_json_formatter_includes_exception():
+    try:
+        raise ValueError("falha")
+    except ValueError:
+        record = logging.LogRecord("x", logging.ERROR, __file__, 1, "Erro", None, sys.exc_info())
+
+    line = json.loads(JsonFormatter().format(record))
+    assert "ValueError: falha" in line["exception"]
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = LazyQueueHandler(queue.Queue(1))
+    dropped = LOG_RECORDS_DROPPED.value
+
+    for _ in range(3):
+        handler.handle(logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None))
+
+    assert LOG_RECORDS_DROPPED.value == dropped + 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rate, kept", [(0.0, ["WARNING"]), (1.0, ["INFO", "WARNING"])])
+async def test_sampling_keeps_all_or_none_of_a_request_verbose_logs(records, rate, kept):
+    app = FastAPI()
+
+    @app.post("/test-logging/webhook")
+    async def webhook():
+        logger = logging.getLogger("test_logging_setup")
+        logger.info("Webhook recebido")
+        logger.warning("Venda não encontrada")
+        return {}
+
+    @app.post("/test-logging/other")
+    async def other():
+        logging.getLogger("test_logging_setup").info("Fora da amostragem")
+        return {}
+
+    app.add_middleware(LogSamplingMiddleware, sampling={"/test-logging/webhook": rate})
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.post("/test-logging/webhook")
+        await client.post("/test-logging/other")
+
+    assert [record.levelname for record in drain(records)] == kept + ["INFO"]
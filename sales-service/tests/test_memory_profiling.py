@@ -0,0 +1,113 @@
+import tracemalloc
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.controllers import admin_controller
+from app.infrastructure.cache import TTLCache
+from app.infrastructure.memory_profiling import (
+    MemoryProfiler,
+    MemoryProfilingSettings,
+    approximate_size,
+    container_report,
+)
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    yield
+    tracemalloc.stop()
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    profiler = MemoryProfiler(MemoryProfilingSettings(frames=5, max_snapshots=3))
+    monkeypatch.setattr(admin_controller, "admin_token", "secret")
+    monkeypatch.setattr(admin_controller, "memory_profiler", profiler)
+    app = FastAPI()
+    app.include_router(admin_controller.router)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, profiler
+
+
+def allocate_sales(count):
+    return [{"id": str(i), "vehicle_id": f"vehicle-{i}", "price": float(i)} for i in range(count)]
+
+
+def test_approximate_size_counts_shared_objects_once():
+    payload = "x" * 10_000
+    once = approximate_size([payload])
+
+    assert once > 10_000
+    assert approximate_size([payload, payload]) - once < 100
+    assert approximate_size([payload, "y" * 10_000]) - once > 10_000
+    assert container_report([payload])["entries"] == 1
+
+
+def test_cache_reports_entries_size():
+    cache = TTLCache("test-memory")
+    empty = cache.approximate_bytes()
+    cache.set("vehicle-1", {"model": "x" * 10_000})
+
+    assert cache.approximate_bytes() - empty > 10_000
+
+
+@pytest.mark.asyncio
+async def test_snapshot_requires_tracemalloc():
+    with pytest.raises(RuntimeError):
+        await MemoryProfiler().take_snapshot()
+
+
+@pytest.mark.asyncio
+async def test_diff_attributes_growth_to_allocating_line(client):
+    client, profiler = client
+
+    assert (await client.post("/admin/memory/snapshots", headers=ADMIN)).status_code == 409
+    status = (await client.post("/admin/memory/tracemalloc", headers=ADMIN)).json()
+    assert status["tracing"] is True and status["frames"] == 5
+    base = (await client.post("/admin/memory/snapshots", headers=ADMIN)).json()["name"]
+    sales = allocate_sales(5_000)
+    target = (await client.post("/admin/memory/snapshots", headers=ADMIN)).json()["name"]
+
+    diff = (await client.get("/admin/memory/diff", params={"base": base, "target": target}, headers=ADMIN)).json()
+    biggest = diff["statistics"][0]
+    assert biggest["file"] == __file__
+    assert biggest["size_diff_bytes"] > 500_000
+    by_file = await client.get(
+        "/admin/memory/diff", params={"base": base, "target": target, "group_by": "filename"}, headers=ADMIN
+    )
+    assert by_file.json()["statistics"][0]["line"] is None
+    top = (await client.get(f"/admin/memory/snapshots/{target}", params={"top": 1}, headers=ADMIN)).json()
+    assert top["snapshot"]["name"] == target and len(top["statistics"]) == 1
+    assert len(sales) == 5_000
+
+
+@pytest.mark.asyncio
+async def test_snapshots_are_bounded_and_validated(client):
+    client, profiler = client
+    profiler.start()
+
+    for _ in range(4):
+        await client.post("/admin/memory/snapshots", headers=ADMIN)
+
+    state = (await client.get("/admin/memory", headers=ADMIN)).json()
+    assert [s["name"] for s in state["snapshots"]] == ["snapshot-4", "snapshot-3", "snapshot-2"]
+    assert (await client.get("/admin/memory/snapshots/snapshot-1", headers=ADMIN)).status_code == 404
+    invalid = await client.get("/admin/memory/snapshots/snapshot-2", params={"group_by": "module"}, headers=ADMIN)
+    assert invalid.status_code == 400
+    assert (await client.delete("/admin/memory/tracemalloc", headers=ADMIN)).json()["tracing"] is False
+    assert (await client.delete("/admin/memory/snapshots", headers=ADMIN)).json()["snapshots"] == []
+
+
+@pytest.mark.asyncio
+async def test_cache_report_and_admin_token(client):
+    client, profiler = client
+    profiler.register("sales", lambda: container_report(allocate_sales(10)))
+    profiler.register("broken", lambda: 1 / 0)
+
+    assert (await client.get("/admin/memory/caches")).status_code == 401
+    caches = (await client.get("/admin/memory/caches", headers=ADMIN)).json()
+    assert caches["sales"]["entries"] == 10 and caches["sales"]["approximate_bytes"] > 0
+    assert caches["broken"] == {"error": "division by zero"}
@@ -0,0 +1,95 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from app.infrastructure import metrics
+from app.infrastructure.http_metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    MetricsMiddleware,
+    metrics_endpoint,
+)
+
+
+def test_render_prometheus_text_format():
+    registry = metrics.MetricsRegistry()
+    requests = registry.register(metrics.Counter("test_requests_total", "Requisições", ["route"]))
+    depth = registry.register(metrics.Gauge("test_depth", "Profundidade\nda fila"))
+    latency = registry.register(metrics.Histogram("test_latency_seconds", "Latência", buckets=(0.1, 1.0)))
+    requests.labels('/a"b').inc(2)
+    depth.set_function(lambda: 7)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert metrics.render(registry).splitlines() == [
+        "# HELP test_requests_total Requisições",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/a\\"b"} 2.0',
+        "# HELP test_depth Profundidade\\nda fila",
+        "# TYPE test_depth gauge",
+        "test_depth 7.0",
+        "# HELP test_latency_seconds Latência",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1.0"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 3',
+        "test_latency_seconds_sum 5.55",
+        "test_latency_seconds_count 3",
+    ]
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/test-metrics/{item_id}")
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404, detail="Não encontrado")
+        return {"id": item_id}
+
+    @app.get("/test-metrics-error")
+    async def error():
+        raise RuntimeError("falha")
+
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for item_id in ["1", "2", "3", "missing"]:
+            await client.get(f"/test-metrics/{item_id}")
+        await client.get("/test-metrics-nowhere/abc")
+
+    route = "/test-metrics/{item_id}"
+    assert HTTP_REQUESTS.labels("GET", route, "200").value == 3
+    assert HTTP_REQUEST_DURATION.labels("GET", route, "200").count == 3
+    assert HTTP_REQUESTS.labels("GET", route, "404").value == 1
+    assert HTTP_REQUESTS.labels("GET", "<unmatched>", "404").value == 1
+    assert HTTP_REQUESTS_IN_PROGRESS.value == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_unhandled_errors_as_500(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with pytest.raises(RuntimeError):
+            await client.get("/test-metrics-error")
+
+    assert HTTP_REQUESTS.labels("GET", "/test-metrics-error", "500").value == 1
+    assert HTTP_REQUESTS_IN_PROGRESS.value == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/test-metrics/1")
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert 'sales_http_requests_total{method="GET",route="/test-metrics/{item_id}",status="200"}' in response.text
+    assert "# TYPE sales_http_request_duration_seconds histogram" in response.text
@@ -0,0 +1,121 @@
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from app.infrastructure.mongo_monitoring import (
+    COMMAND_DURATION,
+    COMMAND_FAILURES,
+    ConnectionPoolMonitor,
+    MongoCommandMonitor,
+    MongoMonitoringSettings,
+    command_shape,
+)
+
+
+def run_command(monitor, command_name, command, duration_ms, request_id=1, failed=False):
+    started = SimpleNamespace(
+        command_name=command_name, command=command, database_name="sales_db",
+        connection_id=("localhost", 27017), request_id=request_id
+    )
+    finished = SimpleNamespace(
+        connection_id=started.connection_id, request_id=request_id, duration_micros=int(duration_ms * 1000), reply={}
+    )
+    monitor.started(started)
+    if failed:
+        monitor.failed(finished)
+    else:
+        monitor.succeeded(finished)
+
+
+def test_command_shape_redacts_values():
+    find = {"find": "test_sales", "filter": {"status": "PENDENTE", "vehicle_id": {"$in": ["a", "b", "c"]}}, "lsid": {}}
+    aggregate = {"aggregate": "test_sales", "pipeline": [{"$match": {"buyer_cpf": "123"}}, {"$group": {"_id": "$status"}}]}
+    update = {"update": "test_sales", "updates": [{"q": {"_id": ObjectId()}, "u": {"$set": {"status": "PAGO"}}}]}
+
+    assert command_shape("find", find) == {"status": "?", "vehicle_id": {"$in": ["?"]}}
+    assert command_shape("aggregate", aggregate) == {"pipeline": [{"$match": {"buyer_cpf": "?"}}, {"$group": "..."}]}
+    assert command_shape("update", update) == {"_id": "?"}
+    assert command_shape("insert", {"insert": "test_sales", "documents": [{"buyer_cpf": "123"}]}) is None
+
+
+def test_monitor_records_duration_and_failures():
+    monitor = MongoCommandMonitor(MongoMonitoringSettings(slow_ms=1000))
+    duration = COMMAND_DURATION.labels("test_monitor_sales", "find")
+    count = duration.count
+
+    run_command(monitor, "find", {"find": "test_monitor_sales", "filter": {}}, 3, request_id=1)
+    run_command(monitor, "find", {"find": "test_monitor_sales", "filter": {}}, 3, request_id=2, failed=True)
+    run_command(monitor, "ping", {"ping": 1}, 3, request_id=3)
+
+    assert duration.count == count + 2
+    assert COMMAND_FAILURES.labels("test_monitor_sales", "find").value == 1
+    assert monitor.slow_shapes() == []
+    assert monitor._pending == {}
+
+
+def test_monitor_logs_slow_commands_without_values(caplog):
+    monitor = MongoCommandMonitor(MongoMonitoringSettings(slow_ms=50))
+    with caplog.at_level(logging.WARNING, logger="app.infrastructure.mongo_monitoring"):
+        run_command(monitor, "find", {"find": "test_sales", "filter": {"buyer_cpf": "12345678900"}}, 120, request_id=1)
+        run_command(monitor, "find", {"find": "test_sales", "filter": {"buyer_cpf": "98765432100"}}, 80, request_id=2)
+        run_command(monitor, "find", {"find": "test_sales", "filter": {"status": "PAGO"}}, 10, request_id=3)
+
+    assert len(caplog.records) == 2
+    assert '{"buyer_cpf": "?"}' in caplog.records[0].getMessage()
+    assert "12345678900" not in caplog.text
+    [slow] = monitor.slow_shapes()
+    assert slow.count == 2
+    assert slow.max_seconds == pytest.approx(0.12)
+    assert slow.sample is None
+
+
+def test_monitor_keeps_only_the_slowest_shapes():
+    monitor = MongoCommandMonitor(MongoMonitoringSettings(slow_ms=0, max_slow_shapes=2))
+    for request_id, (field, duration_ms) in enumerate([("a", 30), ("b", 10), ("c", 20), ("d", 5)]):
+        run_command(monitor, "find", {"find": "test_sales", "filter": {field: 1}}, duration_ms, request_id=request_id)
+
+    assert [slow.shape for slow in monitor.slow_shapes()] == [{"a": "?"}, {"c": "?"}]
+
+
+@pytest.mark.asyncio
+async def test_explain_slowest_shapes():
+    monitor = MongoCommandMonitor(MongoMonitoringSettings(slow_ms=0, explain_enabled=True, explain_top=1))
+    command = {"find": "test_sales", "filter": {"status": "PAGO"}, "lsid": {"id": 1}, "$db": "sales_db"}
+    run_command(monitor, "find", command, 200, request_id=1)
+    run_command(monitor, "insert", {"insert": "test_sales", "documents": []}, 100, request_id=2)
+    database = MagicMock()
+    database.command = AsyncMock(return_value={"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}})
+    client = MagicMock()
+    client.__getitem__.return_value = database
+
+    assert await monitor.explain_slowest(client) == 1
+    assert await monitor.explain_slowest(client) == 0
+
+    client.__getitem__.assert_called_with("sales_db")
+    database.command.assert_awaited_once_with({
+        "explain": {"find": "test_sales", "filter": {"status": "PAGO"}}, "verbosity": "queryPlanner"
+    })
+    assert monitor.slow_shapes()[0].to_dict()["explain"] == {"winningPlan": {"stage": "COLLSCAN"}}
+
+
+def test_pool_monitor_counts_connections_and_waiters():
+    monitor = ConnectionPoolMonitor()
+    address = ("localhost", 27017)
+    event = SimpleNamespace(address=address, options={"maxPoolSize": 10})
+
+    monitor.pool_created(event)
+    for _ in range(5):
+        monitor.connection_check_out_started(event)
+    for _ in range(3):
+        monitor.connection_created(event)
+        monitor.connection_checked_out(event)
+    monitor.connection_check_out_failed(event)
+    monitor.connection_checked_in(event)
+    monitor.connection_closed(event)
+
+    assert monitor.stats() == {"localhost:27017": {"max_pool_size": 10, "open": 2, "checked_out": 2, "waiting": 1}}
+    assert monitor.waiters() == 1
+    monitor.pool_closed(event)
+    assert monitor.stats() == {}
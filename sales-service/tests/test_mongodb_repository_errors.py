@@ -125,4 +125,30 @@ async def test_update_invalid_object_id(repository):
             updated_at=datetime.now()
         ))
     
-    assert "ID de venda inválido"
\ No newline at end of file
+    assert "ID de venda inválido"
+
+@pytest.mark.asyncio
+async def test_update_fields_uses_find_one_and_update(repository):
+    sale_id = str(ObjectId())
+    repository.collection.find_one_and_update = AsyncMock(return_value={
+        "_id": ObjectId(sale_id),
+        "vehicle_id": "test_vehicle_id",
+        "buyer_cpf": "12345678900",
+        "sale_price": 50000.0,
+        "payment_code": "test_payment_code",
+        "payment_status": PaymentStatus.PAID,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
+    })
+
+    sale = await repository.update_fields(sale_id, {"payment_status": PaymentStatus.PAID})
+
+    assert sale.payment_status == PaymentStatus.PAID
+    query, update = repository.collection.find_one_and_update.call_args.args
+    assert query == {"_id": ObjectId(sale_id)}
+    assert update == {"$set": {"payment_status": PaymentStatus.PAID}}
+
+@pytest.mark.asyncio
+async def test_update_fields_invalid_object_id(repository):
+    assert await repository.update_fields("ID de venda inválido", {"sale_price": 1.0}) is None
+    repository.collection.find_one_and_update.assert_not_called()
@@ -0,0 +1,180 @@
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.adapters.mongodb_sale_repository import MongoDBSaleRepository
+from app.controllers.sale_controller import router, get_payment_event_processor, get_idempotency_service
+from app.domain.sale import Sale, PaymentStatus, PaymentUpdateOutcome
+from app.services.payment_event_processor import PaymentEventProcessor
+
+
+def _sale(payment_code, status=PaymentStatus.PENDING, vehicle_id=None):
+    return Sale(
+        id=str(ObjectId()),
+        vehicle_id=vehicle_id or f"vehicle_{payment_code}",
+        buyer_cpf="12345678900",
+        sale_price=50000.0,
+        payment_code=payment_code,
+        payment_status=status
+    )
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+
+@pytest.fixture
+def repository():
+    repository = AsyncMock()
+
+    async def apply(statuses):
+        outcomes = {}
+        for code, status in statuses.items():
+            if code.startswith("missing"):
+                outcomes[code] = (PaymentUpdateOutcome.NOT_FOUND, None)
+            else:
+                outcomes[code] = (PaymentUpdateOutcome.UPDATED, _sale(code, PaymentStatus(status)))
+        return outcomes
+
+    repository.apply_payment_statuses.side_effect = apply
+    return repository
+
+
+@pytest.fixture
+def core_client():
+    client = AsyncMock()
+    client.update_vehicle_statuses.side_effect = lambda transitions: {
+        "transitioned": [vehicle_id for vehicle_id in transitions],
+        "rejected": []
+    }
+    return client
+
+
+@pytest.mark.asyncio
+async def test_process_batch_dedupes_and_reports_outcomes(repository, core_client):
+    processor = PaymentEventProcessor(repository, core_client)
+    events = [
+        {"payment_code": "PAY1", "status": "PENDENTE"},
+        {"payment_code": "PAY2", "status": "pago"},
+        {"payment_code": "PAY1", "status": "PAGO"},
+        {"payment_code": "PAY3", "status": "INVALIDO"},
+        {"status": "PAGO"},
+        {"payment_code": "missing", "status": "CANCELADA"},
+    ]
+
+    result = await processor.process(events)
+
+    assert [o.outcome for o in result.outcomes] == [
+        "superseded", "updated", "updated", "invalid", "invalid", "not_found"
+    ]
+    assert (result.updated, result.superseded, result.invalid, result.not_found) == (2, 1, 2, 1)
+    repository.apply_payment_statuses.assert_awaited_once()
+    statuses = repository.apply_payment_statuses.call_args.args[0]
+    assert statuses == {"PAY1": PaymentStatus.PAID, "PAY2": PaymentStatus.PAID, "missing": PaymentStatus.CANCELLED}
+    core_client.update_vehicle_statuses.assert_awaited_once_with(
+        {"vehicle_PAY2": "VENDIDO", "vehicle_PAY1": "VENDIDO"}
+    )
+    assert result.vehicles_notified == 2
+
+
+@pytest.mark.asyncio
+async def test_process_batch_keeps_updates_when_notification_fails(repository, core_client):
+    core_client.update_vehicle_statuses.side_effect = Exception("timeout")
+    processor = PaymentEventProcessor(repository, core_client)
+
+    result = await processor.process([{"payment_code": "PAY1", "status": "CANCELADA"}])
+
+    assert result.updated == 1
+    assert result.vehicles_notified == 0
+    assert result.notification_error == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_process_batch_without_updates_skips_notification(repository, core_client):
+    processor = PaymentEventProcessor(repository, core_client)
+
+    result = await processor.process([{"payment_code": "missing", "status": "PAGO"}])
+
+    assert result.not_found == 1
+    core_client.update_vehicle_statuses.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_repository_apply_payment_statuses_single_bulk_write():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    paid = _sale("PAY2", PaymentStatus.PAID).to_dict()
+    pending = _sale("PAY1").to_dict()
+    repository.collection.find = MagicMock(return_value=Cursor([pending, paid]))
+    repository.collection.bulk_write = AsyncMock(return_value=MagicMock(modified_count=1))
+
+    outcomes = await repository.apply_payment_statuses({
+        "PAY1": PaymentStatus.PAID, "PAY2": PaymentStatus.PAID, "PAY3": PaymentStatus.PAID
+    })
+
+    assert outcomes["PAY1"][0] == PaymentUpdateOutcome.UPDATED
+    assert outcomes["PAY1"][1].payment_status == PaymentStatus.PAID
+    assert outcomes["PAY2"][0] == PaymentUpdateOutcome.UNCHANGED
+    assert outcomes["PAY3"] == (PaymentUpdateOutcome.NOT_FOUND, None)
+    operations = repository.collection.bulk_write.call_args.args[0]
+    assert len(operations) == 1
+    assert operations[0]._filter == {"_id": pending["_id"], "payment_status": PaymentStatus.PENDING}
+
+
+@pytest.mark.asyncio
+async def test_repository_apply_payment_statuses_reports_conflicts():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    first, second = _sale("PAY1").to_dict(), _sale("PAY2").to_dict()
+    repository.collection.find = MagicMock(side_effect=[Cursor([first, second]), Cursor([{"_id": first["_id"]}])])
+    repository.collection.bulk_write = AsyncMock(return_value=MagicMock(modified_count=1))
+
+    outcomes = await repository.apply_payment_statuses({"PAY1": PaymentStatus.PAID, "PAY2": PaymentStatus.PAID})
+
+    assert outcomes["PAY1"][0] == PaymentUpdateOutcome.UPDATED
+    assert outcomes["PAY2"] == (PaymentUpdateOutcome.CONFLICT, None)
+    operations = repository.collection.bulk_write.call_args.args[0]
+    query = repository.collection.find.call_args.args[0]
+    assert query["status_change"] == operations[0]._doc["$set"]["status_change"]
+    assert "updated_at" not in query
+
+
+@pytest_asyncio.fixture
+async def client(repository, core_client):
+    app = FastAPI()
+    app.dependency_overrides[get_payment_event_processor] = lambda: PaymentEventProcessor(repository, core_client)
+    app.dependency_overrides[get_idempotency_service] = lambda: None
+    app.include_router(router)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_batch_webhook_route(client):
+    response = await client.post("/sales/webhook/payment/batch", json={"events": [
+        {"payment_code": "PAY1", "status": "PAGO"},
+        {"payment_code": "PAY2", "status": "???"}
+    ]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["updated"] == 1
+    assert data["invalid"] == 1
+    assert data["outcomes"][1]["detail"].startswith("status")
+
+
+@pytest.mark.asyncio
+async def test_batch_webhook_rejects_oversized_batch(client):
+    events = [{"payment_code": f"PAY{i}", "status": "PAGO"} for i in range(1001)]
+
+    response = await client.post("/sales/webhook/payment/batch", json={"events": events})
+
+    assert response.status_code == 422
@@ -0,0 +1,345 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.adapters.mongodb_payment_event_queue import MongoDBPaymentEventQueue
+from app.controllers.sale_controller import (
+    router,
+    get_service,
+    get_idempotency_service,
+    get_payment_event_workers
+)
+from app.ports.payment_event_queue import PaymentEventQueue
+from app.schemas.sale_schema import PaymentEventBatchResult, PaymentEventOutcome
+from app.services.payment_event_workers import PaymentEventWorkerPool, PaymentQueueSettings, EVENTS_PROCESSED
+
+
+class InMemoryQueue(PaymentEventQueue):
+    def __init__(self):
+        self.entries = []
+        self.claimed = []
+        self.acked = []
+        self.retried = []
+        self.next_id = 0
+
+    async def enqueue(self, event):
+        self.next_id += 1
+        self.entries.append({
+            "id": str(self.next_id), "event": event, "attempts": 0, "claim": None, "enqueued_at": datetime.utcnow()
+        })
+        return str(self.next_id)
+
+    async def claim(self, limit):
+        held = {entry["event"]["payment_code"] for entry in self.claimed if entry["claim"]}
+        claimed = [entry for entry in self.entries if entry["event"]["payment_code"] not in held][:limit]
+        self.entries = [entry for entry in self.entries if entry not in claimed]
+        for entry in claimed:
+            entry["attempts"] += 1
+            entry["claim"] = f"claim_{len(self.claimed)}"
+        self.claimed += claimed
+        return claimed
+
+    async def ack(self, entries):
+        self.acked += [entry["id"] for entry in entries]
+        for entry in entries:
+            entry["claim"] = None
+
+    async def retry(self, entries, max_attempts):
+        self.retried += entries
+        for entry in entries:
+            entry["claim"] = None
+        return sum(entry["attempts"] >= max_attempts for entry in entries)
+
+    async def depth(self):
+        return len(self.entries)
+
+    async def oldest_enqueued_at(self):
+        return self.entries[0]["enqueued_at"] if self.entries else None
+
+
+def _processor():
+    processor = AsyncMock()
+    processor.process.side_effect = lambda events: PaymentEventBatchResult(outcomes=[
+        PaymentEventOutcome(index=i, payment_code=event["payment_code"], outcome="updated")
+        for i, event in enumerate(events)
+    ])
+    return processor
+
+
+def _event(code, status="PAGO"):
+    return {"payment_code": code, "status": status, "vehicle_id": f"vehicle_{code}"}
+
+
+@pytest.mark.asyncio
+async def test_worker_coalesces_events_arriving_within_window():
+    queue = InMemoryQueue()
+    processor = _processor()
+    pool = PaymentEventWorkerPool(queue, processor, PaymentQueueSettings(batch_size=10, coalesce_window_ms=20))
+    await queue.enqueue(_event("PAY1"))
+
+    async def late_arrival():
+        await asyncio.sleep(0.005)
+        await queue.enqueue(_event("PAY2"))
+
+    arrival = asyncio.create_task(late_arrival())
+    handled = await pool.process_available()
+    await arrival
+
+    assert handled == 2
+    processor.process.assert_awaited_once_with([_event("PAY1"), _event("PAY2")])
+    assert queue.acked == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_worker_returns_events_to_queue_on_failure():
+    queue = InMemoryQueue()
+    processor = AsyncMock()
+    processor.process.side_effect = ValueError("mongo indisponível")
+    pool = PaymentEventWorkerPool(queue, processor, PaymentQueueSettings(coalesce_window_ms=0, max_attempts=1))
+    await queue.enqueue(_event("PAY1"))
+
+    await pool.process_available()
+
+    assert queue.acked == []
+    assert [entry["id"] for entry in queue.retried] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_worker_returns_conflicts_to_queue():
+    queue = InMemoryQueue()
+    processor = AsyncMock()
+    processor.process.return_value = PaymentEventBatchResult(outcomes=[
+        PaymentEventOutcome(index=0, payment_code="PAY1", outcome="updated"),
+        PaymentEventOutcome(index=1, payment_code="PAY2", outcome="conflict"),
+    ])
+    pool = PaymentEventWorkerPool(queue, processor, PaymentQueueSettings(coalesce_window_ms=0))
+    await queue.enqueue(_event("PAY1"))
+    await queue.enqueue(_event("PAY2"))
+
+    await pool.process_available()
+
+    assert queue.acked == ["1"]
+    assert [entry["id"] for entry in queue.retried] == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_events_of_same_code_stay_with_one_worker():
+    queue = InMemoryQueue()
+    settings = PaymentQueueSettings(batch_size=1, coalesce_window_ms=0)
+    first_worker, second_worker = _processor(), _processor()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_process(events):
+        started.set()
+        await release.wait()
+        return PaymentEventBatchResult(outcomes=[
+            PaymentEventOutcome(index=0, payment_code=events[0]["payment_code"], outcome="updated")
+        ])
+
+    first_worker.process.side_effect = slow_process
+    await queue.enqueue(_event("PAY1", "PAGO"))
+    await queue.enqueue(_event("PAY1", "CANCELADA"))
+    await queue.enqueue(_event("PAY2"))
+
+    first = asyncio.create_task(PaymentEventWorkerPool(queue, first_worker, settings).process_available())
+    await started.wait()
+    second = PaymentEventWorkerPool(queue, second_worker, settings)
+    await second.process_available()
+    release.set()
+    await first
+    await second.process_available()
+
+    assert [call.args[0] for call in second_worker.process.await_args_list] == [
+        [_event("PAY2")], [_event("PAY1", "CANCELADA")]
+    ]
+    assert queue.acked == ["3", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_drains_queue_in_background():
+    queue = InMemoryQueue()
+    processor = _processor()
+    pool = PaymentEventWorkerPool(
+        queue, processor, PaymentQueueSettings(workers=2, coalesce_window_ms=0, poll_interval_seconds=0.01)
+    )
+    before = EVENTS_PROCESSED.labels("updated").value
+    pool.start()
+    try:
+        for i in range(5):
+            await queue.enqueue(_event(f"PAY{i}"))
+            pool.notify()
+        for _ in range(50):
+            if len(queue.acked) == 5:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await pool.stop()
+
+    assert sorted(queue.acked) == ["1", "2", "3", "4", "5"]
+    assert EVENTS_PROCESSED.labels("updated").value == before + 5
+
+
+@pytest.mark.asyncio
+async def test_refresh_stats_reports_depth_and_age():
+    queue = InMemoryQueue()
+    await queue.enqueue(_event("PAY1"))
+    queue.entries[0]["enqueued_at"] = datetime.utcnow() - timedelta(seconds=30)
+    pool = PaymentEventWorkerPool(queue, _processor())
+
+    stats = await pool.refresh_stats()
+
+    assert stats["depth"] == 1
+    assert stats["oldest_age_seconds"] >= 30
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, limit):
+        return self
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+
+@pytest.mark.asyncio
+async def test_mongodb_queue_claim_marks_entries_with_token():
+    queue = MongoDBPaymentEventQueue(AsyncMock(spec=AsyncIOMotorClient))
+    entry_id = ObjectId()
+    queue.collection.distinct = AsyncMock(return_value=[])
+    queue.collection.find = MagicMock(side_effect=[
+        Cursor([{"_id": entry_id}]),
+        Cursor([{
+            "_id": entry_id, "event": _event("PAY1"), "attempts": 1, "claim": "token",
+            "enqueued_at": datetime.utcnow()
+        }]),
+        Cursor([])
+    ])
+    queue.collection.update_many = AsyncMock()
+
+    entries = await queue.claim(10)
+
+    assert entries[0]["id"] == str(entry_id)
+    query, update = queue.collection.update_many.call_args.args
+    assert query["_id"] == {"$in": [entry_id]}
+    assert update["$set"]["state"] == "claimed"
+    assert update["$inc"] == {"attempts": 1}
+    assert queue.collection.find.call_args_list[1].args[0] == {"claim": update["$set"]["claim"]}
+
+
+@pytest.mark.asyncio
+async def test_mongodb_queue_claim_skips_codes_held_by_other_workers():
+    queue = MongoDBPaymentEventQueue(AsyncMock(spec=AsyncIOMotorClient))
+    queue.collection.distinct = AsyncMock(return_value=["PAY1"])
+    queue.collection.find = MagicMock(return_value=Cursor([]))
+
+    assert await queue.claim(10) == []
+
+    query = queue.collection.find.call_args.args[0]
+    assert query["event.payment_code"] == {"$nin": ["PAY1"]}
+    assert queue.collection.distinct.call_args.args[0] == "event.payment_code"
+
+
+@pytest.mark.asyncio
+async def test_mongodb_queue_claim_releases_code_split_across_workers():
+    # Duas reservas simultâneas: a outra ficou com o primeiro evento de PAY1 e
+    # esta com o segundo, então esta devolve o seu e fica só com PAY2
+    queue = MongoDBPaymentEventQueue(AsyncMock(spec=AsyncIOMotorClient))
+    now = datetime.utcnow()
+    first_pay1, second_pay1, pay2 = ObjectId(), ObjectId(), ObjectId()
+    queue.collection.distinct = AsyncMock(return_value=[])
+    queue.collection.find = MagicMock(side_effect=[
+        Cursor([{"_id": second_pay1}, {"_id": pay2}]),
+        Cursor([
+            {"_id": second_pay1, "event": _event("PAY1", "CANCELADA"), "attempts": 1, "claim": "b",
+             "enqueued_at": now},
+            {"_id": pay2, "event": _event("PAY2"), "attempts": 1, "claim": "b",
+             "enqueued_at": now + timedelta(seconds=1)},
+        ]),
+        Cursor([{"_id": first_pay1, "event": {"payment_code": "PAY1"}, "enqueued_at": now - timedelta(seconds=1)}])
+    ])
+    queue.collection.update_many = AsyncMock()
+
+    entries = await queue.claim(10)
+
+    assert [entry["id"] for entry in entries] == [str(pay2)]
+    query, update = queue.collection.update_many.call_args.args
+    assert query["_id"] == {"$in": [second_pay1]}
+    assert update["$set"] == {"state": "pending"}
+    assert update["$inc"] == {"attempts": -1}
+
+
+@pytest.mark.asyncio
+async def test_mongodb_queue_ack_requires_claim_token():
+    queue = MongoDBPaymentEventQueue(AsyncMock(spec=AsyncIOMotorClient))
+    entry_id = ObjectId()
+    queue.collection.bulk_write = AsyncMock()
+
+    await queue.ack([{"id": str(entry_id), "claim": "token"}])
+
+    operations = queue.collection.bulk_write.call_args.args[0]
+    assert operations[0]._filter == {"_id": entry_id, "claim": "token"}
+
+
+@pytest_asyncio.fixture
+async def queue_client():
+    queue = InMemoryQueue()
+    pool = PaymentEventWorkerPool(queue, _processor())
+    service = AsyncMock()
+    app = FastAPI()
+    app.dependency_overrides[get_service] = lambda: service
+    app.dependency_overrides[get_idempotency_service] = lambda: None
+    app.dependency_overrides[get_payment_event_workers] = lambda: pool
+    app.include_router(router)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, queue, service
+
+
+@pytest.mark.asyncio
+async def test_webhook_enqueues_and_returns_accepted(queue_client):
+    client, queue, service = queue_client
+
+    response = await client.post(
+        "/sales/webhook/payment",
+        json={"event_id": "evt_1", "payment_code": "PAY1", "status": "pago", "vehicle_id": "v1"}
+    )
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "accepted"
+    assert queue.entries[0]["event"] == {
+        "payment_code": "PAY1", "status": "PAGO", "vehicle_id": "v1", "event_id": "evt_1"
+    }
+    service.update_payment_status.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_webhook_validates_before_enqueueing(queue_client):
+    client, queue, _ = queue_client
+
+    response = await client.post("/sales/webhook/payment", json={"payment_code": "PAY1", "status": "X", "vehicle_id": "v1"})
+
+    assert response.status_code == 400
+    assert queue.entries == []
+
+
+@pytest.mark.asyncio
+async def test_queue_stats_route(queue_client):
+    client, queue, _ = queue_client
+    await queue.enqueue(_event("PAY1"))
+
+    response = await client.get("/sales/webhook/payment/queue")
+
+    assert response.status_code == 200
+    assert response.json()["depth"] == 1
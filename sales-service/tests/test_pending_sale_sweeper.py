@@ -0,0 +1,221 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime, timedelta
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.adapters.mongodb_sale_repository import MongoDBSaleRepository
+from app.services.pending_sale_sweeper import PendingSaleSweeper, SweeperSettings
+
+
+def _sales(count, start=0):
+    return [(str(ObjectId()), f"vehicle_{i}") for i in range(start, start + count)]
+
+
+@pytest.fixture
+def repository():
+    repository = AsyncMock()
+    repository.cancel_pending.side_effect = lambda sales: list(sales)
+    repository.find_release_pending.return_value = []
+    return repository
+
+
+@pytest.fixture
+def core_client():
+    client = AsyncMock()
+    client.release_vehicles.side_effect = lambda ids: {
+        "transitioned": [vehicle_id for vehicle_id in ids],
+        "rejected": []
+    }
+    return client
+
+
+@pytest.mark.asyncio
+async def test_sweep_cancels_in_batches_and_releases_once(repository, core_client):
+    first, second = _sales(2), _sales(1, start=2)
+    repository.find_expired_pending.side_effect = [first, second]
+    settings = SweeperSettings(batch_size=2, max_batches=5, max_age_minutes=30)
+    sweeper = PendingSaleSweeper(repository, core_client, settings)
+    now = datetime(2024, 1, 1, 12, 0)
+
+    result = await sweeper.sweep_once(now=now)
+
+    assert result.cancelled == 3
+    assert result.batches == 2
+    assert result.vehicles_released == 3
+    cutoff = repository.find_expired_pending.call_args_list[0].args[0]
+    assert cutoff == now - timedelta(minutes=30)
+    core_client.release_vehicles.assert_awaited_once_with(["vehicle_0", "vehicle_1", "vehicle_2"])
+
+
+@pytest.mark.asyncio
+async def test_sweep_invalidates_released_vehicles(repository, core_client):
+    repository.find_expired_pending.side_effect = [_sales(2)]
+    lookup = MagicMock()
+    sweeper = PendingSaleSweeper(repository, core_client, SweeperSettings(batch_size=5), lookup)
+
+    await sweeper.sweep_once()
+
+    assert [call.args[0] for call in lookup.invalidate.call_args_list] == ["vehicle_0", "vehicle_1"]
+
+
+@pytest.mark.asyncio
+async def test_sweep_retries_release_after_core_failure(core_client):
+    # Estado das vendas: pendentes, e canceladas aguardando liberação do veículo
+    pending = _sales(1)
+    flagged = []
+    repository = AsyncMock()
+    repository.find_expired_pending.side_effect = lambda cutoff, limit: list(pending)
+
+    async def cancel_pending(sales):
+        pending.clear()
+        flagged.extend(sales)
+        return list(sales)
+
+    async def clear_release_pending(vehicle_ids):
+        flagged[:] = [sale for sale in flagged if sale[1] not in vehicle_ids]
+        return len(vehicle_ids)
+
+    repository.cancel_pending.side_effect = cancel_pending
+    repository.find_release_pending.side_effect = lambda limit: list(flagged)
+    repository.clear_release_pending.side_effect = clear_release_pending
+    release = core_client.release_vehicles.side_effect
+    core_client.release_vehicles.side_effect = [Exception("core-service indisponível"), release(["vehicle_0"])]
+    sweeper = PendingSaleSweeper(repository, core_client)
+
+    first = await sweeper.sweep_once()
+    second = await sweeper.sweep_once()
+
+    assert (first.cancelled, first.vehicles_released, first.vehicles_not_released) == (1, 0, 1)
+    assert (second.cancelled, second.vehicles_released) == (0, 1)
+    assert flagged == []
+    assert core_client.release_vehicles.await_args_list[1].args[0] == ["vehicle_0"]
+
+
+@pytest.mark.asyncio
+async def test_sweep_clears_flag_only_when_vehicle_is_no_longer_reserved(repository, core_client):
+    repository.find_expired_pending.side_effect = [_sales(3)]
+    core_client.release_vehicles.side_effect = lambda ids: {"transitioned": ["vehicle_0"], "rejected": [
+        {"vehicle_id": "vehicle_1", "reason": "Apenas veículos reservados podem ser marcados como disponíveis"},
+        {"vehicle_id": "vehicle_2", "reason": "Status do veículo foi alterado por outra operação"},
+    ]}
+    sweeper = PendingSaleSweeper(repository, core_client)
+
+    result = await sweeper.sweep_once()
+
+    repository.clear_release_pending.assert_awaited_once_with(["vehicle_0", "vehicle_1"])
+    assert result.vehicles_not_released == 1
+
+
+@pytest.mark.asyncio
+async def test_repository_cancel_pending_flags_vehicle_release():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    repository.collection.update_many = AsyncMock(return_value=MagicMock(modified_count=1))
+
+    await repository.cancel_pending(_sales(1))
+    await repository.clear_release_pending(["vehicle_0"])
+
+    (_, cancel), (query, clear) = [call.args for call in repository.collection.update_many.call_args_list]
+    assert cancel["$set"]["vehicle_release_pending"] is True
+    assert query == {"vehicle_id": {"$in": ["vehicle_0"]}, "vehicle_release_pending": True}
+    assert clear == {"$unset": {"vehicle_release_pending": ""}}
+
+
+@pytest.mark.asyncio
+async def test_sweep_respects_max_batches(repository, core_client):
+    repository.find_expired_pending.side_effect = lambda cutoff, limit: _sales(limit)
+    sweeper = PendingSaleSweeper(repository, core_client, SweeperSettings(batch_size=10, max_batches=3))
+
+    result = await sweeper.sweep_once()
+
+    assert result.batches == 3
+    assert result.cancelled == 30
+    assert core_client.release_vehicles.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_only_releases_sales_actually_cancelled(repository, core_client):
+    expired = _sales(3)
+    repository.find_expired_pending.side_effect = [expired]
+    repository.cancel_pending.side_effect = lambda sales: sales[:1]
+    sweeper = PendingSaleSweeper(repository, core_client, SweeperSettings(batch_size=10))
+
+    result = await sweeper.sweep_once()
+
+    assert result.cancelled == 1
+    core_client.release_vehicles.assert_awaited_once_with(["vehicle_0"])
+
+
+@pytest.mark.asyncio
+async def test_sweep_without_expired_sales_skips_core_service(repository, core_client):
+    repository.find_expired_pending.return_value = []
+    sweeper = PendingSaleSweeper(repository, core_client)
+
+    result = await sweeper.sweep_once()
+
+    assert result.cancelled == 0
+    assert result.batches == 0
+    core_client.release_vehicles.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_cancellations_when_core_service_fails(repository, core_client):
+    repository.find_expired_pending.side_effect = [_sales(2)]
+    core_client.release_vehicles.side_effect = Exception("core-service indisponível")
+    sweeper = PendingSaleSweeper(repository, core_client, SweeperSettings(batch_size=10))
+
+    result = await sweeper.sweep_once()
+
+    assert result.cancelled == 2
+    assert result.vehicles_released == 0
+    assert result.vehicles_not_released == 2
+
+
+@pytest.mark.asyncio
+async def test_sweep_reports_duration_metric(repository, core_client):
+    from app.services.pending_sale_sweeper import SWEEP_DURATION
+    repository.find_expired_pending.return_value = []
+    sweeper = PendingSaleSweeper(repository, core_client)
+    before = SWEEP_DURATION.count
+
+    result = await sweeper.sweep_once()
+
+    assert SWEEP_DURATION.count == before + 1
+    assert result.duration >= 0
+
+
+@pytest.mark.asyncio
+async def test_repository_cancel_pending_is_conditional():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    sales = _sales(3)
+    repository.collection.update_many = AsyncMock(return_value=MagicMock(modified_count=3))
+
+    cancelled = await repository.cancel_pending(sales)
+
+    assert cancelled == sales
+    query, update = repository.collection.update_many.call_args.args
+    assert query["payment_status"] == "PENDENTE"
+    assert len(query["_id"]["$in"]) == 3
+    assert update["$set"]["payment_status"] == "CANCELADA"
+
+
+@pytest.mark.asyncio
+async def test_repository_cancel_pending_partial_match():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    sales = _sales(3)
+    repository.collection.update_many = AsyncMock(return_value=MagicMock(modified_count=1))
+
+    class Cursor:
+        def __aiter__(self):
+            async def gen():
+                yield {"_id": ObjectId(sales[1][0])}
+            return gen()
+
+    repository.collection.find = MagicMock(return_value=Cursor())
+
+    cancelled = await repository.cancel_pending(sales)
+
+    assert cancelled == [sales[1]]
+    _, update = repository.collection.update_many.call_args.args
+    query = repository.collection.find.call_args.args[0]
+    assert query["status_change"] == update["$set"]["status_change"]
+    assert "updated_at" not in query
@@ -0,0 +1,89 @@
+import os
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.controllers import admin_controller
+from app.infrastructure.profiling import ProfilingMiddleware, ProfilingSettings, RequestProfiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path, monkeypatch):
+    profiler = RequestProfiler(ProfilingSettings(directory=str(tmp_path), max_files=2), admin_token="secret")
+    monkeypatch.setattr(admin_controller, "admin_token", "secret")
+    monkeypatch.setattr(admin_controller, "profiler", profiler)
+    app = FastAPI()
+
+    @app.get("/test-profiling/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id, "total": sum(range(1000))}
+
+    app.include_router(admin_controller.router)
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, profiler
+
+
+@pytest.mark.asyncio
+async def test_admin_routes_require_token(client, monkeypatch):
+    client, _ = client
+
+    assert (await client.get("/admin/profiling")).status_code == 401
+    assert (await client.get("/admin/profiling", headers={"X-Admin-Token": "wrong"})).status_code == 401
+    monkeypatch.setattr(admin_controller, "admin_token", "")
+    assert (await client.get("/admin/profiling", headers=ADMIN)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_armed_route_profiles_next_requests(client, tmp_path):
+    client, profiler = client
+
+    response = await client.post("/admin/profiling", json={"route": "/test-profiling/{item_id}", "requests": 2}, headers=ADMIN)
+    assert response.json()["armed"] == [{"method": "GET", "route": "/test-profiling/{item_id}", "remaining": 2}]
+    for item_id in ["1", "2", "3"]:
+        await client.get(f"/test-profiling/{item_id}")
+
+    state = (await client.get("/admin/profiling", headers=ADMIN)).json()
+    assert state["armed"] == []
+    assert [(p["path"], p["route"], p["status"], p["trigger"]) for p in state["profiles"]] == [
+        ("/test-profiling/2", "/test-profiling/{item_id}", 200, "armed"),
+        ("/test-profiling/1", "/test-profiling/{item_id}", 200, "armed"),
+    ]
+    name = state["profiles"][0]["name"]
+    assert sorted(os.listdir(tmp_path)) == sorted(p["name"] for p in state["profiles"])
+    download = await client.get(f"/admin/profiling/{name}", headers=ADMIN)
+    assert download.status_code == 200 and download.content
+    summary = await client.get(f"/admin/profiling/{name}/summary", headers=ADMIN)
+    assert "function calls" in summary.text
+
+
+@pytest.mark.asyncio
+async def test_debug_header_profiles_single_request(client):
+    client, profiler = client
+
+    await client.get("/test-profiling/1", headers={"X-Debug-Profile": "wrong"})
+    await client.get("/test-profiling/2", headers={"X-Debug-Profile": "secret"})
+
+    assert [(p["path"], p["trigger"]) for p in profiler.list_profiles()] == [("/test-profiling/2", "header")]
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_capped_and_unknown_names_rejected(client, tmp_path):
+    client, profiler = client
+    for item_id in range(3):
+        await client.get(f"/test-profiling/{item_id}", headers={"X-Debug-Profile": "secret"})
+
+    assert len(profiler.list_profiles()) == 2
+    assert len(os.listdir(tmp_path)) == 2
+    assert (await client.get("/admin/profiling/..%2F..%2Fetc%2Fpasswd", headers=ADMIN)).status_code == 404
+    response = await client.post("/admin/profiling", json={"route": "/nowhere"}, headers=ADMIN)
+    assert response.status_code == 404
+
+
+def test_idle_profiler_does_not_claim_requests():
+    profiler = RequestProfiler(ProfilingSettings(), admin_token="")
+
+    assert not profiler.active
+    assert profiler.claim({"type": "http", "method": "GET", "path": "/sales", "headers": []}) is None
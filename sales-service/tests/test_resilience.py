@@ -0,0 +1,261 @@
+import asyncio
+import httpx
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.controllers import sale_controller
+from app.controllers.sale_controller import router, get_service
+from app.domain.sale import Sale, PaymentStatus
+from app.infrastructure.core_service_client import CoreServiceClient, CoreServiceSettings
+from app.infrastructure.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    HEDGED_REQUESTS,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    hedged,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test_open", failure_threshold=3, reset_timeout_seconds=10, clock=clock)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == 10
+
+
+def test_breaker_half_open_allows_one_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test_half_open", failure_threshold=1, reset_timeout_seconds=10, clock=clock)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_breaker_reopens_when_probe_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test_reopen", failure_threshold=1, reset_timeout_seconds=10, clock=clock)
+    breaker.before_call()
+    breaker.record_failure()
+    clock.now = 10
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+    clock.now = 15
+    assert breaker.state == STATE_OPEN
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for value in range(1, 10):
+        tracker.observe(value / 100)
+    assert tracker.percentile(0.95) is None
+
+    for value in range(10, 101):
+        tracker.observe(value / 100)
+    assert tracker.percentile(0.95) == 0.95
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_primary_is_slow():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(1 if calls == 1 else 0)
+        return calls
+
+    won = HEDGED_REQUESTS.labels("test_slow", "won")
+
+    assert await hedged("test_slow", call, delay=0.01) == 2
+    assert won.value == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast():
+    call = AsyncMock(return_value="ok")
+
+    assert await hedged("test_fast", call, delay=0.5) == "ok"
+    assert call.await_count == 1
+    assert HEDGED_REQUESTS.labels("test_fast", "sent").value == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_survives_primary_failure():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.02)
+            raise httpx.ConnectError("connection reset")
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    assert await hedged("test_failure", call, delay=0.01) == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_hedge_waits_for_other_attempt_when_first_is_rejected():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.02)
+            return 503
+        await asyncio.sleep(0.05)
+        return 200
+
+    assert await hedged("test_rejected", call, delay=0.01, is_failure=lambda status: status >= 500) == 200
+    assert HEDGED_REQUESTS.labels("test_rejected", "won").value == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_returns_rejected_result_when_both_lose():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.02)
+            return 503
+        await asyncio.sleep(0.03)
+        raise httpx.ConnectError("connection reset")
+
+    assert await hedged("test_both_lose", call, delay=0.01, is_failure=lambda status: status >= 500) == 503
+
+
+def _client(handler, **settings):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://core")
+    return CoreServiceClient(CoreServiceSettings(**settings), http_client=http_client)
+
+
+@pytest.mark.asyncio
+async def test_client_breaker_fails_fast_when_core_is_down():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(503)
+
+    client = _client(handler, breaker_failure_threshold=3)
+
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.update_vehicle_statuses({"1": "VENDIDO"})
+    with pytest.raises(CircuitOpenError):
+        await client.update_vehicle_statuses({"1": "VENDIDO"})
+
+    assert len(requests) == 3
+    # Cada rota tem o seu disjuntor
+    assert client.breaker("get_vehicle").state == STATE_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_client_not_found_is_not_a_failure():
+    client = _client(lambda request: httpx.Response(404), breaker_failure_threshold=1)
+
+    assert await client.get_vehicle("1") is None
+    assert client.breaker("get_vehicle").state == STATE_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_client_enforces_deadline():
+    async def handler(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={})
+
+    client = _client(handler, read_timeout_seconds=0.05, hedge_enabled=False, breaker_failure_threshold=1)
+
+    with pytest.raises((asyncio.TimeoutError, httpx.TimeoutException)):
+        await client.get_vehicle("1")
+    assert client.breaker("get_vehicle").state == STATE_OPEN
+
+
+@pytest.mark.asyncio
+async def test_client_hedges_reads_after_p95():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"id": "1"})
+
+    client = _client(handler, hedge_min_samples=1, hedge_min_delay_ms=0)
+    client._latency("get_vehicle").observe(0.01)
+
+    assert await client.get_vehicle("1") == {"id": "1"}
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_mark_as_paid_notifies_core_through_shared_client(monkeypatch):
+    vehicle_id = str(ObjectId())
+    sale = Sale(
+        id=str(ObjectId()),
+        vehicle_id=vehicle_id,
+        buyer_cpf="12345678900",
+        sale_price=50000.0,
+        payment_code="PAY123",
+        payment_status=PaymentStatus.PAID,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    service = MagicMock()
+    service.update_payment_status = AsyncMock(return_value=sale)
+    service.repository = AsyncMock()
+    core_client = AsyncMock()
+    core_client.update_vehicle_statuses.return_value = {"transitioned": [vehicle_id], "rejected": []}
+    monkeypatch.setattr(sale_controller, "core_client", core_client)
+    app = FastAPI()
+    app.dependency_overrides[get_service] = lambda: service
+    app.include_router(router)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.patch(f"/sales/{sale.id}/mark-as-paid")
+
+    assert response.status_code == 200
+    core_client.update_vehicle_statuses.assert_awaited_once_with({vehicle_id: "VENDIDO"})
+    service.repository.refresh_vehicle_statuses.assert_awaited_once_with({vehicle_id: "VENDIDO"})
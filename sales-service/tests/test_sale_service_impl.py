@@ -30,7 +30,7 @@ async def test_create_sale_error(sale_service, mock_repository):
 
 @pytest.mark.asyncio
 async def test_update_sale_error(sale_service, mock_repository):
-    mock_repository.find_by_id.return_value = None
+    mock_repository.update_fields.return_value = None
     
     with pytest.raises(Exception) as exc_info:
         await sale_service.update_sale("test_id", SaleUpdate(
@@ -50,7 +50,7 @@ async def test_delete_sale_error(sale_service, mock_repository):
 
 @pytest.mark.asyncio
 async def test_update_payment_status_error(sale_service, mock_repository):
-    mock_repository.find_by_id.return_value = None
+    mock_repository.update_fields.return_value = None
     
     with pytest.raises(Exception) as exc_info:
         await sale_service.update_payment_status("test_sale_id", PaymentStatus.PAID)
@@ -59,14 +59,30 @@ async def test_update_payment_status_error(sale_service, mock_repository):
 
 @pytest.mark.asyncio
 async def test_update_payment_status_success(sale_service, mock_repository, mock_sale):
-    mock_repository.find_by_id.return_value = mock_sale
-    mock_repository.update.return_value = mock_sale
+    mock_sale.payment_status = PaymentStatus.PAID
+    mock_repository.update_fields.return_value = mock_sale
     
     updated_sale = await sale_service.update_payment_status("test_sale_id", PaymentStatus.PAID)
     
     assert updated_sale == mock_sale
     assert updated_sale.payment_status == PaymentStatus.PAID
-    mock_repository.update.assert_called_once()
+    sale_id, fields = mock_repository.update_fields.call_args.args
+    assert sale_id == "test_sale_id"
+    assert set(fields) == {"payment_status", "updated_at"}
+    mock_repository.find_by_id.assert_not_called()
+    mock_repository.update.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_sale_sends_only_changed_fields(sale_service, mock_repository, mock_sale):
+    mock_repository.update_fields.return_value = mock_sale
+
+    await sale_service.update_sale("test_sale_id", SaleUpdate(sale_price=60000.0))
+
+    sale_id, fields = mock_repository.update_fields.call_args.args
+    assert sale_id == "test_sale_id"
+    assert fields["sale_price"] == 60000.0
+    assert set(fields) == {"sale_price", "updated_at"}
+    mock_repository.find_by_id.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_get_sale_error(sale_service, mock_repository):
@@ -0,0 +1,110 @@
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from fastapi import APIRouter, FastAPI
+from httpx import AsyncClient
+from app.controllers.sale_controller import router as sale_router, get_service, get_vehicle_loader
+from app.domain.sale import Sale, PaymentStatus
+from app.infrastructure import request_cost
+from app.infrastructure.core_service_client import CoreServiceClient
+from app.infrastructure.mongo_monitoring import MongoCommandMonitor, MongoMonitoringSettings
+from app.infrastructure.server_timing import ServerTimingMiddleware, TimedRoute
+from app.services.vehicle_lookup import VehicleLoader
+
+
+def run_find(monitor, request_id, documents=0):
+    command = {"find": "test_sales", "filter": {}}
+    monitor.started(SimpleNamespace(
+        command_name="find", command=command, database_name="sales_db",
+        connection_id=("localhost", 27017), request_id=request_id
+    ))
+    monitor.succeeded(SimpleNamespace(
+        connection_id=("localhost", 27017), request_id=request_id, duration_micros=2000,
+        reply={"cursor": {"id": 0, "firstBatch": [{}] * documents}}
+    ))
+
+
+@pytest.fixture
+def app():
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/test-timing")
+    async def timed():
+        request_cost.record_mongo(0.002, 3)
+        request_cost.record_mongo(0.001, 0)
+        return {"ok": True}
+
+    @router.get("/test-timing-sync")
+    def timed_sync():
+        request_cost.record_mongo(0.001, 1)
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware)
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, mongo", [
+    ("/test-timing", 'mongo;dur=3.0;desc="comandos=2 documentos=3"'),
+    ("/test-timing-sync", 'mongo;dur=1.0;desc="comandos=1 documentos=1"'),
+])
+async def test_server_timing_header_breaks_down_request(app, path, mongo):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(path)
+
+    entries = response.headers["server-timing"].split(", ")
+    assert [entry.split(";")[0] for entry in entries] == ["validation", "app", "mongo", "serialization", "total"]
+    assert mongo in entries
+
+
+def test_listener_adds_commands_to_request_cost():
+    monitor = MongoCommandMonitor(MongoMonitoringSettings(slow_ms=1000))
+    with request_cost.track() as cost:
+        run_find(monitor, 1, documents=2)
+    run_find(monitor, 2, documents=5)
+
+    assert cost.mongo_commands == 1
+    assert cost.mongo_documents == 2
+
+
+def test_round_trip_budget_catches_extra_commands():
+    monitor = MongoCommandMonitor(MongoMonitoringSettings(slow_ms=1000))
+    with pytest.raises(AssertionError, match="3 comandos ao MongoDB, o limite é 2"):
+        with request_cost.round_trip_budget(mongo=2):
+            for request_id in range(3):
+                run_find(monitor, request_id)
+
+
+@pytest.mark.asyncio
+async def test_list_with_vehicles_stays_within_core_budget():
+    vehicle_ids = [str(ObjectId()) for _ in range(5)]
+    service = AsyncMock()
+    service.get_all_sales.return_value = [
+        Sale(vehicle_id=vehicle_ids[i % 5], buyer_cpf="12345678900", sale_price=48000.0,
+             payment_code=f"PAY{i}", payment_status=PaymentStatus.PAID, id=str(ObjectId()))
+        for i in range(20)
+    ]
+
+    def handler(request):
+        vehicles = [{"id": vehicle_id, "brand": "Fiat", "model": "Uno", "year": 2019, "price": 50000.0,
+                     "status": "VENDIDO"} for vehicle_id in vehicle_ids]
+        return httpx.Response(200, json={"vehicles": vehicles})
+
+    core_client = CoreServiceClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://core"))
+    app = FastAPI()
+    app.dependency_overrides[get_service] = lambda: service
+    app.dependency_overrides[get_vehicle_loader] = lambda: VehicleLoader(core_client)
+    app.include_router(sale_router)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        with request_cost.round_trip_budget(http=1) as cost:
+            response = await client.get("/sales", params={"include_vehicle": "true"})
+
+    assert response.status_code == 200
+    assert {sale["vehicle"]["status"] for sale in response.json()} == {"VENDIDO"}
+    assert cost.http_calls == 1
+    await core_client.close()
@@ -0,0 +1,156 @@
+import json
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from app.infrastructure import tracing
+from app.infrastructure.core_service_client import CoreServiceClient
+from app.infrastructure.tracing import (
+    InMemoryExporter,
+    JsonFileExporter,
+    RateLimitedSampler,
+    SpanContext,
+    Tracer,
+    TracingMiddleware,
+    format_traceparent,
+    parse_traceparent,
+    trace_methods,
+)
+
+INCOMING = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@trace_methods
+class FakeRepository:
+    class collection:
+        name = "test_sales"
+
+    async def find_by_id(self, sale_id):
+        if sale_id == "missing":
+            raise LookupError(sale_id)
+        return {"id": sale_id}
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    previous = tracing.set_tracer(Tracer("sales-service", exporter, RateLimitedSampler(1000)))
+    yield exporter
+    tracing.set_tracer(previous)
+
+
+@pytest.fixture
+def app():
+    outgoing = []
+
+    def handler(request):
+        outgoing.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"id": "v1"})
+
+    core_client = CoreServiceClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://core"))
+    repository = FakeRepository()
+    app = FastAPI()
+
+    @app.get("/test-tracing/{sale_id}")
+    async def get_sale(sale_id: str):
+        try:
+            await repository.find_by_id(sale_id)
+        except LookupError:
+            raise HTTPException(status_code=404, detail="Venda não encontrada")
+        await core_client.get_vehicle("v1")
+        return {"id": sale_id}
+
+    app.add_middleware(TracingMiddleware)
+    app.state.outgoing = outgoing
+    return app
+
+
+def test_traceparent_round_trip():
+    context = parse_traceparent(INCOMING)
+
+    assert context == SpanContext("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+    assert format_traceparent(context) == INCOMING
+    for invalid in [None, "", "00-abc-def-01", "ff-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+                    "00-00000000000000000000000000000000-b7ad6b7169203331-01"]:
+        assert parse_traceparent(invalid) is None
+
+
+def test_sampler_limits_new_traces_per_second():
+    now = [0.0]
+    sampler = RateLimitedSampler(2, clock=lambda: now[0])
+
+    assert [sampler.should_sample() for _ in range(3)] == [True, True, False]
+    now[0] = 0.5
+    assert [sampler.should_sample() for _ in range(2)] == [True, False]
+
+
+def test_sampler_with_fractional_rate_samples_every_few_seconds():
+    now = [0.0]
+    sampler = RateLimitedSampler(0.5, clock=lambda: now[0])
+
+    sampled = []
+    for second in range(20):
+        now[0] = float(second)
+        sampled.append(sampler.should_sample())
+
+    assert sum(sampled) == 10
+    assert sampled[:4] == [True, False, True, False]
+    assert RateLimitedSampler(0).should_sample() is False
+
+
+@pytest.mark.asyncio
+async def test_request_spans_repository_and_core_call(app, exporter):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/test-tracing/1")
+
+    assert response.status_code == 200
+    [spans] = exporter.traces().values()
+    server, repository, core = sorted(spans, key=lambda span: span.start_time)
+    assert (server.name, server.kind, server.parent_id) == ("GET /test-tracing/{sale_id}", "server", None)
+    assert server.attributes["http.status_code"] == 200
+    assert (repository.name, repository.parent_id) == ("FakeRepository.find_by_id", server.context.span_id)
+    assert repository.attributes["db.collection"] == "test_sales"
+    assert (core.name, core.kind, core.parent_id) == ("core-service get_vehicle", "client", server.context.span_id)
+    assert app.state.outgoing == [format_traceparent(core.context)]
+
+
+@pytest.mark.asyncio
+async def test_incoming_trace_is_continued(app, exporter):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/test-tracing/missing", headers={"traceparent": INCOMING})
+        await client.get("/test-tracing/1", headers={"traceparent": INCOMING[:-2] + "00"})
+
+    spans = exporter.spans()
+    assert {span.context.trace_id for span in spans} == {"0af7651916cd43dd8448eb211c80319c"}
+    server = next(span for span in spans if span.kind == "server")
+    assert server.parent_id == "b7ad6b7169203331"
+    assert server.attributes["http.status_code"] == 404
+    repository = next(span for span in spans if span.name == "FakeRepository.find_by_id")
+    assert (repository.status, repository.error) == ("error", "LookupError: missing")
+    # O trace não amostrado é propagado, com a flag desligada, mas não exportado
+    assert len(spans) == 2
+    [outgoing] = app.state.outgoing
+    assert outgoing.startswith("00-0af7651916cd43dd8448eb211c80319c-") and outgoing.endswith("-00")
+
+
+@pytest.mark.asyncio
+async def test_without_tracer_nothing_is_propagated(app):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/test-tracing/1")
+
+    assert response.status_code == 200
+    assert app.state.outgoing == [None]
+
+
+@pytest.mark.asyncio
+async def test_json_file_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer("sales-service", JsonFileExporter(str(path)), RateLimitedSampler(10))
+    with tracer.start_span("parent"):
+        with tracer.start_span("child", attributes={"sale_id": "1"}):
+            pass
+    tracer.shutdown()
+
+    child, parent = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (child["name"], child["parent_id"], child["attributes"]) == ("child", parent["span_id"], {"sale_id": "1"})
+    assert child["trace_id"] == parent["trace_id"]
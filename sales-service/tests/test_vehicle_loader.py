@@ -0,0 +1,161 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.controllers.sale_controller import router, get_service, get_vehicle_loader
+from app.domain.sale import Sale, PaymentStatus, VehicleSnapshot
+from app.infrastructure.batch_loader import BatchLoader
+from app.infrastructure.core_service_client import CoreServiceClient
+from app.services.vehicle_lookup import VehicleLoader
+
+
+def _vehicle(vehicle_id, status="VENDIDO"):
+    return {"id": vehicle_id, "brand": "Fiat", "model": "Uno", "year": 2019, "price": 50000.0, "status": status}
+
+
+def _sale(vehicle_id):
+    return Sale(
+        id=str(ObjectId()),
+        vehicle_id=vehicle_id,
+        buyer_cpf="12345678900",
+        sale_price=48000.0,
+        payment_code=f"PAY{ObjectId()}",
+        payment_status=PaymentStatus.PAID,
+        vehicle=VehicleSnapshot.from_core(_vehicle(vehicle_id, status="DISPONÍVEL")),
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+
+@pytest.mark.asyncio
+async def test_loads_in_the_same_tick_become_one_batch():
+    batch_fn = AsyncMock(side_effect=lambda keys: {key: key.upper() for key in keys})
+    loader = BatchLoader("test_tick", batch_fn)
+
+    results = await asyncio.gather(*(loader.load(key) for key in ["a", "b", "a", "c", "b"]))
+
+    assert results == ["A", "B", "A", "C", "B"]
+    batch_fn.assert_awaited_once_with(["a", "b", "c"])
+    assert loader.stats() == {"name": "test_tick", "batches": 1, "fetched": 3, "cached": 2}
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_for_the_loader_lifetime():
+    batch_fn = AsyncMock(side_effect=lambda keys: {key: key for key in keys if key != "missing"})
+    loader = BatchLoader("test_cached", batch_fn)
+
+    assert await loader.load_many(["a", "missing"]) == ["a", None]
+    assert await loader.load_many(["a", "missing"]) == ["a", None]
+
+    assert batch_fn.await_count == 1
+    assert loader.cached == 2
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_max_batch_size():
+    batch_fn = AsyncMock(side_effect=lambda keys: {key: key for key in keys})
+    loader = BatchLoader("test_max_size", batch_fn, max_batch_size=2)
+
+    await loader.load_many(["a", "b", "c", "d", "e"])
+
+    assert [call.args[0] for call in batch_fn.await_args_list] == [["a", "b"], ["c", "d"], ["e"]]
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    batch_fn = AsyncMock(side_effect=[Exception("core-service indisponível"), {"a": 1}])
+    loader = BatchLoader("test_failure", batch_fn)
+
+    with pytest.raises(Exception, match="indisponível"):
+        await loader.load("a")
+
+    assert await loader.load("a") == 1
+    assert batch_fn.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_vehicle_loader_skips_invalid_ids():
+    vehicle_id = str(ObjectId())
+    client = AsyncMock()
+    client.get_vehicles.return_value = {vehicle_id: _vehicle(vehicle_id)}
+    loader = VehicleLoader(client)
+
+    assert await loader.load_many([vehicle_id, "not-an-id"]) == [_vehicle(vehicle_id), None]
+    client.get_vehicles.assert_awaited_once_with([vehicle_id])
+
+
+@pytest.mark.asyncio
+async def test_core_client_get_vehicles_uses_lookup_route():
+    vehicle_id = str(ObjectId())
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"vehicles": [_vehicle(vehicle_id)], "missing": ["x"]})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://core")
+    client = CoreServiceClient(http_client=http_client)
+
+    assert await client.get_vehicles([vehicle_id, "x"]) == {vehicle_id: _vehicle(vehicle_id)}
+    assert len(requests) == 1
+    assert requests[0].url.path == "/vehicles/lookup"
+    await client.close()
+
+
+@pytest_asyncio.fixture
+async def api():
+    vehicle_ids = [str(ObjectId()) for _ in range(5)]
+    sales = [_sale(vehicle_ids[i % 5]) for i in range(20)]
+    service = AsyncMock()
+    service.get_all_sales.return_value = sales
+    service.get_sales_by_status.return_value = sales
+    core_client = AsyncMock()
+    core_client.get_vehicles.side_effect = lambda ids: {vehicle_id: _vehicle(vehicle_id) for vehicle_id in ids}
+    loader = VehicleLoader(core_client)
+    app = FastAPI()
+    app.dependency_overrides[get_service] = lambda: service
+    app.dependency_overrides[get_vehicle_loader] = lambda: loader
+    app.include_router(router)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, core_client, loader
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/sales", "/sales/status/PAGO"])
+async def test_list_with_vehicles_makes_one_core_call(api, path):
+    client, core_client, loader = api
+
+    response = await client.get(path, params={"include_vehicle": "true"})
+
+    assert response.status_code == 200
+    assert {sale["vehicle"]["status"] for sale in response.json()} == {"VENDIDO"}
+    core_client.get_vehicles.assert_awaited_once()
+    assert len(core_client.get_vehicles.await_args.args[0]) == 5
+    assert loader.batches == 1
+
+
+@pytest.mark.asyncio
+async def test_list_without_include_vehicle_skips_core(api):
+    client, core_client, _ = api
+
+    response = await client.get("/sales")
+
+    assert response.status_code == 200
+    assert {sale["vehicle"]["status"] for sale in response.json()} == {"DISPONÍVEL"}
+    core_client.get_vehicles.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_list_keeps_snapshot_when_core_fails(api):
+    client, core_client, _ = api
+    core_client.get_vehicles.side_effect = Exception("connection refused")
+
+    response = await client.get("/sales", params={"include_vehicle": "true"})
+
+    assert response.status_code == 200
+    assert {sale["vehicle"]["status"] for sale in response.json()} == {"DISPONÍVEL"}
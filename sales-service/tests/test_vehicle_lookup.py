@@ -0,0 +1,229 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from app.domain.sale import Sale, PaymentStatus, PaymentUpdateOutcome
+from app.domain.sale_schema import SaleCreate
+from app.exceptions import InvalidSaleDataError
+from app.infrastructure.cache import TTLCache
+from app.services.payment_event_processor import PaymentEventProcessor
+from app.services.sale_service_impl import SaleServiceImpl
+from app.services.vehicle_lookup import VehicleLookup, VehicleLookupSettings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _vehicle(vehicle_id, status="DISPONÍVEL", price=50000.0):
+    return {"id": vehicle_id, "brand": "Fiat", "model": "Uno", "year": 2019, "price": price, "status": status}
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_avoids_loader_until_ttl_expires():
+    clock = FakeClock()
+    cache = TTLCache("test_ttl", ttl_seconds=10, clock=clock)
+    loader = AsyncMock(side_effect=lambda key: {"id": key})
+
+    await cache.get_or_load("a", loader)
+    await cache.get_or_load("a", loader)
+    assert loader.await_count == 1
+
+    clock.now = 11
+    await cache.get_or_load("a", loader)
+    assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    cache = TTLCache("test_lru", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == (True, 1)
+    assert cache.get("b") == (False, None)
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_negative_entries_use_short_ttl():
+    clock = FakeClock()
+    cache = TTLCache("test_negative", ttl_seconds=60, negative_ttl_seconds=5, clock=clock)
+    loader = AsyncMock(return_value=None)
+
+    assert await cache.get_or_load("missing", loader) is None
+    assert await cache.get_or_load("missing", loader) is None
+    assert loader.await_count == 1
+
+    clock.now = 6
+    await cache.get_or_load("missing", loader)
+    assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_concurrent_loads():
+    cache = TTLCache("test_coalesce")
+    release = asyncio.Event()
+    calls = 0
+
+    async def loader(key):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"id": key}
+
+    tasks = [asyncio.create_task(cache.get_or_load("a", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert all(result == {"id": "a"} for result in results)
+    assert cache.stats()["coalesced"] >= 9
+
+
+@pytest.mark.asyncio
+async def test_cache_does_not_store_failures():
+    cache = TTLCache("test_failure")
+    loader = AsyncMock(side_effect=[Exception("core-service indisponível"), {"id": "a"}])
+
+    with pytest.raises(Exception):
+        await cache.get_or_load("a", loader)
+
+    assert await cache.get_or_load("a", loader) == {"id": "a"}
+
+
+@pytest.mark.asyncio
+async def test_cache_cancelling_first_caller_keeps_coalesced_waiters():
+    cache = TTLCache("test_cancel")
+    release = asyncio.Event()
+
+    async def loader(key):
+        await release.wait()
+        return {"id": key}
+
+    first = asyncio.create_task(cache.get_or_load("a", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("a", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == {"id": "a"}
+    assert first.cancelled()
+    assert cache.get("a") == (True, {"id": "a"})
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidate_during_load_discards_result():
+    cache = TTLCache("test_invalidate_inflight")
+    release = asyncio.Event()
+
+    async def loader(key):
+        await release.wait()
+        return {"id": key, "status": "DISPONÍVEL"}
+
+    task = asyncio.create_task(cache.get_or_load("a", loader))
+    await asyncio.sleep(0)
+    cache.invalidate("a")
+    release.set()
+
+    assert (await task)["id"] == "a"
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_payment_status_change_invalidates_cached_vehicle():
+    vehicle_id = str(ObjectId())
+    client = AsyncMock()
+    client.get_vehicle.side_effect = [_vehicle(vehicle_id), _vehicle(vehicle_id, status="VENDIDO")]
+    client.update_vehicle_statuses.return_value = {"transitioned": [vehicle_id], "rejected": []}
+    lookup = VehicleLookup(client)
+    sale = Sale(
+        id=str(ObjectId()), vehicle_id=vehicle_id, buyer_cpf="12345678900", sale_price=50000.0,
+        payment_code="PAY1", payment_status=PaymentStatus.PAID
+    )
+    repository = AsyncMock()
+    repository.apply_payment_statuses.return_value = {"PAY1": (PaymentUpdateOutcome.UPDATED, sale)}
+    processor = PaymentEventProcessor(repository, client, lookup)
+
+    assert (await lookup.get_vehicle(vehicle_id))["status"] == "DISPONÍVEL"
+    await processor.process([{"payment_code": "PAY1", "status": "PAGO"}])
+
+    assert (await lookup.get_vehicle(vehicle_id))["status"] == "VENDIDO"
+    assert client.get_vehicle.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lookup_skips_invalid_ids():
+    client = AsyncMock()
+    lookup = VehicleLookup(client)
+
+    assert await lookup.get_vehicle("not-an-id") is None
+    client.get_vehicle.assert_not_awaited()
+
+
+def _service(vehicle=None, error=None):
+    repository = AsyncMock()
+    repository.save.side_effect = lambda sale: sale
+    client = AsyncMock()
+    if error:
+        client.get_vehicle.side_effect = error
+    else:
+        client.get_vehicle.return_value = vehicle
+    lookup = VehicleLookup(client, VehicleLookupSettings(min_price_ratio=0.8, max_price_ratio=1.2))
+    return SaleServiceImpl(repository, lookup), repository
+
+
+def _sale_data(vehicle_id, price=50000.0):
+    return SaleCreate(
+        vehicle_id=vehicle_id,
+        buyer_cpf="12345678900",
+        sale_price=price,
+        payment_code="PAY123",
+        payment_status="PENDENTE"
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_sale_validates_vehicle():
+    vehicle_id = str(ObjectId())
+    service, repository = _service(_vehicle(vehicle_id))
+
+    sale = await service.create_sale(_sale_data(vehicle_id))
+
+    assert sale.vehicle_id == vehicle_id
+    repository.save.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("vehicle,price,message", [
+    (None, 50000.0, "não encontrado"),
+    (_vehicle("x", status="VENDIDO"), 50000.0, "não está disponível"),
+    (_vehicle("x"), 1000.0, "fora da faixa"),
+    (_vehicle("x"), 70000.0, "fora da faixa"),
+])
+async def test_create_sale_rejects_invalid_vehicle(vehicle, price, message):
+    service, repository = _service(vehicle)
+
+    with pytest.raises(InvalidSaleDataError, match=message):
+        await service.create_sale(_sale_data(str(ObjectId()), price))
+
+    repository.save.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_sale_fails_open_when_core_service_is_down():
+    service, repository = _service(error=Exception("connection refused"))
+
+    await service.create_sale(_sale_data(str(ObjectId())))
+
+    repository.save.assert_awaited_once()
@@ -0,0 +1,154 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.adapters.mongodb_sale_repository import MongoDBSaleRepository
+from app.controllers.sale_controller import router, get_service
+from app.domain.sale import Sale, PaymentStatus, PaymentUpdateOutcome, VehicleSnapshot
+from app.domain.sale_schema import SaleCreate
+from app.schemas.sale_schema import SaleResponse
+from app.services.payment_event_processor import PaymentEventProcessor
+from app.services.sale_service_impl import SaleServiceImpl
+from app.services.vehicle_lookup import VehicleLookup
+
+CORE_VEHICLE = {
+    "id": str(ObjectId()),
+    "brand": "Toyota",
+    "model": "Corolla",
+    "year": 2022,
+    "color": "Prata",
+    "price": 100000.0,
+    "status": "DISPONÍVEL"
+}
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+
+def _sale(vehicle=None):
+    return Sale(
+        id=str(ObjectId()),
+        vehicle_id=CORE_VEHICLE["id"],
+        buyer_cpf="12345678900",
+        sale_price=98000.0,
+        payment_code="PAY123",
+        payment_status=PaymentStatus.PENDING,
+        vehicle=vehicle,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+
+def test_snapshot_round_trip():
+    sale = _sale(VehicleSnapshot.from_core(CORE_VEHICLE))
+
+    document = sale.to_dict()
+    restored = Sale.from_dict(document)
+
+    assert document["vehicle"] == {
+        "brand": "Toyota", "model": "Corolla", "year": 2022, "color": "Prata",
+        "list_price": 100000.0, "status": "DISPONÍVEL"
+    }
+    assert restored.vehicle == sale.vehicle
+    assert SaleResponse.from_domain(restored).vehicle.brand == "Toyota"
+
+
+def test_sale_without_snapshot_still_loads():
+    document = _sale().to_dict()
+    del document["vehicle"]
+
+    assert Sale.from_dict(document).vehicle is None
+
+
+@pytest.mark.asyncio
+async def test_create_sale_stores_snapshot():
+    repository = AsyncMock()
+    repository.save.side_effect = lambda sale: sale
+    client = AsyncMock()
+    client.get_vehicle.return_value = CORE_VEHICLE
+    service = SaleServiceImpl(repository, VehicleLookup(client))
+
+    sale = await service.create_sale(SaleCreate(
+        vehicle_id=CORE_VEHICLE["id"],
+        buyer_cpf="12345678900",
+        sale_price=98000.0,
+        payment_code="PAY123",
+        payment_status="PENDENTE"
+    ))
+
+    assert sale.vehicle.model == "Corolla"
+    assert sale.vehicle.list_price == 100000.0
+
+
+@pytest.mark.asyncio
+async def test_repository_find_by_vehicle_builds_indexed_query():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    repository.collection.find = MagicMock(return_value=Cursor([_sale(VehicleSnapshot.from_core(CORE_VEHICLE)).to_dict()]))
+
+    sales = await repository.find_by_vehicle(brand="Toyota", year=2022)
+
+    assert len(sales) == 1
+    repository.collection.find.assert_called_once_with({"vehicle.brand": "Toyota", "vehicle.year": 2022})
+
+
+@pytest.mark.asyncio
+async def test_repository_refresh_vehicle_statuses_single_bulk_write():
+    repository = MongoDBSaleRepository(AsyncMock(spec=AsyncIOMotorClient))
+    repository.collection.bulk_write = AsyncMock(return_value=MagicMock(modified_count=1))
+
+    await repository.refresh_vehicle_statuses({CORE_VEHICLE["id"]: "VENDIDO"})
+
+    operations = repository.collection.bulk_write.call_args.args[0]
+    assert len(operations) == 1
+    assert operations[0]._filter == {"vehicle_id": CORE_VEHICLE["id"], "vehicle": {"$type": "object"}}
+    assert operations[0]._doc == {"$set": {"vehicle.status": "VENDIDO"}}
+
+
+@pytest.mark.asyncio
+async def test_status_sync_refreshes_snapshots():
+    repository = AsyncMock()
+    sale = _sale(VehicleSnapshot.from_core(CORE_VEHICLE))
+    sale.payment_status = PaymentStatus.PAID
+    repository.apply_payment_statuses.return_value = {"PAY123": (PaymentUpdateOutcome.UPDATED, sale)}
+    client = AsyncMock()
+    client.update_vehicle_statuses.return_value = {"transitioned": [CORE_VEHICLE["id"]], "rejected": []}
+
+    await PaymentEventProcessor(repository, client).process([{"payment_code": "PAY123", "status": "PAGO"}])
+
+    repository.refresh_vehicle_statuses.assert_awaited_once_with({CORE_VEHICLE["id"]: "VENDIDO"})
+
+
+@pytest_asyncio.fixture
+async def client():
+    service = AsyncMock()
+    service.get_all_sales.return_value = []
+    service.search_sales.return_value = [_sale(VehicleSnapshot.from_core(CORE_VEHICLE))]
+    app = FastAPI()
+    app.dependency_overrides[get_service] = lambda: service
+    app.include_router(router)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, service
+
+
+@pytest.mark.asyncio
+async def test_list_sales_filters_by_vehicle(client):
+    client, service = client
+
+    response = await client.get("/sales", params={"brand": "Toyota", "model": "Corolla"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["vehicle"]["brand"] == "Toyota"
+    service.search_sales.assert_awaited_once_with(brand="Toyota", model="Corolla", year=None)
+    service.get_all_sales.assert_not_awaited()